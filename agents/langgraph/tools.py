@@ -6,6 +6,7 @@ import operator as op
 
 from core.database import SessionLocal
 from db import models
+from services.product_vector_ingest import schedule_index_product
 
 
 # ---------- CREATE PRODUCT ----------
@@ -69,6 +70,7 @@ def seller_update_price_tool(*, seller_id: int, product_id: int, new_price: floa
 
         product.price = new_price
         db.commit()
+        schedule_index_product(db, product_id, {"price"})
         return {"status": "ok", "product_id": product_id, "new_price": new_price}
 
     except SQLAlchemyError as e:
@@ -93,6 +95,7 @@ def seller_update_stock_tool(*, seller_id: int, product_id: int, stock_quantity:
 
         product.stock_quantity = stock_quantity
         db.commit()
+        schedule_index_product(db, product_id, {"stock_quantity"})
         return {"status": "ok", "product_id": product_id, "stock_quantity": stock_quantity}
 
     except SQLAlchemyError as e:
@@ -3,6 +3,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from db.models import Product
+from services.product_vector_ingest import schedule_index_product
 
 def update_price(
     *,
@@ -27,6 +28,7 @@ def update_price(
     product.price = new_price
     db.commit()
     db.refresh(product)
+    schedule_index_product(db, product.id, {"price"})
 
     return {
         "product_id": product.id,
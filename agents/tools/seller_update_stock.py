@@ -3,6 +3,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from db.models import Product
+from services.product_vector_ingest import schedule_index_product
 
 def update_stock(
     *,
@@ -30,6 +31,7 @@ def update_stock(
     product.stock_quantity = stock
     db.commit()
     db.refresh(product)
+    schedule_index_product(db, product.id, {"stock_quantity"})
 
     return {
         "product_id": product.id,
@@ -0,0 +1,242 @@
+# core/graph_db.py
+#
+# Apache AGE access layer.
+# Dedicated psycopg2 pool; every connection runs LOAD 'age' and the
+# ag_catalog search_path once, on connect. Cypher is prepared once per
+# connection and parameters go through AGE's agtype params map.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import psycopg2
+from psycopg2.extensions import connection as _PgConnection
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+from sqlalchemy.engine import make_url
+
+from core.database import DATABASE_URL
+from core.logging_config import get_logger
+
+logger = get_logger("graph_db")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+GRAPH_NAME = os.getenv("GRAPH_NAME", "amesie_graph")
+GRAPH_POOL_MIN = int(os.getenv("GRAPH_POOL_MIN", "1"))
+GRAPH_POOL_MAX = int(os.getenv("GRAPH_POOL_MAX", "10"))
+# Max wait for a free connection before giving up
+GRAPH_POOL_TIMEOUT = float(os.getenv("GRAPH_POOL_TIMEOUT", "5"))
+GRAPH_STATEMENT_TIMEOUT_MS = int(os.getenv("GRAPH_STATEMENT_TIMEOUT_MS", "0"))
+
+_INIT_SQL = (
+    "LOAD 'age';",
+    'SET search_path = ag_catalog, "$user", public;',
+)
+
+
+class GraphConnection(_PgConnection):
+    """
+    psycopg2 connection that remembers which Cypher statements
+    it has already PREPAREd.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class _GraphPool(ThreadedConnectionPool):
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        conn.autocommit = True
+
+        with conn.cursor() as cur:
+            for sql in _INIT_SQL:
+                cur.execute(sql)
+            if GRAPH_STATEMENT_TIMEOUT_MS:
+                cur.execute(f"SET statement_timeout = {int(GRAPH_STATEMENT_TIMEOUT_MS)};")
+
+        return conn
+
+
+def _dsn() -> str:
+    # SQLAlchemy URL → libpq URL (drop the +driver suffix)
+    return make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+_pool: Optional[_GraphPool] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(GRAPH_POOL_MAX)
+
+_stats: Dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def _get_pool() -> _GraphPool:
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _GraphPool(
+                    GRAPH_POOL_MIN,
+                    GRAPH_POOL_MAX,
+                    dsn=_dsn(),
+                    connection_factory=GraphConnection,
+                )
+                logger.info(
+                    f"[GRAPH-DB] Pool ready | min={GRAPH_POOL_MIN}, max={GRAPH_POOL_MAX}"
+                )
+    return _pool
+
+
+@contextmanager
+def graph_connection() -> Iterator[GraphConnection]:
+    """
+    Borrows an initialized connection; broken connections are discarded.
+    """
+    if not _slots.acquire(timeout=GRAPH_POOL_TIMEOUT):
+        raise TimeoutError("graph connection pool exhausted")
+
+    pool = _get_pool()
+    conn = None
+    broken = False
+
+    try:
+        conn = pool.getconn()
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        if conn is not None:
+            pool.putconn(conn, close=broken or bool(conn.closed))
+        _slots.release()
+
+
+def close_graph_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+# ─────────────────────────────────────────────
+# CYPHER
+# ─────────────────────────────────────────────
+def _statement_name(sql: str) -> str:
+    return "cy_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+
+
+def _record(name: str, elapsed: float, rows: int, failed: bool):
+    with _stats_lock:
+        s = _stats.setdefault(
+            name,
+            {"calls": 0, "errors": 0, "rows": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        )
+        s["calls"] += 1
+        s["errors"] += int(failed)
+        s["rows"] += rows
+        s["total_seconds"] += elapsed
+        s["max_seconds"] = max(s["max_seconds"], elapsed)
+
+
+def cypher(
+    query: str,
+    columns: str,
+    params: Optional[dict] = None,
+    name: str = "cypher",
+    graph: str = GRAPH_NAME,
+    conn: Optional[GraphConnection] = None,
+) -> List[dict]:
+    """
+    Runs a Cypher query and returns rows as dicts.
+
+    query   – Cypher text; reference parameters as $name
+    columns – SQL column definition list, e.g. "pid int, weight float"
+    params  – values for $name placeholders (JSON-serializable)
+    name    – label for per-query timing in graph_stats()
+    conn    – run on this borrowed connection (e.g. inside a transaction)
+              instead of checking one out
+
+    The statement is PREPAREd once per pooled connection and then
+    EXECUTEd, so repeated calls skip parsing and planning.
+    """
+    has_params = params is not None
+
+    sql = (
+        f"SELECT * FROM cypher('{graph}', $$ {query} $$"
+        + (", $1" if has_params else "")
+        + f") AS ({columns})"
+    )
+    stmt = _statement_name(sql)
+
+    started = time.perf_counter()
+    rows: List[dict] = []
+    failed = False
+
+    def _run(conn: GraphConnection) -> List[dict]:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if stmt not in conn.prepared:
+                arg_types = "(agtype)" if has_params else ""
+                cur.execute(f"PREPARE {stmt}{arg_types} AS {sql}")
+                conn.prepared.add(stmt)
+
+            if has_params:
+                cur.execute(f"EXECUTE {stmt}(%s)", (json.dumps(params),))
+            else:
+                cur.execute(f"EXECUTE {stmt}")
+
+            return cur.fetchall() if cur.description else []
+
+    try:
+        if conn is not None:
+            rows = _run(conn)
+        else:
+            with graph_connection() as pooled:
+                rows = _run(pooled)
+        return rows
+
+    except Exception:
+        failed = True
+        raise
+
+    finally:
+        _record(name, time.perf_counter() - started, len(rows), failed)
+
+
+def graph_stats() -> dict:
+    with _stats_lock:
+        queries = {
+            name: {
+                **s,
+                "total_seconds": round(s["total_seconds"], 4),
+                "avg_ms": (
+                    round(s["total_seconds"] / s["calls"] * 1000, 3)
+                    if s["calls"] else 0.0
+                ),
+                "max_ms": round(s["max_seconds"] * 1000, 3),
+            }
+            for name, s in _stats.items()
+        }
+
+    for s in queries.values():
+        s.pop("max_seconds", None)
+
+    return {
+        "graph": GRAPH_NAME,
+        "pool_min": GRAPH_POOL_MIN,
+        "pool_max": GRAPH_POOL_MAX,
+        "pool_open": _pool is not None,
+        "queries": queries,
+    }
@@ -0,0 +1,48 @@
+# core/periodic.py
+
+from typing import Callable
+
+from core.logging_config import get_logger
+from core.worker import BackgroundWorker
+
+logger = get_logger("periodic")
+
+
+class PeriodicTask(BackgroundWorker):
+    """
+    Runs `fn` every `interval` seconds on a daemon thread.
+    Exceptions are logged and never kill the loop.
+    """
+
+    stop_timeout = 5.0
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        interval: float,
+        run_immediately: bool = True,
+    ):
+        super().__init__(name)
+
+        self.fn = fn
+        self.interval = interval
+        self.run_immediately = run_immediately
+
+        self.runs = 0
+        self.failures = 0
+
+    def run_once(self):
+        try:
+            self.fn()
+            self.runs += 1
+        except Exception:
+            self.failures += 1
+            logger.exception(f"[PERIODIC] {self.name} failed")
+
+    def _run(self):
+        if self.run_immediately:
+            self.run_once()
+
+        while not self._stop.wait(self.interval):
+            self.run_once()
@@ -0,0 +1,112 @@
+# core/ttl_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache whose entries expire `ttl` seconds
+    after they were written. Least recently used entries are evicted
+    once `max_size` is exceeded.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ─────────────────────────────────────────
+    # LOOKUP
+    # ─────────────────────────────────────────
+    def _lookup(self, key: Hashable, now: float):
+        # Caller holds the lock; returns (found, value)
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            found, value = self._lookup(key, time.monotonic())
+        return value if found else default
+
+    def get_many(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+        """
+        Returns (key → value for live entries, keys missing or expired).
+        """
+        now = time.monotonic()
+        found: Dict[Hashable, Any] = {}
+        missing: List[Hashable] = []
+
+        with self._lock:
+            for key in keys:
+                hit, value = self._lookup(key, now)
+                if hit:
+                    found[key] = value
+                else:
+                    missing.append(key)
+
+        return found, missing
+
+    # ─────────────────────────────────────────
+    # STORE
+    # ─────────────────────────────────────────
+    def put(self, key: Hashable, value: Any):
+        self.put_many({key: value})
+
+    def put_many(self, items: Dict[Hashable, Any]):
+        expires_at = time.monotonic() + self.ttl
+
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ─────────────────────────────────────────
+    # METRICS
+    # ─────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,98 @@
+# core/worker.py
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from core.logging_config import get_logger
+
+logger = get_logger("worker")
+
+
+class BackgroundWorker(ABC):
+    """
+    Owns one daemon thread running `_run()` until `stop()`.
+
+    Subclasses implement `_run()` (loop until `self._stop` is set) and
+    may hook `_on_start()`, `_wake()` (interrupt a blocking wait) and
+    `_on_stop()` (final drain, runs after the thread has exited).
+
+    Producers call `ensure_started()`; it does nothing once `stop()`
+    has run, so late calls during shutdown cannot revive the worker
+    after its final drain. An explicit `start()` clears that.
+    """
+
+    stop_timeout = 10.0
+
+    def __init__(self, name: str):
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Serializes start/stop; reentrant so hooks may call start()
+        self._lifecycle_lock = threading.RLock()
+        self._stopped = False
+
+    # ─────────────────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────────────────
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        with self._lifecycle_lock:
+            self._stopped = False
+            if self.running:
+                return
+
+            self._on_start()
+
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=self.name,
+                daemon=True,
+            )
+            self._thread.start()
+            logger.info(f"[WORKER] {self.name} started")
+
+    def ensure_started(self):
+        # Lazy start for producers called before the startup hook
+        if self._thread or self._stopped:
+            return
+
+        with self._lifecycle_lock:
+            if self._thread or self._stopped:
+                return
+            self.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._lifecycle_lock:
+            self._stopped = True
+            self._stop.set()
+            self._wake()
+
+            if self._thread:
+                self._thread.join(timeout=self.stop_timeout if timeout is None else timeout)
+                self._thread = None
+
+            self._on_stop()
+            logger.info(f"[WORKER] {self.name} stopped")
+
+    # ─────────────────────────────────────────
+    # HOOKS
+    # ─────────────────────────────────────────
+    def _on_start(self):
+        pass
+
+    def _wake(self):
+        pass
+
+    def _on_stop(self):
+        pass
+
+    @abstractmethod
+    def _run(self):
+        """
+        Worker loop; must return once `self._stop` is set.
+        """
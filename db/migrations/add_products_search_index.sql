@@ -0,0 +1,20 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Weighted full-text document: name/sku (A) > description (B)
+ALTER TABLE products
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(sku, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_vector
+    ON products USING GIN (search_vector);
+
+-- Substring (ILIKE '%q%') and typo (%) matching on short fields
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm
+    ON products USING GIN (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_products_sku_trgm
+    ON products USING GIN (sku gin_trgm_ops);
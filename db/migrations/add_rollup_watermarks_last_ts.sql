@@ -0,0 +1,2 @@
+ALTER TABLE rollup_watermarks
+    ADD COLUMN IF NOT EXISTS last_ts TIMESTAMP;
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS product_co_purchase (
+    product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+
+    neighbour_ids INTEGER[] NOT NULL,
+    scores FLOAT[] NOT NULL,
+
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,21 @@
+CREATE TABLE IF NOT EXISTS product_engagement_stats (
+    product_id INTEGER PRIMARY KEY REFERENCES products(id),
+
+    impressions INTEGER NOT NULL DEFAULT 0,
+    clicks INTEGER NOT NULL DEFAULT 0,
+    carts INTEGER NOT NULL DEFAULT 0,
+    purchases INTEGER NOT NULL DEFAULT 0,
+
+    decayed_impressions FLOAT NOT NULL DEFAULT 0.0,
+    decayed_clicks FLOAT NOT NULL DEFAULT 0.0,
+    decayed_carts FLOAT NOT NULL DEFAULT 0.0,
+    decayed_purchases FLOAT NOT NULL DEFAULT 0.0,
+
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
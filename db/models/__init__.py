@@ -11,3 +11,5 @@ from .notification import *
 from .location import *
 from .wishlist_item import WishlistItem
 from .search_log import SearchLog
+from .product_engagement_stats import ProductEngagementStats, RollupWatermark
+from .product_co_purchase import ProductCoPurchase
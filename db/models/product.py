@@ -32,6 +32,12 @@ class Product(Base):
     is_deleted = Column(Boolean, default=False)
 
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(
+        DateTime,
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
+    )
 
     # relationships
     category = relationship("Category", back_populates="products")
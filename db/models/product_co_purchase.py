@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+
+from core.database import Base
+
+
+class ProductCoPurchase(Base):
+    """
+    Top-K "frequently bought together" neighbours per product,
+    written by services/co_purchase.build_co_purchase().
+
+    neighbour_ids[i] pairs with scores[i], sorted by score desc.
+    """
+
+    __tablename__ = "product_co_purchase"
+
+    product_id = Column(
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    neighbour_ids = Column(ARRAY(Integer), nullable=False)
+    scores = Column(ARRAY(Float), nullable=False)
+
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from core.database import Base
+
+
+class ProductEngagementStats(Base):
+    """
+    Per-product rollup of search_logs, read by the ranking layer.
+
+    Raw counters are exact; decayed_* counters are exponentially
+    decayed (see ENGAGEMENT_HALF_LIFE_DAYS) as of updated_at.
+    """
+
+    __tablename__ = "product_engagement_stats"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+
+    impressions = Column(Integer, nullable=False, default=0)
+    clicks = Column(Integer, nullable=False, default=0)
+    carts = Column(Integer, nullable=False, default=0)
+    purchases = Column(Integer, nullable=False, default=0)
+
+    decayed_impressions = Column(Float, nullable=False, default=0.0)
+    decayed_clicks = Column(Float, nullable=False, default=0.0)
+    decayed_carts = Column(Float, nullable=False, default=0.0)
+    decayed_purchases = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class RollupWatermark(Base):
+    """
+    Last processed position per incremental job.
+    Id-keyed jobs use last_id; timestamp-keyed jobs use (last_ts, last_id).
+    """
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    last_ts = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,162 @@
+# embeddings/batcher.py
+#
+# Dynamic micro-batching: concurrent single-text encodes are gathered
+# for a few milliseconds and run as one forward pass.
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import List
+
+from core.logging_config import get_logger
+from embeddings.registry import encode
+
+logger = get_logger("embedding_batcher")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "64"))
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "3"))
+# Upper bound on a blocking embed() wait, so a stuck worker cannot
+# hang request threads forever
+EMBED_RESULT_TIMEOUT = float(os.getenv("EMBED_RESULT_TIMEOUT", "30"))
+
+
+class MicroBatcher:
+    """
+    Collects texts from any number of threads / coroutines and encodes
+    them in batches of up to `max_batch`, waiting at most `max_wait_ms`
+    after the first text arrives. Each caller gets its own Future.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_batch: int = EMBED_BATCH_MAX,
+        max_wait_ms: float = EMBED_BATCH_WAIT_MS,
+        **encode_kwargs,
+    ):
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.encode_kwargs = encode_kwargs
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+
+    # ─────────────────────────────────────────
+    # CALLER SIDE
+    # ─────────────────────────────────────────
+    def submit(self, text: str) -> Future:
+        if not (self._thread and self._thread.is_alive()):
+            self._start()
+
+        fut: Future = Future()
+        self._queue.put((text or "", fut))
+        return fut
+
+    def embed(self, text: str) -> List[float]:
+        return self.submit(text).result(timeout=EMBED_RESULT_TIMEOUT)
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        # All submitted at once → they land in the same few batches
+        futures = [self.submit(t) for t in texts]
+        return [f.result(timeout=EMBED_RESULT_TIMEOUT) for f in futures]
+
+    # ─────────────────────────────────────────
+    # WORKER
+    # ─────────────────────────────────────────
+    def _start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"embed-batcher:{self.model_name.rsplit('/', 1)[-1]}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Drop callers that gave up (asyncio cancellation cancels the
+        # wrapped Future); the rest can no longer be cancelled
+        return [(text, fut) for text, fut in batch if fut.set_running_or_notify_cancel()]
+
+    @staticmethod
+    def _resolve(fut: Future, result=None, error: BaseException = None):
+        try:
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _run(self):
+        while True:
+            try:
+                self._run_batch()
+            except Exception:
+                # Never let one bad batch kill the worker
+                logger.exception("[BATCHER] Batch failed")
+
+    def _run_batch(self):
+        batch = self._collect()
+        if not batch:
+            return
+
+        texts = [text for text, _ in batch]
+
+        try:
+            vectors = encode(
+                self.model_name,
+                texts,
+                batch_size=len(texts),
+                **self.encode_kwargs,
+            )
+        except Exception as e:
+            logger.exception(f"[BATCHER] Encode of {len(texts)} texts failed")
+            for _, fut in batch:
+                self._resolve(fut, error=e)
+            return
+
+        for (_, fut), vec in zip(batch, vectors):
+            self._resolve(fut, vec.tolist())
+
+        self.batches += 1
+        self.items += len(batch)
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (
+                round(self.items / self.batches, 2) if self.batches else 0.0
+            ),
+            "max_batch_size": self.max_seen_batch,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
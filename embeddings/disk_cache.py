@@ -0,0 +1,211 @@
+# embeddings/disk_cache.py
+#
+# Persistent, content-addressed embedding cache.
+# Key = (model variant, sha256(text)), value = float32 vector BLOB.
+# The variant (registry.model_variant) includes the backend, so
+# fp32 and int8 vectors of one model are cached apart.
+# SQLite in WAL mode, so every worker process shares one file.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Callable, List, Optional
+
+from core.logging_config import get_logger
+
+logger = get_logger("embedding_disk_cache")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "storage/embedding_cache.sqlite3")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "500000"))
+
+# Check size every N inserts; evict least recently used 10% when over
+EVICT_CHECK_EVERY = 1000
+EVICT_FRACTION = 0.1
+# Only bump last_used on hits when it is older than this (saves writes)
+TOUCH_AFTER_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    key BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used);
+"""
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class EmbeddingDiskCache:
+    def __init__(
+        self,
+        path: str = EMBED_CACHE_PATH,
+        max_entries: int = EMBED_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inserts = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers and a writer overlap
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    # ─────────────────────────────────────────
+    # LOOKUP / STORE
+    # ─────────────────────────────────────────
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = self.key(text)
+        row = self._conn().execute(
+            "SELECT vector, last_used FROM embeddings WHERE model = ? AND key = ?",
+            (model, key),
+        ).fetchone()
+
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = int(time.time())
+        if now - row[1] > TOUCH_AFTER_SECONDS:
+            self._conn().execute(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                (now, model, key),
+            )
+
+        with self._lock:
+            self.hits += 1
+        return _unpack(row[0])
+
+    def put(self, model: str, text: str, vector: List[float]):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO embeddings (model, key, vector, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (model, self.key(text), _pack(vector), int(time.time())),
+        )
+
+        with self._lock:
+            self._inserts += 1
+            check = self._inserts % EVICT_CHECK_EVERY == 0
+
+        if check:
+            self._evict()
+
+    def get_or_compute(
+        self,
+        model: str,
+        text: str,
+        compute: Callable[[str], List[float]],
+    ) -> List[float]:
+        try:
+            vector = self.get(model, text)
+        except sqlite3.Error:
+            logger.exception("[EMBED-CACHE] Read failed")
+            vector = None
+
+        if vector is not None:
+            return vector
+
+        vector = compute(text)
+
+        try:
+            self.put(model, text, vector)
+        except sqlite3.Error:
+            logger.exception("[EMBED-CACHE] Write failed")
+
+        return vector
+
+    # ─────────────────────────────────────────
+    # EVICTION
+    # ─────────────────────────────────────────
+    def _evict(self):
+        conn = self._conn()
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        if count <= self.max_entries:
+            return
+
+        n = int(count - self.max_entries + self.max_entries * EVICT_FRACTION)
+        conn.execute(
+            "DELETE FROM embeddings WHERE (model, key) IN ("
+            "SELECT model, key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (n,),
+        )
+
+        with self._lock:
+            self.evictions += n
+        logger.info(f"[EMBED-CACHE] Evicted {n} entries (had {count})")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache: Optional[EmbeddingDiskCache] = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> Optional[EmbeddingDiskCache]:
+    """
+    Process-wide cache instance, or None when disabled / unavailable.
+    """
+    global _cache, _cache_failed
+
+    if not EMBED_CACHE_ENABLED or _cache_failed:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None and not _cache_failed:
+                try:
+                    _cache = EmbeddingDiskCache()
+                except Exception:
+                    logger.exception("[EMBED-CACHE] Disabled: could not open cache")
+                    _cache_failed = True
+    return _cache
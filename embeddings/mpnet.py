@@ -1,23 +1,41 @@
 # embeddings/mpnet.py
 
-from sentence_transformers import SentenceTransformer
+from embeddings.batcher import MicroBatcher
+from embeddings.disk_cache import get_disk_cache
+from embeddings.registry import MPNET, encode, get_model as _get_model, model_variant
+
+# Shared by fact ingestion, chat memory and /embed
+batcher = MicroBatcher(MPNET, normalize_embeddings=True)
 
-_MODEL = None
 
 def get_model():
-    global _MODEL
-    if _MODEL is None:
-        _MODEL = SentenceTransformer(
-            "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
-        )
-    return _MODEL
+    return _get_model(MPNET)
 
 
 def embed_text(text: str) -> list[float]:
-    model = get_model()
-    vec = model.encode(text, normalize_embeddings=True)
-    return vec.tolist()
+    return batcher.embed(text)
+
+
+def embed_canonical(text: str) -> list[float]:
+    """
+    For canonical strings that repeat across chats and restarts
+    (facts like "user.name = Ahmed", summaries): served from the
+    persistent disk cache, encoded only on first sight.
+    """
+    cache = get_disk_cache()
+    if cache is None:
+        return embed_text(text)
+
+    return cache.get_or_compute(model_variant(MPNET), text, embed_text)
 
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
-    return [embed_text(t) for t in texts]
+    return batcher.embed_many(texts)
+
+
+def embed_texts_bulk(texts: list[str], batch_size: int = 64) -> list[list[float]]:
+    """
+    Direct batched encode for large lists (bypasses the micro-batcher).
+    """
+    vecs = encode(MPNET, texts, batch_size=batch_size, normalize_embeddings=True)
+    return vecs.tolist()
@@ -0,0 +1,185 @@
+# embeddings/registry.py
+#
+# One place that owns sentence-transformer models.
+# Each model is loaded once per process, on first use.
+
+import os
+import threading
+import time
+
+from core.logging_config import get_logger
+
+logger = get_logger("embedding_registry")
+
+# ─────────────────────────────────────────────
+# MODELS
+# ─────────────────────────────────────────────
+MINILM = "sentence-transformers/all-MiniLM-L6-v2"
+MPNET = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# "torch"     → default PyTorch backend
+# "onnx"      → ONNX Runtime (fp32)
+# "onnx-int8" → ONNX Runtime with dynamic int8 quantization (CPU)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") or None
+
+# Where quantized exports are written (reused across restarts / workers)
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "storage/onnx_models")
+# avx512_vnni / avx512 / avx2 / arm64
+ONNX_QUANT_CONFIG = os.getenv("ONNX_QUANT_CONFIG", "avx2")
+
+_models = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _load_onnx_int8(name: str):
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    local_dir = os.path.join(ONNX_CACHE_DIR, name.replace("/", "__"))
+    file_name = f"onnx/model_qint8_{ONNX_QUANT_CONFIG}.onnx"
+
+    if not os.path.exists(os.path.join(local_dir, file_name)):
+        logger.info(f"[EMBED] Exporting int8 ONNX for {name} → {local_dir}")
+        model = SentenceTransformer(name, backend="onnx")
+        model.save_pretrained(local_dir)
+        export_dynamic_quantized_onnx_model(
+            model,
+            ONNX_QUANT_CONFIG,
+            local_dir,
+        )
+
+    return SentenceTransformer(
+        local_dir,
+        backend="onnx",
+        model_kwargs={"file_name": file_name},
+    )
+
+
+def _load(name: str, backend: str):
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx-int8":
+        return _load_onnx_int8(name)
+
+    if backend == "onnx":
+        return SentenceTransformer(name, backend="onnx")
+
+    return SentenceTransformer(name, device=EMBEDDING_DEVICE)
+
+
+def get_model(name: str = MINILM, backend: str = EMBEDDING_BACKEND):
+    """
+    Returns the shared model instance, loading it on first call.
+    Falls back to the torch backend if the ONNX path is unavailable
+    (e.g. optimum / onnxruntime not installed).
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(name)
+        if model is not None:
+            return model
+
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+
+        try:
+            model = _load(name, backend)
+            used_backend = backend
+        except Exception:
+            if backend == "torch":
+                raise
+            logger.exception(f"[EMBED] {backend} load failed for {name} → torch")
+            model = _load(name, "torch")
+            used_backend = "torch"
+
+        load_seconds = time.perf_counter() - started
+
+        _models[name] = model
+        _stats[name] = {
+            "backend": used_backend,
+            "dimension": model.get_sentence_embedding_dimension(),
+            "load_seconds": round(load_seconds, 3),
+            "rss_delta_bytes": max(0, _rss_bytes() - rss_before),
+            "batches": 0,
+            "texts": 0,
+            "encode_seconds": 0.0,
+            "max_batch_seconds": 0.0,
+        }
+
+        logger.info(
+            f"[EMBED] Loaded {name} | backend={used_backend}, "
+            f"{load_seconds:.2f}s"
+        )
+        return model
+
+
+def model_variant(name: str) -> str:
+    """
+    Name of the vectors `name` produces in this process: model plus the
+    backend it actually loaded with (after any fallback) and, for int8,
+    the quantization config. Persistent caches key on this so fp32 and
+    int8 vectors never mix.
+    """
+    get_model(name)
+    backend = _stats[name]["backend"]
+    if backend == "onnx-int8":
+        backend = f"{backend}:{ONNX_QUANT_CONFIG}"
+    return f"{name}@{backend}"
+
+
+def encode(name: str, texts, **kwargs):
+    """
+    model.encode() with per-batch latency accounting.
+    Accepts a single string or a list, like SentenceTransformer.encode.
+    """
+    model = get_model(name)
+
+    started = time.perf_counter()
+    vectors = model.encode(texts, **kwargs)
+    elapsed = time.perf_counter() - started
+
+    count = 1 if isinstance(texts, str) else len(texts)
+
+    with _lock:
+        s = _stats[name]
+        s["batches"] += 1
+        s["texts"] += count
+        s["encode_seconds"] += elapsed
+        s["max_batch_seconds"] = max(s["max_batch_seconds"], elapsed)
+
+    return vectors
+
+
+def model_stats() -> dict:
+    with _lock:
+        out = {}
+        for name, s in _stats.items():
+            out[name] = {
+                **s,
+                "encode_seconds": round(s["encode_seconds"], 4),
+                "avg_batch_ms": (
+                    round(s["encode_seconds"] / s["batches"] * 1000, 3)
+                    if s["batches"] else 0.0
+                ),
+                "max_batch_seconds": round(s["max_batch_seconds"], 4),
+            }
+        return {
+            "backend": EMBEDDING_BACKEND,
+            "rss_bytes": _rss_bytes(),
+            "models": out,
+        }
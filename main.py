@@ -19,12 +19,29 @@ from routers import (
     product_images,
     categories,
     search,
+    recommendations,
 )
 
 from routers.embeddings import router as embeddings_router
 from ws.seller_agent_ws import router as seller_agent_ws_router
 from ws.seller_metrics_ws import router as seller_metrics_ws_router
 from geo_routing.routers import routing, poi
+from services.search_log_writer import search_log_writer
+from services.engagement_stats import engagement_rollup
+from services.ranking_feature_store import RANKING_FEATURE_STORE, feature_store_refresher
+from services.product_index_queue import product_index_queue
+from core.graph_db import close_graph_pool
+from services.co_purchase import co_purchase_refresher
+from services.popularity_index import popularity_refresher
+from services.user_profiles import USER_PROFILES_ENABLED, user_profile_updater
+from services.graph_ingest.bought_with_ingest import (
+    BOUGHT_WITH_INGEST_PERIODIC,
+    bought_with_ingest,
+)
+from services.similar_products_store import (
+    SIMILAR_STORE_ENABLED,
+    similar_products_refresher,
+)
 
 
 # ─────────────────────────────────────────────
@@ -64,6 +81,41 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# ─────────────────────────────────────────────
+# BACKGROUND WORKERS
+# ─────────────────────────────────────────────
+@app.on_event("startup")
+def start_background_workers():
+    search_log_writer.start()
+    engagement_rollup.start()
+    if RANKING_FEATURE_STORE:
+        feature_store_refresher.start()
+    product_index_queue.start()
+    if SIMILAR_STORE_ENABLED:
+        similar_products_refresher.start()
+    if BOUGHT_WITH_INGEST_PERIODIC:
+        bought_with_ingest.start()
+    co_purchase_refresher.start()
+    popularity_refresher.start()
+    if USER_PROFILES_ENABLED:
+        user_profile_updater.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    engagement_rollup.stop()
+    feature_store_refresher.stop()
+    product_index_queue.stop()
+    similar_products_refresher.stop()
+    bought_with_ingest.stop()
+    co_purchase_refresher.stop()
+    popularity_refresher.stop()
+    user_profile_updater.stop()
+    # Drain buffered impressions before the process exits
+    search_log_writer.stop()
+    close_graph_pool()
+
+
 # ─────────────────────────────────────────────
 # ROUTERS
 # ─────────────────────────────────────────────
@@ -79,6 +131,7 @@ app.include_router(sellers.router, prefix="/api/sellers", tags=["sellers"])
 
 app.include_router(product_images.router)
 app.include_router(categories.router, prefix="/api/categories", tags=["categories"])
+app.include_router(recommendations.router, prefix="/api/recommendations", tags=["recommendations"])
 app.include_router(agent_session_router)
 app.include_router(seller_metrics_ws_router)
 app.include_router(seller_agent_ws_router)
@@ -1,6 +1,6 @@
 # memory/conversation_ingest.py
 
-from embeddings.mpnet import embed_text
+from embeddings.mpnet import embed_canonical, embed_text
 from llm.summarizer import summarize, should_summarize
 from vectorstore.qdrant_writer import upsert_chat_memory
 
@@ -13,11 +13,12 @@ def ingest_user_message(
     if should_summarize(user_text):
         text_for_embedding = summarize(user_text)
         mode = "summarized"
+        embedding = embed_canonical(text_for_embedding)
     else:
+        # Raw messages rarely repeat: keep them out of the disk cache
         text_for_embedding = user_text
         mode = "full"
-
-    embedding = embed_text(text_for_embedding)
+        embedding = embed_text(text_for_embedding)
 
     upsert_chat_memory(
         chat_id=chat_id,
@@ -36,7 +37,7 @@ def ingest_ai_response(
     ai_text: str,
 ):
     summary = summarize(ai_text)
-    embedding = embed_text(summary)
+    embedding = embed_canonical(summary)
 
     upsert_chat_memory(
         chat_id=chat_id,
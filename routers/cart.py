@@ -6,6 +6,8 @@ from core.database import get_db
 from db import models
 from schemas import schemas
 from services.auth import get_current_user
+from services.engagement_stats import record_engagement
+from services.user_profiles import user_profile_updater
 
 router = APIRouter()
 
@@ -97,6 +99,8 @@ def add_to_cart(
         db.refresh(new_item)
         updated_item = new_item
 
+    user_profile_updater.record(current_user.id, [cart_item.product_id], "cart")
+
     # Ranking signal: added_to_cart
     log = (
         db.query(models.SearchLog)
@@ -105,8 +109,9 @@ def add_to_cart(
         .first()
     )
 
-    if log:
+    if log and not log.added_to_cart:
         log.added_to_cart = True
+        record_engagement(db, log.product_id, carts=1)
         db.commit()
 
     return _sanitize_cart_items([updated_item])[0]
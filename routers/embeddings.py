@@ -1,30 +1,65 @@
+import json
+import os
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
 
-from embeddings.mpnet import embed_texts
+from embeddings.mpnet import embed_texts, embed_texts_bulk, batcher
+from embeddings.registry import MPNET, model_stats
+from embeddings.disk_cache import get_disk_cache
+from services.vector_service import batcher as search_batcher
 
 router = APIRouter(prefix="/embed", tags=["embeddings"])
 
+# Lists longer than this skip the micro-batcher and encode in bulk
+EMBED_BULK_THRESHOLD = int(os.getenv("EMBED_BULK_THRESHOLD", "64"))
+EMBED_STREAM_CHUNK = int(os.getenv("EMBED_STREAM_CHUNK", "256"))
+
 class EmbedRequest(BaseModel):
     texts: List[str]
+    stream: bool = False
 
 class EmbedResponse(BaseModel):
     embeddings: List[List[float]]
     dimension: int
     model: str
 
+
+def _stream_chunks(texts: List[str]):
+    """
+    NDJSON: one line per chunk → {"offset", "embeddings"}.
+    """
+    for offset in range(0, len(texts), EMBED_STREAM_CHUNK):
+        chunk = texts[offset:offset + EMBED_STREAM_CHUNK]
+        yield json.dumps({
+            "offset": offset,
+            "embeddings": embed_texts_bulk(chunk),
+        }) + "\n"
+
+
 @router.post(
     "",
     response_model=EmbedResponse,
     include_in_schema=False
 )
 def embed(req: EmbedRequest):
-    embeddings = embed_texts(req.texts)
+    if req.stream:
+        return StreamingResponse(
+            _stream_chunks(req.texts),
+            media_type="application/x-ndjson",
+        )
+
+    if len(req.texts) > EMBED_BULK_THRESHOLD:
+        embeddings = embed_texts_bulk(req.texts)
+    else:
+        embeddings = embed_texts(req.texts)
+
     return {
         "embeddings": embeddings,
         "dimension": len(embeddings[0]) if embeddings else 0,
-        "model": "paraphrase-multilingual-mpnet-base-v2"
+        "model": MPNET.rsplit("/", 1)[-1]
     }
 
 @router.get(
@@ -33,3 +68,19 @@ def embed(req: EmbedRequest):
 )
 def health():
     return {"status": "ok"}
+
+@router.get(
+    "/models",
+    include_in_schema=False
+)
+def models():
+    cache = get_disk_cache()
+    return {
+        **model_stats(),
+        # MiniLM: product search queries; mpnet: /embed + chat memory
+        "batchers": {
+            "search": search_batcher.stats(),
+            "memory": batcher.stats(),
+        },
+        "disk_cache": cache.stats() if cache else None,
+    }
@@ -3,6 +3,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from core.database import get_db
 from core.redis import redis_client
+from core.graph_db import graph_stats
+from services.graph_service import graph_score_cache
+from services.product_index_queue import product_index_queue
+from services.similar_products_store import similar_products_store
+from services.co_purchase import co_purchase_index
+from services.geo_cells import geo_cell_cache
+from services.popularity_index import popularity_index
+from services.user_profiles import user_profile_updater
 import redis   # <-- THIS was missing
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -38,3 +46,38 @@ def redis_health():
             "redis": "error",
             "detail": str(e)
         }
+
+
+@router.get("/index-queue")
+def index_queue_health():
+    return product_index_queue.stats()
+
+
+@router.get("/similar-products")
+def similar_products_health():
+    return similar_products_store.stats()
+
+
+@router.get("/graph")
+def graph_health():
+    return {**graph_stats(), "score_cache": graph_score_cache.stats()}
+
+
+@router.get("/co-purchase")
+def co_purchase_health():
+    return co_purchase_index.stats()
+
+
+@router.get("/geo-cells")
+def geo_cells_health():
+    return geo_cell_cache.stats()
+
+
+@router.get("/user-profiles")
+def user_profiles_health():
+    return user_profile_updater.stats()
+
+
+@router.get("/popularity")
+def popularity_health():
+    return popularity_index.stats()
@@ -8,6 +8,8 @@ from db import models
 from schemas import schemas
 from services.auth import get_current_user
 from services.orders_service import create_order_db
+from services.engagement_stats import record_engagement
+from services.user_profiles import user_profile_updater
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -74,8 +76,11 @@ def create_order(
                 .first()
             )
 
-            if log:
+            if log and not log.purchased:
                 log.purchased = True
+                record_engagement(db, log.product_id, purchases=1)
+
+        purchased_ids = [item.product_id for item in cart_items]
 
         db.query(models.CartItem).filter(
             models.CartItem.user_id == current_user.id
@@ -83,6 +88,8 @@ def create_order(
 
         db.commit()
 
+        user_profile_updater.record(current_user.id, purchased_ids, "purchase")
+
         return (
             db.query(models.Order)
             .filter(models.Order.id == order_id)
@@ -1,12 +1,18 @@
 # routers/products.py
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import or_, text
+from sqlalchemy import text
 
 from core.database import get_db
 from db import models
+from services.product_search import (
+    apply_ilike_search,
+    apply_lexical_search,
+    hybrid_search_products,
+    resolve_search_mode,
+)
 
 router = APIRouter()
 
@@ -22,41 +28,59 @@ def get_products(
     seller_id: Optional[int] = None,
     is_active: Optional[bool] = True,
     search: Optional[str] = None,
+    search_mode: Optional[str] = Query(None, pattern="^(ilike|lexical|hybrid)$"),
     db: Session = Depends(get_db),
 ):
     query = (
         db.query(models.Product)
-        .options(selectinload(models.Product.images))
         .filter(models.Product.is_deleted.is_(False))
     )
 
     if is_active is not None:
         query = query.filter(models.Product.is_active == is_active)
 
+    category_ids = None
     if category_id:
         if include_children:
             child_ids = db.execute(
                 text("SELECT id FROM product_categories WHERE parent_id = :pid"),
                 {"pid": category_id},
             ).fetchall()
-            ids = [category_id] + [c.id for c in child_ids]
-            query = query.filter(models.Product.category_id.in_(ids))
+            category_ids = [category_id] + [c.id for c in child_ids]
+            query = query.filter(models.Product.category_id.in_(category_ids))
         else:
+            category_ids = [category_id]
             query = query.filter(models.Product.category_id == category_id)
 
     if seller_id:
         query = query.filter(models.Product.seller_id == seller_id)
 
-    if search:
-        query = query.filter(
-            or_(
-                models.Product.name.ilike(f"%{search}%"),
-                models.Product.description.ilike(f"%{search}%"),
-                models.Product.sku.ilike(f"%{search}%"),
-            )
+    mode = resolve_search_mode(db, search_mode) if search else None
+
+    if search and mode == "hybrid":
+        products = hybrid_search_products(
+            query,
+            search,
+            skip,
+            limit,
+            category_ids=category_ids,
+            seller_id=seller_id,
+            is_active=is_active,
         )
 
-    products = query.offset(skip).limit(limit).all()
+    else:
+        if search:
+            if mode == "ilike":
+                query = apply_ilike_search(query, search)
+            else:
+                query = apply_lexical_search(query, search)
+
+        products = (
+            query.options(selectinload(models.Product.images))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
     return [
         {
@@ -0,0 +1,44 @@
+# routers/recommendations.py
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from core.database import get_db
+from db import models
+from services.auth import get_current_user
+from services.co_purchase import get_bought_together
+from services.recommendation_service import get_batch_recommendations
+from services.user_profiles import recommend_for_user
+
+router = APIRouter()
+
+
+class BatchRecommendationRequest(BaseModel):
+    product_ids: List[int] = Field(..., min_length=1, max_length=100)
+    limit: int = Field(10, ge=1, le=50)
+
+
+@router.get("/products/{product_id}/bought-together")
+def bought_together(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    return get_bought_together(db, product_id, limit)
+
+
+@router.post("/products/batch")
+def batch_recommendations(
+    payload: BatchRecommendationRequest,
+):
+    return get_batch_recommendations(payload.product_ids, payload.limit)
+
+
+@router.get("/me")
+def recommendations_for_me(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: models.User = Depends(get_current_user),
+):
+    return recommend_for_user(current_user.id, limit)
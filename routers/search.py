@@ -1,56 +1,76 @@
 from typing import Optional
 from fastapi import APIRouter, Query, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from core.database import get_db
-from services.vector_service import search_products
+from services.vector_service import search_products_async, query_cache, SEARCH_MODE
 from services.ranking_feature_builder import rank_results
+from services.search_log_writer import search_log_writer, SEARCH_LOG_ASYNC
+from services.engagement_stats import record_engagement
+from services.ranking_feature_store import feature_store, RANKING_FEATURE_STORE
 from db import models
 
 router = APIRouter()
 
 
+def _log_impressions_inline(db: Session, q: str, ranked_results):
+    for item in ranked_results:
+        try:
+            log = models.SearchLog(
+                query=q,
+                product_id=item["id"],
+                clicked=False,
+                added_to_cart=False,
+                purchased=False,
+            )
+            db.add(log)
+        except Exception:
+            continue
+
+    db.commit()
+
+
 @router.get("/search")
-def search_products_api(
+async def search_products_api(
     q: str = Query(...),
     category_id: Optional[int] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
+    mode: Optional[str] = Query(None, pattern="^(dense|hybrid)$"),
     db: Session = Depends(get_db),
 ):
-    # Step 1: Vector search
-    results = search_products(
+    # Step 1: Vector search (micro-batched encoder, async Qdrant)
+    results = await search_products_async(
         query=q,
         category_id=category_id,
         min_price=min_price,
         max_price=max_price,
+        mode=mode or SEARCH_MODE,
     )
 
     if not results:
         return []
 
     # Step 2: Ranking layer
-    ranked_results = rank_results(
-        db,
-        q,
-        results,
-    )
+    # Warm feature store → pure in-memory scoring, no need to leave the loop
+    if (
+        RANKING_FEATURE_STORE
+        and feature_store.loaded
+        and not feature_store.missing(r["id"] for r in results)
+    ):
+        ranked_results = feature_store.score(results)
+    else:
+        ranked_results = await run_in_threadpool(rank_results, db, q, results)
 
     # Step 3: Log impressions for training
-    for item in ranked_results:
-        try:
-            log = models.SearchLog(
-                query=q,
-                product_id=item["id"],
-                clicked=False,
-                added_to_cart=False,
-                purchased=False,
-            )
-            db.add(log)
-        except Exception:
-            continue
-
-    db.commit()
+    if SEARCH_LOG_ASYNC:
+        search_log_writer.log_impressions(
+            q,
+            [item["id"] for item in ranked_results],
+        )
+    else:
+        await run_in_threadpool(_log_impressions_inline, db, q, ranked_results)
 
     return ranked_results
 
@@ -61,20 +81,45 @@ def track_search_click(
     product_id: int,
     db: Session = Depends(get_db),
 ):
-    log = (
-        db.query(models.SearchLog)
-        .filter(
-            models.SearchLog.query == query,
-            models.SearchLog.product_id == product_id,
+    def _latest_log():
+        return (
+            db.query(models.SearchLog)
+            .filter(
+                models.SearchLog.query == query,
+                models.SearchLog.product_id == product_id,
+            )
+            .order_by(models.SearchLog.id.desc())
+            .first()
         )
-        .order_by(models.SearchLog.id.desc())
-        .first()
-    )
+
+    log = _latest_log()
+
+    # Impression may still be sitting in the write buffer
+    if not log and SEARCH_LOG_ASYNC and search_log_writer.flush():
+        log = _latest_log()
 
     if not log:
         return {"message": "No search log found"}
 
-    log.clicked = True
+    if not log.clicked:
+        log.clicked = True
+        record_engagement(db, product_id, clicks=1)
+
     db.commit()
 
     return {"message": "Click tracked"}
+
+
+@router.get("/search/cache/stats")
+def search_cache_stats():
+    return query_cache.stats()
+
+
+@router.get("/search/logs/stats")
+def search_log_stats():
+    return search_log_writer.stats()
+
+
+@router.get("/search/features/stats")
+def search_feature_store_stats():
+    return feature_store.stats()
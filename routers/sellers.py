@@ -9,7 +9,7 @@ from core.database import get_db
 from db import models
 from schemas import schemas
 from services.auth import get_current_user
-from services.product_vector_ingest import index_product
+from services.product_vector_ingest import schedule_index_product
 from services.product_image_service import handle_product_image_upload
 
 router = APIRouter()
@@ -110,7 +110,7 @@ async def create_product(
 
         db.commit()  # ⬅️ ONE SINGLE COMMIT for product + images
 
-        index_product(db, product.id)
+        schedule_index_product(db, product.id)
 
     except IntegrityError:
         db.rollback()
@@ -151,6 +151,7 @@ def update_product(
         raise HTTPException(status_code=404, detail="Product not found")
 
     update_data = payload.model_dump(exclude_unset=True)
+    changed_fields = set()
 
     if "category" in update_data:
         category_obj = (
@@ -162,15 +163,21 @@ def update_product(
         if not category_obj:
             raise HTTPException(status_code=400, detail="Invalid category")
 
+        if product.category_id != category_obj.id:
+            changed_fields.add("category_id")
         product.category_id = category_obj.id
         del update_data["category"]
 
     for field, value in update_data.items():
+        if getattr(product, field) != value:
+            changed_fields.add(field)
         setattr(product, field, value)
 
     db.commit()
     db.refresh(product)
-    index_product(db, product.id)
+
+    if changed_fields:
+        schedule_index_product(db, product.id, changed_fields)
 
     return product
 
@@ -198,6 +205,6 @@ def delete_product(
     product.is_active = False
     db.commit()
 
-    index_product(db, product.id)
+    schedule_index_product(db, product.id, {"is_active"})
 
     return {"message": "Product deleted successfully"}
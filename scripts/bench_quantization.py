@@ -0,0 +1,194 @@
+# scripts/bench_quantization.py
+#
+# Compares float32 vs quantized (int8 / binary) product collections:
+# recall@10 against exact search, query latency, and an estimate of
+# vector RAM per product (computed from the dimension, not measured).
+#
+# Needs a running Qdrant (local/embedded mode ignores quantization).
+#
+# Usage:
+#   python scripts/bench_quantization.py --quantization int8 --products 20000
+#   python scripts/bench_quantization.py --from-products-v1
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from qdrant_client.http import models as qmodels
+
+from services.vector_service import (
+    COLLECTION_NAME,
+    PRODUCT_VECTORS,
+    QUANTIZATION_OVERSAMPLING,
+    VECTOR_SIZE,
+    client,
+    create_products_collection,
+)
+
+K = 10
+BATCH = 512
+
+# Estimated bytes held in RAM per vector: dimension × element size.
+# Not measured from Qdrant; HNSW graph, payload and allocator overhead
+# are excluded.
+RAM_BYTES_PER_VECTOR = {
+    "none": VECTOR_SIZE * 4,
+    "int8": VECTOR_SIZE * 1,
+    "binary": VECTOR_SIZE // 8,
+}
+
+
+def synthetic_vectors(n: int, seed: int = 7) -> dict:
+    """
+    Clustered unit vectors per named vector (closer to real text
+    embeddings than uniform noise).
+    """
+    rng = np.random.default_rng(seed)
+    out = {}
+    for name in PRODUCT_VECTORS:
+        centers = rng.normal(size=(max(8, n // 200), VECTOR_SIZE))
+        assign = rng.integers(0, len(centers), size=n)
+        vecs = centers[assign] + 0.35 * rng.normal(size=(n, VECTOR_SIZE))
+        out[name] = (vecs / np.linalg.norm(vecs, axis=1, keepdims=True)).astype(np.float32)
+    return out
+
+
+def vectors_from_products_v1(limit: int) -> dict:
+    out = {name: [] for name in PRODUCT_VECTORS}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=COLLECTION_NAME,
+            limit=min(BATCH, limit),
+            offset=offset,
+            with_vectors=True,
+            with_payload=False,
+        )
+        for p in points:
+            for name in PRODUCT_VECTORS:
+                out[name].append(p.vector[name])
+        if offset is None or len(out[PRODUCT_VECTORS[0]]) >= limit:
+            break
+    return {k: np.asarray(v[:limit], dtype=np.float32) for k, v in out.items()}
+
+
+def seed(collection: str, vectors: dict):
+    n = len(vectors[PRODUCT_VECTORS[0]])
+    for start in range(0, n, BATCH):
+        end = min(start + BATCH, n)
+        client.upsert(
+            collection_name=collection,
+            points=[
+                qmodels.PointStruct(
+                    id=i,
+                    vector={name: vectors[name][i].tolist() for name in PRODUCT_VECTORS},
+                    payload={"product_id": i},
+                )
+                for i in range(start, end)
+            ],
+            wait=False,
+        )
+
+
+def wait_green(collection: str, timeout: float = 600):
+    started = time.time()
+    while time.time() - started < timeout:
+        info = client.get_collection(collection)
+        if info.status == qmodels.CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+    sys.exit(f"❌ {collection} not green after {timeout:.0f}s")
+
+
+def run_queries(collection: str, queries, params) -> tuple[list, list]:
+    ids, latencies = [], []
+    for q in queries:
+        t = time.perf_counter()
+        res = client.query_points(
+            collection_name=collection,
+            query=q.tolist(),
+            using="description_vector",
+            search_params=params,
+            limit=K,
+        )
+        latencies.append(time.perf_counter() - t)
+        ids.append([p.id for p in res.points])
+    return ids, latencies
+
+
+def recall(truth: list, got: list) -> float:
+    hits = sum(len(set(t) & set(g)) for t, g in zip(truth, got))
+    return hits / (K * len(truth))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quantization", choices=["int8", "binary"], default="int8")
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--from-products-v1", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep bench collections")
+    args = parser.parse_args()
+
+    vectors = (
+        vectors_from_products_v1(args.products)
+        if args.from_products_v1
+        else synthetic_vectors(args.products)
+    )
+    n = len(vectors[PRODUCT_VECTORS[0]])
+
+    rng = np.random.default_rng(11)
+    base = vectors["description_vector"][rng.integers(0, n, size=args.queries)]
+    queries = base + 0.1 * rng.normal(size=base.shape).astype(np.float32)
+
+    col_f32 = "bench_products_f32"
+    col_q = f"bench_products_{args.quantization}"
+
+    for col, quant in ((col_f32, "none"), (col_q, args.quantization)):
+        if client.collection_exists(col):
+            client.delete_collection(col)
+        create_products_collection(collection_name=col, quantization=quant)
+        seed(col, vectors)
+        wait_green(col)
+
+    truth, _ = run_queries(col_f32, queries, qmodels.SearchParams(exact=True))
+
+    rows = []
+    f32_ids, f32_lat = run_queries(col_f32, queries, None)
+    rows.append(("float32 (hnsw)", "none", f32_ids, f32_lat))
+
+    for label, rescore in (("rescore", True), ("no rescore", False)):
+        params = qmodels.SearchParams(
+            quantization=qmodels.QuantizationSearchParams(
+                ignore=False,
+                rescore=rescore,
+                oversampling=QUANTIZATION_OVERSAMPLING,
+            )
+        )
+        q_ids, q_lat = run_queries(col_q, queries, params)
+        rows.append((f"{args.quantization} ({label})", args.quantization, q_ids, q_lat))
+
+    print(f"\nproducts={n}, queries={len(queries)}, vectors/product={len(PRODUCT_VECTORS)}, dim={VECTOR_SIZE}\n")
+    print(f"{'index':<22}{'est. RAM B/prod':>16}{'recall@10':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, quant, ids, lat in rows:
+        lat_ms = np.asarray(lat) * 1000
+        print(
+            f"{label:<22}"
+            f"{RAM_BYTES_PER_VECTOR[quant] * len(PRODUCT_VECTORS):>16}"
+            f"{recall(truth, ids):>12.4f}"
+            f"{np.percentile(lat_ms, 50):>10.2f}"
+            f"{np.percentile(lat_ms, 95):>10.2f}"
+        )
+    print(
+        "\nest. RAM column = dimension × element size per vector, not measured; "
+        "quantized originals stay on disk."
+    )
+
+    if not args.keep:
+        client.delete_collection(col_f32)
+        client.delete_collection(col_q)
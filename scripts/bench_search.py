@@ -0,0 +1,290 @@
+# scripts/bench_search.py
+#
+# Offline /search benchmark: embedded Qdrant (":memory:" or a folder),
+# synthetic catalog with the four named vectors, replayed query mix.
+# Reports p50/p95/p99 and QPS per stage:
+#   embed → vector query → features → ranking → logging
+#
+# Usage:
+#   python scripts/bench_search.py --products 5000 --queries 2000
+#   python scripts/bench_search.py --mode hybrid --json out.json
+#   python scripts/bench_search.py --baseline out.json --max-regression 0.2
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--mode", choices=["dense", "hybrid"], default="dense")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--random-vectors", action="store_true", help="seed random vectors instead of encoding the catalog")
+    parser.add_argument("--database-url", help="sqlite URL for search_logs (default: fresh temp file)")
+    parser.add_argument("--qdrant-path", default=":memory:", help="embedded Qdrant storage (default: in memory)")
+    parser.add_argument("--json", help="write report to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json report")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# The bench drops/creates collections and writes search_logs: never
+# inherit DATABASE_URL / QDRANT_* from the shell. Must be set before
+# project modules are imported.
+if args.database_url and not args.database_url.startswith("sqlite"):
+    sys.exit("❌ --database-url must be a sqlite URL; the bench writes seed data")
+
+os.environ["DATABASE_URL"] = args.database_url or (
+    "sqlite:///" + tempfile.mkstemp(prefix="bench_search_", suffix=".sqlite3")[1]
+)
+os.environ["QDRANT_PATH"] = args.qdrant_path
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import numpy as np
+
+from core.database import engine
+from db import models
+from services.ranking_feature_store import RankingFeatureStore
+from services.search_log_writer import SearchLogWriter
+from services.vector_service import (
+    COLLECTION_NAME,
+    PRODUCT_VECTORS,
+    VECTOR_SIZE,
+    _points_to_results,
+    _query_kwargs,
+    build_search_filter,
+    client,
+    create_products_collection,
+    embed_query,
+    query_cache,
+    upsert_product_vectors,
+)
+
+STAGES = ("embed", "vector_query", "features", "ranking", "logging")
+
+ADJECTIVES = ["organic", "iced", "premium", "classic", "running", "leather", "wireless", "cotton", "spicy", "mini"]
+NOUNS = ["coffee", "shoe", "tea", "jacket", "headphones", "mug", "shirt", "bag", "chocolate", "lamp"]
+
+ProductRow = namedtuple(
+    "ProductRow",
+    "id price stock_quantity seller_rating seller_total_sales updated_at",
+)
+EngagementRow = namedtuple("EngagementRow", "product_id impressions clicks purchases updated_at")
+
+
+# ─────────────────────────────────────────────
+# CATALOG
+# ─────────────────────────────────────────────
+def synthetic_products(n: int, rng: random.Random):
+    for i in range(1, n + 1):
+        adj, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        yield SimpleNamespace(
+            id=i,
+            name=f"{adj} {noun} {i}",
+            description=f"A {adj} {noun} for everyday use. Item {i}.",
+            sku=f"SKU-{i}",
+            category_id=NOUNS.index(noun) + 1,
+            seller_id=rng.randint(1, max(1, n // 50)),
+            price=round(rng.uniform(1, 200), 2),
+            stock_quantity=rng.randint(0, 200),
+            is_active=rng.random() > 0.05,
+        )
+
+
+def seed_catalog(products, encode: bool, batch: int = 256):
+    if client.collection_exists(COLLECTION_NAME):
+        client.delete_collection(COLLECTION_NAME)
+    create_products_collection(quantization="none")
+
+    if encode:
+        for start in range(0, len(products), batch):
+            upsert_product_vectors(products[start:start + batch], wait=True)
+        return
+
+    # Random unit vectors: much faster to seed, latency-only runs
+    from qdrant_client.http import models as qmodels
+    from services.vector_service import product_payload
+
+    rng = np.random.default_rng(3)
+    for start in range(0, len(products), batch):
+        chunk = products[start:start + batch]
+        vecs = rng.normal(size=(len(chunk), len(PRODUCT_VECTORS), VECTOR_SIZE))
+        vecs /= np.linalg.norm(vecs, axis=2, keepdims=True)
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=[
+                qmodels.PointStruct(
+                    id=p.id,
+                    vector=dict(zip(PRODUCT_VECTORS, v.tolist())),
+                    payload=product_payload(p),
+                )
+                for p, v in zip(chunk, vecs)
+            ],
+        )
+
+
+def seed_feature_store(products, rng: random.Random) -> RankingFeatureStore:
+    store = RankingFeatureStore(capacity=len(products) + 1)
+    store._apply_products(
+        ProductRow(p.id, p.price, p.stock_quantity, rng.uniform(0, 5), rng.uniform(0, 1e5), None)
+        for p in products
+    )
+    store._apply_engagement(
+        EngagementRow(p.id, (imp := rng.randint(0, 1000)), rng.randint(0, imp // 5 + 1), rng.randint(0, imp // 20 + 1), None)
+        for p in products
+    )
+    store.loaded = True
+    return store
+
+
+def query_mix(n: int, rng: random.Random) -> list:
+    """
+    Zipf-ish: a few head queries dominate, long tail of rarer ones.
+    """
+    head = NOUNS
+    tail = [f"{a} {b}" for a in ADJECTIVES for b in NOUNS]
+    return [
+        rng.choice(head) if rng.random() < 0.7 else rng.choice(tail)
+        for _ in range(n)
+    ]
+
+
+# ─────────────────────────────────────────────
+# RUN
+# ─────────────────────────────────────────────
+def run(queries, store, writer, mode: str, limit: int, rng: random.Random):
+    timings = {stage: [] for stage in STAGES}
+    totals = []
+
+    for q in queries:
+        t0 = time.perf_counter()
+
+        vector = embed_query(q)
+        t1 = time.perf_counter()
+
+        query_filter = build_search_filter(
+            category_id=rng.choice([None, None, None, rng.randint(1, len(NOUNS))]),
+        )
+        response = client.query_points(
+            collection_name=COLLECTION_NAME,
+            with_payload=True,
+            **_query_kwargs(vector, mode, query_filter, limit),
+        )
+        results = _points_to_results(response.points)
+        t2 = time.perf_counter()
+
+        # Same path as ranking_feature_builder._rank_from_store, split so
+        # feature build (lookup + derived columns) and scoring time apart
+        store.missing(r["id"] for r in results)
+        by_id, known, X = store.features(results)
+        t3 = time.perf_counter()
+
+        ranked = store.rank(by_id, known, X)
+        t4 = time.perf_counter()
+
+        writer.log_impressions(q, [r["id"] for r in ranked])
+        t5 = time.perf_counter()
+
+        for stage, dt in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+            timings[stage].append(dt)
+        totals.append(t5 - t0)
+
+    return timings, totals
+
+
+def summarize(samples) -> dict:
+    ms = np.asarray(samples) * 1000
+    total = float(np.sum(samples))
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "qps": round(len(samples) / total, 1) if total else 0.0,
+    }
+
+
+def check_regressions(report: dict, baseline_path: str, max_regression: float) -> list:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    failures = []
+    for stage, stats in report["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or not base.get("p95_ms"):
+            continue
+        ratio = stats["p95_ms"] / base["p95_ms"] - 1
+        if ratio > max_regression:
+            failures.append(
+                f"{stage}: p95 {base['p95_ms']}ms → {stats['p95_ms']}ms (+{ratio:.0%})"
+            )
+    return failures
+
+
+if __name__ == "__main__":
+    rng = random.Random(args.seed)
+
+    products = list(synthetic_products(args.products, rng))
+
+    t = time.perf_counter()
+    seed_catalog(products, encode=not args.random_vectors)
+    seed_seconds = time.perf_counter() - t
+
+    store = seed_feature_store(products, rng)
+
+    models.SearchLog.__table__.create(engine, checkfirst=True)
+    writer = SearchLogWriter()
+    writer.start()
+
+    run(query_mix(args.warmup, rng), store, writer, args.mode, args.limit, rng)
+    query_cache.clear()
+
+    queries = query_mix(args.queries, rng)
+    timings, totals = run(queries, store, writer, args.mode, args.limit, rng)
+
+    t = time.perf_counter()
+    writer.stop()
+    flush_seconds = time.perf_counter() - t
+
+    report = {
+        "products": args.products,
+        "queries": args.queries,
+        "mode": args.mode,
+        "seed_seconds": round(seed_seconds, 2),
+        "stages": {stage: summarize(timings[stage]) for stage in STAGES},
+        "end_to_end": summarize(totals),
+        "query_cache": query_cache.stats(),
+        "search_log_writer": {**writer.stats(), "final_flush_seconds": round(flush_seconds, 3)},
+    }
+
+    print(f"\nproducts={args.products}  queries={args.queries}  mode={args.mode}\n")
+    print(f"{'stage':<15}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'QPS':>10}")
+    for stage, s in list(report["stages"].items()) + [("end_to_end", report["end_to_end"])]:
+        print(f"{stage:<15}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['qps']:>10}")
+    print(f"\nquery cache hit rate: {report['query_cache']['hit_rate']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    if args.baseline:
+        failures = check_regressions(report, args.baseline, args.max_regression)
+        if failures:
+            print("\n❌ Regressions:")
+            for line in failures:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✅ No regressions vs baseline")
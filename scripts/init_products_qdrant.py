@@ -0,0 +1,42 @@
+# scripts/init_products_qdrant.py
+#
+# Usage:
+#   python scripts/init_products_qdrant.py                     # create products_v1
+#   python scripts/init_products_qdrant.py --quantization int8 # create quantized
+#   python scripts/init_products_qdrant.py --enable int8       # quantize existing
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from services.vector_service import (
+    COLLECTION_NAME,
+    PRODUCTS_QUANTIZATION,
+    client,
+    create_products_collection,
+    enable_quantization,
+    ensure_payload_indexes,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quantization", choices=["none", "int8", "binary"], default=PRODUCTS_QUANTIZATION)
+    parser.add_argument("--enable", choices=["int8", "binary"], help="quantize an existing collection")
+    args = parser.parse_args()
+
+    if args.enable:
+        enable_quantization(args.enable)
+        print(f"✅ Quantization '{args.enable}' enabled on {COLLECTION_NAME}")
+        sys.exit(0)
+
+    if client.collection_exists(COLLECTION_NAME):
+        print(f"✅ Collection already exists: {COLLECTION_NAME}")
+    else:
+        create_products_collection(quantization=args.quantization)
+        print(f"🆕 Created collection: {COLLECTION_NAME} ({args.quantization})")
+
+    ensure_payload_indexes()
+    print("✅ Payload indexes ready")
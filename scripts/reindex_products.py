@@ -0,0 +1,28 @@
+# scripts/reindex_products.py
+#
+# Usage:
+#   python scripts/reindex_products.py            # delta since last run
+#   python scripts/reindex_products.py --full     # rebuild whole catalog
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from services.product_reindex import reindex_products, REINDEX_PAGE_SIZE
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed products into products_v1")
+    parser.add_argument("--full", action="store_true", help="ignore watermark, rebuild all")
+    parser.add_argument("--page-size", type=int, default=REINDEX_PAGE_SIZE)
+    parser.add_argument("--wait", action="store_true", help="wait for Qdrant to apply each batch")
+    args = parser.parse_args()
+
+    count = reindex_products(
+        full=args.full,
+        page_size=args.page_size,
+        wait=args.wait,
+    )
+    print(f"✅ Reindexed {count} products")
@@ -0,0 +1,288 @@
+# services/co_purchase.py
+#
+# "Frequently bought together" from order_items.
+# Offline: baskets → sparse order × product matrix → item-item
+# co-occurrence (Xᵀ·X) → normalized score → top-K per product,
+# persisted to product_co_purchase.
+# Online: neighbour lists held in memory, one dict lookup per product.
+
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from core.periodic import PeriodicTask
+
+logger = get_logger("co_purchase")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# "jaccard" → |A∩B| / |A∪B|
+# "lift"    → P(A,B) / (P(A)·P(B))
+CO_PURCHASE_METRIC = os.getenv("CO_PURCHASE_METRIC", "jaccard").lower()
+CO_PURCHASE_TOP_K = int(os.getenv("CO_PURCHASE_TOP_K", "20"))
+# Pairs bought together fewer times than this are noise
+CO_PURCHASE_MIN_COUNT = int(os.getenv("CO_PURCHASE_MIN_COUNT", "2"))
+CO_PURCHASE_REFRESH_INTERVAL = float(
+    os.getenv("CO_PURCHASE_REFRESH_INTERVAL", "300")
+)
+CO_PURCHASE_STREAM_BATCH = 50000
+CO_PURCHASE_WRITE_BATCH = 1000
+
+
+# ─────────────────────────────────────────────
+# OFFLINE BUILD
+# ─────────────────────────────────────────────
+def _basket_matrix(db: Session) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Binary order × product CSR matrix, streamed from order_items.
+    Returns (matrix, product ids by column).
+    """
+    rows = array("i")
+    cols = array("i")
+    columns: Dict[int, int] = {}
+
+    result = (
+        db.connection()
+        .execution_options(stream_results=True, yield_per=CO_PURCHASE_STREAM_BATCH)
+        .execute(text("SELECT order_id, product_id FROM order_items ORDER BY order_id"))
+    )
+
+    order_row = -1
+    last_order = None
+    for order_id, product_id in result:
+        if order_id != last_order:
+            order_row += 1
+            last_order = order_id
+        rows.append(order_row)
+        cols.append(columns.setdefault(product_id, len(columns)))
+
+    product_ids = np.fromiter(columns, dtype=np.int64, count=len(columns))
+
+    X = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (np.frombuffer(rows, dtype=np.int32), np.frombuffer(cols, dtype=np.int32))),
+        shape=(order_row + 1, len(columns)),
+    )
+    # Same product on several lines of one order counts once
+    X.data[:] = 1.0
+    return X, product_ids
+
+
+def compute_neighbours(
+    X: sparse.csr_matrix,
+    metric: str = CO_PURCHASE_METRIC,
+    top_k: int = CO_PURCHASE_TOP_K,
+    min_count: int = CO_PURCHASE_MIN_COUNT,
+) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Returns (column, neighbour columns, scores) per product with at least
+    one neighbour, neighbours sorted by score desc.
+    """
+    n_orders = X.shape[0]
+    item_counts = np.asarray(X.sum(axis=0)).ravel()
+
+    C = (X.T @ X).tocsr()
+    C.setdiag(0)
+    if min_count > 1:
+        C.data[C.data < min_count] = 0
+    C.eliminate_zeros()
+
+    out = []
+    for i in range(C.shape[0]):
+        start, end = C.indptr[i], C.indptr[i + 1]
+        if start == end:
+            continue
+
+        js = C.indices[start:end]
+        co = C.data[start:end].astype(np.float64)
+
+        if metric == "lift":
+            scores = co * n_orders / (item_counts[i] * item_counts[js])
+        else:
+            scores = co / (item_counts[i] + item_counts[js] - co)
+
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k)[:top_k]
+            js, scores = js[keep], scores[keep]
+
+        order = np.argsort(-scores, kind="stable")
+        out.append((i, js[order], scores[order]))
+
+    return out
+
+
+def build_co_purchase(db: Optional[Session] = None) -> int:
+    """
+    Full rebuild of product_co_purchase. Returns products written.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    started = time.perf_counter()
+
+    try:
+        X, product_ids = _basket_matrix(db)
+
+        if X.nnz == 0:
+            logger.info("[CO-PURCHASE] No orders yet")
+            return 0
+
+        neighbours = compute_neighbours(X)
+
+        payload = [
+            {
+                "pid": int(product_ids[i]),
+                "nids": [int(product_ids[j]) for j in js],
+                "scores": [round(float(s), 6) for s in scores],
+            }
+            for i, js, scores in neighbours
+        ]
+
+        # Swap the whole table in one transaction
+        db.execute(text("DELETE FROM product_co_purchase"))
+        for start in range(0, len(payload), CO_PURCHASE_WRITE_BATCH):
+            db.execute(
+                text("""
+                INSERT INTO product_co_purchase
+                    (product_id, neighbour_ids, scores, updated_at)
+                VALUES (:pid, :nids, :scores, now())
+                """),
+                payload[start:start + CO_PURCHASE_WRITE_BATCH],
+            )
+        db.commit()
+
+        logger.info(
+            f"[CO-PURCHASE] Built | orders={X.shape[0]}, products={X.shape[1]}, "
+            f"with_neighbours={len(payload)}, metric={CO_PURCHASE_METRIC}, "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+        return len(payload)
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        if own_session:
+            db.close()
+
+
+# ─────────────────────────────────────────────
+# ONLINE INDEX
+# ─────────────────────────────────────────────
+class CoPurchaseIndex:
+    """
+    product_co_purchase held in memory: pid → (neighbour ids, scores).
+    Reloaded wholesale and swapped in by reference.
+    """
+
+    def __init__(self):
+        self._table: Dict[int, Tuple[Tuple[int, ...], Tuple[float, ...]]] = {}
+        self._lock = threading.Lock()
+
+        self.loaded = False
+        self.reloads = 0
+        self.last_reload_at: Optional[float] = None
+
+    def reload(self, db: Optional[Session] = None):
+        own_session = db is None
+        db = db or SessionLocal()
+
+        try:
+            rows = db.execute(
+                text("SELECT product_id, neighbour_ids, scores FROM product_co_purchase")
+            ).fetchall()
+
+            table = {r.product_id: (tuple(r.neighbour_ids), tuple(r.scores)) for r in rows}
+
+            with self._lock:
+                self._table = table
+                self.loaded = True
+                self.reloads += 1
+                self.last_reload_at = time.time()
+
+        finally:
+            if own_session:
+                db.close()
+
+    def get(self, product_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+        nids, scores = self._table.get(product_id, ((), ()))
+        return list(zip(nids[:limit], scores[:limit]))
+
+    def stats(self) -> dict:
+        table = self._table
+        return {
+            "loaded": self.loaded,
+            "products": len(table),
+            "metric": CO_PURCHASE_METRIC,
+            "top_k": CO_PURCHASE_TOP_K,
+            "reloads": self.reloads,
+            "last_reload_at": self.last_reload_at,
+        }
+
+
+co_purchase_index = CoPurchaseIndex()
+
+co_purchase_refresher = PeriodicTask(
+    name="co-purchase-index",
+    fn=co_purchase_index.reload,
+    interval=CO_PURCHASE_REFRESH_INTERVAL,
+)
+
+
+def get_bought_together(db: Session, product_id: int, limit: int = 10) -> List[dict]:
+    """
+    Frequently bought together with `product_id`, best first.
+    """
+    if co_purchase_index.loaded:
+        pairs = co_purchase_index.get(product_id, limit)
+    else:
+        row = db.execute(
+            text("""
+            SELECT neighbour_ids, scores
+            FROM product_co_purchase
+            WHERE product_id = :pid
+            """),
+            {"pid": product_id},
+        ).fetchone()
+        pairs = list(zip(row.neighbour_ids, row.scores))[:limit] if row else []
+
+    if not pairs:
+        return []
+
+    products = {
+        r.id: r
+        for r in db.execute(
+            text("""
+            SELECT id, name, price
+            FROM products
+            WHERE id = ANY(:ids)
+              AND is_active = true
+              AND is_deleted = false
+            """),
+            {"ids": [pid for pid, _ in pairs]},
+        ).fetchall()
+    }
+
+    return [
+        {
+            "pid": pid,
+            "name": products[pid].name,
+            "price": float(products[pid].price),
+            "weight": round(float(score), 4),
+        }
+        for pid, score in pairs
+        if pid in products
+    ]
+
+
+if __name__ == "__main__":
+    build_co_purchase()
@@ -1,13 +1,8 @@
-from sentence_transformers import SentenceTransformer
+from embeddings.registry import MINILM, encode, get_model as _get_model
 
-_model = None
 
 def get_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-    return _model
+    return _get_model(MINILM)
 
 def embed(text: str):
-    model = get_model()
-    return model.encode(text).tolist()
+    return encode(MINILM, text).tolist()
@@ -0,0 +1,256 @@
+# services/engagement_stats.py
+
+import os
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from core.periodic import PeriodicTask
+
+logger = get_logger("engagement_stats")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+ENGAGEMENT_HALF_LIFE_DAYS = float(os.getenv("ENGAGEMENT_HALF_LIFE_DAYS", "14"))
+ENGAGEMENT_ROLLUP_INTERVAL = float(os.getenv("ENGAGEMENT_ROLLUP_INTERVAL", "30"))
+ENGAGEMENT_ROLLUP_BATCH = int(os.getenv("ENGAGEMENT_ROLLUP_BATCH", "100000"))
+# search_logs ids are handed out before commit, and several writers COPY
+# concurrently: a lower id can become visible after a higher one. Rows
+# younger than this are left for the next run so the watermark never
+# passes an id still in flight. Must exceed the longest writer transaction.
+ENGAGEMENT_ROLLUP_LAG_SECONDS = float(os.getenv("ENGAGEMENT_ROLLUP_LAG_SECONDS", "30"))
+
+WATERMARK_NAME = "search_logs.impressions"
+
+HALF_LIFE_SECONDS = ENGAGEMENT_HALF_LIFE_DAYS * 86400
+
+COUNTERS = ("impressions", "clicks", "carts", "purchases")
+
+
+def _decayed(col: str) -> str:
+    # Decay the stored value to now(), then add the delta
+    return (
+        f"decayed_{col} = s.decayed_{col} * power(0.5, "
+        f"extract(epoch FROM (now() - s.updated_at)) / :half_life) "
+        f"+ excluded.{col}"
+    )
+
+
+_ON_CONFLICT = (
+    "ON CONFLICT (product_id) DO UPDATE SET "
+    + ", ".join(f"{c} = s.{c} + excluded.{c}" for c in COUNTERS)
+    + ", "
+    + ", ".join(_decayed(c) for c in COUNTERS)
+    + ", updated_at = now()"
+)
+
+_INSERT_COLUMNS = (
+    "product_id, "
+    + ", ".join(COUNTERS)
+    + ", "
+    + ", ".join(f"decayed_{c}" for c in COUNTERS)
+    + ", updated_at"
+)
+
+
+# ─────────────────────────────────────────────
+# EVENT PATH (click / cart / purchase)
+# ─────────────────────────────────────────────
+def record_engagement(
+    db: Session,
+    product_id: int,
+    clicks: int = 0,
+    carts: int = 0,
+    purchases: int = 0,
+):
+    """
+    Adds engagement events to the rollup inside the caller's
+    transaction. Caller commits.
+    """
+    db.execute(
+        text(f"""
+        INSERT INTO product_engagement_stats AS s ({_INSERT_COLUMNS})
+        VALUES (
+            :pid, 0, :clicks, :carts, :purchases,
+            0, :clicks, :carts, :purchases, now()
+        )
+        {_ON_CONFLICT}
+        """),
+        {
+            "pid": product_id,
+            "clicks": clicks,
+            "carts": carts,
+            "purchases": purchases,
+            "half_life": HALF_LIFE_SECONDS,
+        },
+    )
+
+
+# ─────────────────────────────────────────────
+# DELTA JOB (impressions, keyed on search_logs.id)
+# ─────────────────────────────────────────────
+def refresh_engagement_stats(db: Optional[Session] = None) -> int:
+    """
+    Folds search_logs rows newer than the stored watermark into
+    product_engagement_stats. Returns number of log rows processed.
+
+    Only impressions are counted here; clicks/carts/purchases flip
+    flags on existing rows and are recorded via record_engagement().
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+
+    try:
+        db.execute(
+            text("""
+            INSERT INTO rollup_watermarks (name, last_id)
+            VALUES (:name, 0)
+            ON CONFLICT (name) DO NOTHING
+            """),
+            {"name": WATERMARK_NAME},
+        )
+
+        # Row lock serializes the job across workers
+        low = db.execute(
+            text("""
+            SELECT last_id FROM rollup_watermarks
+            WHERE name = :name
+            FOR UPDATE
+            """),
+            {"name": WATERMARK_NAME},
+        ).scalar() or 0
+
+        # Batch window starts at the first settled id above the
+        # watermark, not at the watermark itself, so an id gap wider
+        # than a batch (bulk delete, sequence jump) cannot stall it
+        high, rows = db.execute(
+            text("""
+            WITH settled AS (
+                SELECT id FROM search_logs
+                WHERE id > :low
+                  AND created_at < now() - make_interval(secs => :lag)
+            )
+            SELECT COALESCE(MAX(id), :low), COUNT(*) FROM settled
+            WHERE id < (SELECT MIN(id) FROM settled) + :batch
+            """),
+            {
+                "low": low,
+                "batch": ENGAGEMENT_ROLLUP_BATCH,
+                "lag": ENGAGEMENT_ROLLUP_LAG_SECONDS,
+            },
+        ).one()
+
+        if high <= low:
+            db.commit()
+            return 0
+
+        db.execute(
+            text(f"""
+            INSERT INTO product_engagement_stats AS s ({_INSERT_COLUMNS})
+            SELECT
+                product_id,
+                COUNT(*), 0, 0, 0,
+                COUNT(*), 0, 0, 0,
+                now()
+            FROM search_logs
+            WHERE id > :low AND id <= :high
+            GROUP BY product_id
+            {_ON_CONFLICT}
+            """),
+            {"low": low, "high": high, "half_life": HALF_LIFE_SECONDS},
+        )
+
+        db.execute(
+            text("""
+            UPDATE rollup_watermarks
+            SET last_id = :high, updated_at = now()
+            WHERE name = :name
+            """),
+            {"high": high, "name": WATERMARK_NAME},
+        )
+
+        db.commit()
+
+        logger.info(f"[ENGAGEMENT] Rolled up search_logs ids ({low}, {high}]")
+        return rows
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        if own_session:
+            db.close()
+
+
+def rebuild_engagement_stats(db: Optional[Session] = None):
+    """
+    Full recompute from search_logs (backfill / repair).
+    Decayed counters are seeded with the raw totals.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+
+    try:
+        max_id = db.execute(
+            text("SELECT COALESCE(MAX(id), 0) FROM search_logs")
+        ).scalar()
+
+        db.execute(text("DELETE FROM product_engagement_stats"))
+
+        db.execute(
+            text(f"""
+            INSERT INTO product_engagement_stats ({_INSERT_COLUMNS})
+            SELECT
+                product_id,
+                COUNT(*),
+                SUM(CASE WHEN clicked THEN 1 ELSE 0 END),
+                SUM(CASE WHEN added_to_cart THEN 1 ELSE 0 END),
+                SUM(CASE WHEN purchased THEN 1 ELSE 0 END),
+                COUNT(*),
+                SUM(CASE WHEN clicked THEN 1 ELSE 0 END),
+                SUM(CASE WHEN added_to_cart THEN 1 ELSE 0 END),
+                SUM(CASE WHEN purchased THEN 1 ELSE 0 END),
+                now()
+            FROM search_logs
+            WHERE id <= :max_id
+            GROUP BY product_id
+            """),
+            {"max_id": max_id},
+        )
+
+        db.execute(
+            text("""
+            INSERT INTO rollup_watermarks (name, last_id, updated_at)
+            VALUES (:name, :max_id, now())
+            ON CONFLICT (name) DO UPDATE
+            SET last_id = excluded.last_id, updated_at = now()
+            """),
+            {"name": WATERMARK_NAME, "max_id": max_id},
+        )
+
+        db.commit()
+        logger.info(f"[ENGAGEMENT] Rebuilt rollup up to search_logs.id={max_id}")
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        if own_session:
+            db.close()
+
+
+engagement_rollup = PeriodicTask(
+    name="engagement-rollup",
+    fn=refresh_engagement_stats,
+    interval=ENGAGEMENT_ROLLUP_INTERVAL,
+)
+
+
+if __name__ == "__main__":
+    rebuild_engagement_stats()
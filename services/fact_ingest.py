@@ -2,7 +2,7 @@
 
 from db.models.user_facts import insert_user_fact
 from vectorstore.qdrant_writer import upsert_user_fact   # ✅ FIXED: correct function
-from embeddings.mpnet import embed_text
+from embeddings.mpnet import embed_canonical
 
 
 def ingest_facts(
@@ -33,7 +33,7 @@ def ingest_facts(
 
         # 2️⃣ Embed canonical form
         embedding_text = f"user.{fact_key} = {fact_value}"
-        embedding = embed_text(embedding_text)
+        embedding = embed_canonical(embedding_text)
 
         # 3️⃣ Insert into Qdrant user_facts collection
         upsert_user_fact(
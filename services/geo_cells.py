@@ -0,0 +1,139 @@
+# services/geo_cells.py
+#
+# Geohash grid + per-cell cache of nearby candidate products.
+# Buyers in the same cell share one PostGIS lookup; each request then
+# only filters/scores the cached candidates for its exact location.
+
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.logging_config import get_logger
+from core.ttl_cache import TTLCache
+from utils.geohash import geohash_bounds, geohash_encode, haversine_m
+
+logger = get_logger("geo_cells")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# 5 ≈ 4.9km × 4.9km, 6 ≈ 1.2km × 0.6km, 7 ≈ 153m × 153m
+GEO_CELL_PRECISION = int(os.getenv("GEO_CELL_PRECISION", "6"))
+GEO_CELL_CACHE_SIZE = int(os.getenv("GEO_CELL_CACHE_SIZE", "5000"))
+GEO_CELL_CACHE_TTL = int(os.getenv("GEO_CELL_CACHE_TTL", "300"))
+# Closest-first cap per cell, keeps dense areas bounded
+GEO_CELL_MAX_CANDIDATES = int(os.getenv("GEO_CELL_MAX_CANDIDATES", "5000"))
+
+# ─────────────────────────────────────────────
+# CELL CACHE
+# ─────────────────────────────────────────────
+# (product_id, name, price, store_name, seller_lat, seller_lon)
+Candidate = Tuple[int, str, float, str, float, float]
+
+
+class GeoCellCache:
+    """
+    Bounded LRU + TTL cache of (cell, radius) → candidate products.
+
+    A cell's candidates are every active product whose seller lies within
+    radius + half the cell diagonal of the cell centre, so any buyer
+    inside the cell finds all sellers within `radius` of them.
+    """
+
+    def __init__(
+        self,
+        precision: int = GEO_CELL_PRECISION,
+        max_size: int = GEO_CELL_CACHE_SIZE,
+        ttl: int = GEO_CELL_CACHE_TTL,
+    ):
+        self.precision = precision
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def _load(self, db: Session, cell: str, radius: float) -> List[Candidate]:
+        lat_lo, lat_hi, lon_lo, lon_hi = geohash_bounds(cell)
+        c_lat, c_lon = (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+        half_diag = haversine_m(lat_lo, lon_lo, lat_hi, lon_hi) / 2
+
+        rows = db.execute(
+            text("""
+            SELECT
+                p.id   AS product_id,
+                p.name,
+                p.price,
+                s.store_name,
+                ST_Y(s.location::geometry) AS lat,
+                ST_X(s.location::geometry) AS lon
+            FROM sellers s
+            JOIN products p ON p.seller_id = s.id
+            WHERE
+                s.is_active = true
+                AND p.is_active = true
+                AND p.is_deleted = false
+                AND ST_DWithin(
+                    s.location,
+                    ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography,
+                    :reach
+                )
+            ORDER BY s.location <-> ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography
+            LIMIT :cap
+            """),
+            {
+                "lat": c_lat,
+                "lon": c_lon,
+                "reach": radius + half_diag,
+                "cap": GEO_CELL_MAX_CANDIDATES,
+            },
+        ).fetchall()
+
+        return [
+            (r.product_id, r.name, float(r.price), r.store_name, float(r.lat), float(r.lon))
+            for r in rows
+        ]
+
+    def candidates(
+        self,
+        db: Session,
+        lat: float,
+        lon: float,
+        radius: float,
+    ) -> List[Candidate]:
+        key = (geohash_encode(lat, lon, self.precision), radius)
+
+        found = self._cache.get(key)
+        if found is None:
+            found = self._load(db, key[0], radius)
+            self._cache.put(key, found)
+
+        return found
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        return {
+            "precision": self.precision,
+            "cells": stats.pop("size"),
+            **stats,
+        }
+
+
+geo_cell_cache = GeoCellCache()
+
+
+def buyer_coordinates(db: Session, buyer_id: int) -> Optional[Tuple[float, float]]:
+    row = db.execute(
+        text("""
+        SELECT
+            ST_Y(location::geometry) AS lat,
+            ST_X(location::geometry) AS lon
+        FROM users
+        WHERE id = :uid
+          AND location IS NOT NULL
+        """),
+        {"uid": buyer_id},
+    ).fetchone()
+
+    return (float(row.lat), float(row.lon)) if row else None
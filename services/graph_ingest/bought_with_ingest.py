@@ -1,79 +1,216 @@
-from psycopg2.extras import RealDictCursor
+import os
+import time
+from collections import Counter
+from itertools import permutations
+
+from core.graph_db import cypher, graph_connection
 from core.logging_config import get_logger
-from core.database import SessionLocal
+from core.periodic import PeriodicTask
 
 logger = get_logger("graph_ingest")
 
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# Orders per step; one step = one transaction (edges + watermark)
+BOUGHT_WITH_ORDER_BATCH = int(os.getenv("BOUGHT_WITH_ORDER_BATCH", "5000"))
+# Pairs per UNWIND statement
+BOUGHT_WITH_UNWIND_BATCH = int(os.getenv("BOUGHT_WITH_UNWIND_BATCH", "1000"))
+# Orders younger than this may still have in-flight lower ids → skip for now
+BOUGHT_WITH_LAG_SECONDS = int(os.getenv("BOUGHT_WITH_LAG_SECONDS", "60"))
+BOUGHT_WITH_INGEST_INTERVAL = float(os.getenv("BOUGHT_WITH_INGEST_INTERVAL", "300"))
+BOUGHT_WITH_INGEST_PERIODIC = (
+    os.getenv("BOUGHT_WITH_INGEST_PERIODIC", "false").lower() == "true"
+)
+
+WATERMARK_NAME = "orders.bought_with"
+
+_MERGE_EDGES = """
+    UNWIND $rows AS row
+    MATCH (a:Product), (b:Product)
+    WHERE a.pid = row.src AND b.pid = row.dst
+    MERGE (a)-[r:BOUGHT_WITH]->(b)
+    SET r.weight = coalesce(r.weight, 0) + row.freq
+    RETURN count(r) AS n
+"""
+
+
+def _pair_deltas(cur, low: int, high: int) -> Counter:
+    """
+    Co-purchase counts for orders in (low, high].
+    Each distinct product pair counts once per order, in both directions.
+    """
+    cur.execute(
+        """
+        SELECT order_id, array_agg(DISTINCT product_id) AS products
+        FROM order_items
+        WHERE order_id > %s AND order_id <= %s
+        GROUP BY order_id
+        """,
+        (low, high),
+    )
+
+    deltas: Counter = Counter()
+    for _, products in cur:
+        if len(products) > 1:
+            deltas.update(permutations(products, 2))
+    return deltas
+
+
+def _write_edges(conn, deltas: Counter) -> int:
+    rows = [
+        {"src": src, "dst": dst, "freq": freq}
+        for (src, dst), freq in deltas.items()
+    ]
+
+    written = 0
+    for start in range(0, len(rows), BOUGHT_WITH_UNWIND_BATCH):
+        result = cypher(
+            _MERGE_EDGES,
+            "n int",
+            params={"rows": rows[start:start + BOUGHT_WITH_UNWIND_BATCH]},
+            name="bought_with_unwind",
+            conn=conn,
+        )
+        written += result[0]["n"] if result else 0
+    return written
+
+
+def _ingest_step(conn) -> int:
+    """
+    Processes the next batch of orders after the watermark.
+    Edge writes and the watermark move commit together.
+    Returns the number of orders covered (0 = caught up).
+    """
+    conn.autocommit = False
 
-def ingest_bought_with():
-    logger.info("========== BOUGHT_WITH INGEST START ==========")
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO rollup_watermarks (name, last_id)
+                VALUES (%s, 0)
+                ON CONFLICT (name) DO NOTHING
+                """,
+                (WATERMARK_NAME,),
+            )
+
+            # Row lock serializes the job across workers
+            cur.execute(
+                "SELECT last_id FROM rollup_watermarks WHERE name = %s FOR UPDATE",
+                (WATERMARK_NAME,),
+            )
+            low = cur.fetchone()[0] or 0
+
+            cur.execute(
+                """
+                SELECT COALESCE(MAX(id), 0) FROM (
+                    SELECT id FROM orders
+                    WHERE id > %s
+                      AND created_at < now() - make_interval(secs => %s)
+                    ORDER BY id
+                    LIMIT %s
+                ) o
+                """,
+                (low, BOUGHT_WITH_LAG_SECONDS, BOUGHT_WITH_ORDER_BATCH),
+            )
+            high = cur.fetchone()[0]
 
-    db = SessionLocal()
+            if high <= low:
+                conn.rollback()
+                return 0
 
-    try:
-        raw_conn = db.get_bind().raw_connection()
-        raw_conn.autocommit = True
-        cur = raw_conn.cursor(cursor_factory=RealDictCursor)
-
-        # REQUIRED FOR AGE
-        cur.execute('SET search_path = ag_catalog, "$user", public;')
-
-        # ─────────────────────────────────────
-        # STEP 1: FETCH CO-PURCHASE PAIRS (SQL)
-        # ─────────────────────────────────────
-        cur.execute("""
-            SELECT
-                oi1.product_id AS src,
-                oi2.product_id AS dst,
-                COUNT(*)       AS freq
-            FROM order_items oi1
-            JOIN order_items oi2
-              ON oi1.order_id = oi2.order_id
-             AND oi1.product_id <> oi2.product_id
-            GROUP BY oi1.product_id, oi2.product_id
-        """)
-
-        pairs = cur.fetchall()
-        logger.info(f"[INGEST] Found {len(pairs)} co-purchase pairs")
-
-        # ─────────────────────────────────────
-        # STEP 2: WRITE VIA CTE (CRITICAL)
-        # ─────────────────────────────────────
-        for row in pairs:
-            src = row["src"]
-            dst = row["dst"]
-            freq = row["freq"]
-
-            sql = f"""
-            WITH cypher_write AS (
-                SELECT *
-                FROM cypher(
-                    'amesie_graph',
-                    $$
-                        MATCH (a:Product {{pid: {src}}})
-                        MATCH (b:Product {{pid: {dst}}})
-                        MERGE (a)-[r:BOUGHT_WITH]->(b)
-                        SET r.weight = coalesce(r.weight, 0) + {freq}
-                        RETURN a.pid, b.pid, r.weight
-                    $$
-                ) AS (src int, dst int, weight int)
+            deltas = _pair_deltas(cur, low, high)
+
+        written = _write_edges(conn, deltas)
+
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE rollup_watermarks
+                SET last_id = %s, updated_at = now()
+                WHERE name = %s
+                """,
+                (high, WATERMARK_NAME),
             )
-            SELECT 1;
-            """
 
-            cur.execute(sql)
-            logger.info(f"[EDGE] {src} → {dst} (+{freq})")
+        conn.commit()
 
-        cur.close()
-        raw_conn.close()
-        logger.info("========== BOUGHT_WITH INGEST END ==========")
+        logger.info(
+            f"[INGEST] Orders ({low}, {high}] | pairs={len(deltas)}, edges={written}"
+        )
+        return high - low
 
     except Exception:
-        logger.exception("[INGEST] BOUGHT_WITH FAILED")
+        conn.rollback()
+        raise
 
     finally:
-        db.close()
+        conn.autocommit = True
+
+
+def ingest_bought_with() -> int:
+    """
+    Folds orders placed since the last run into BOUGHT_WITH weights.
+    Runs step after step until caught up; returns orders processed.
+    """
+    logger.info("========== BOUGHT_WITH INGEST START ==========")
+
+    started = time.perf_counter()
+    total = 0
+
+    with graph_connection() as conn:
+        while True:
+            step = _ingest_step(conn)
+            if not step:
+                break
+            total += step
+
+    logger.info(
+        f"========== BOUGHT_WITH INGEST END | order id span={total}, "
+        f"{time.perf_counter() - started:.2f}s =========="
+    )
+    return total
+
+
+def rebuild_bought_with() -> int:
+    """
+    Drops every BOUGHT_WITH edge and replays all orders (backfill / repair).
+    """
+    with graph_connection() as conn:
+        cypher(
+            "MATCH ()-[r:BOUGHT_WITH]->() DELETE r RETURN count(*) AS n",
+            "n int",
+            name="bought_with_reset",
+            conn=conn,
+        )
+
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO rollup_watermarks (name, last_id, updated_at)
+                VALUES (%s, 0, now())
+                ON CONFLICT (name) DO UPDATE
+                SET last_id = 0, updated_at = now()
+                """,
+                (WATERMARK_NAME,),
+            )
+
+    logger.info("[INGEST] BOUGHT_WITH edges cleared, replaying orders")
+    return ingest_bought_with()
+
+
+bought_with_ingest = PeriodicTask(
+    name="bought-with-ingest",
+    fn=ingest_bought_with,
+    interval=BOUGHT_WITH_INGEST_INTERVAL,
+)
 
 
 if __name__ == "__main__":
-    ingest_bought_with()
+    import sys
+
+    if "--rebuild" in sys.argv:
+        rebuild_bought_with()
+    else:
+        ingest_bought_with()
@@ -1,54 +1,42 @@
-from psycopg2.extras import RealDictCursor
+import os
+from typing import Dict, Iterable, List
+
+from core.graph_db import cypher, graph_connection, GRAPH_NAME
 from core.logging_config import get_logger
+from core.ttl_cache import TTLCache
 
 logger = get_logger("graph")
 
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# Max ids per IN-list sent to AGE
+GRAPH_SCORE_CHUNK = int(os.getenv("GRAPH_SCORE_CHUNK", "500"))
+GRAPH_SCORE_CACHE_SIZE = int(os.getenv("GRAPH_SCORE_CACHE_SIZE", "100000"))
+GRAPH_SCORE_CACHE_TTL = int(os.getenv("GRAPH_SCORE_CACHE_TTL", "600"))
+
+
 def get_similar_products(db, product_id: int, limit: int = 5):
     logger.info(
         f"[GRAPH] Fetching recommendations | product_id={product_id}, limit={limit}"
     )
 
     try:
-        # 🔥 MUST disable prepared statements
-        raw_conn = db.get_bind().raw_connection()
-        raw_conn.autocommit = True
-
-        cur = raw_conn.cursor(cursor_factory=RealDictCursor)
-
-        # REQUIRED for Apache AGE
-        cur.execute('SET search_path = ag_catalog, "$user", public;')
-
-        sql = f"""
-        SELECT
-            pid,
-            name,
-            price,
-            weight
-        FROM cypher(
-            'amesie_graph',
-            $$
-                MATCH (a:Product {{pid: {product_id}}})-[r:SIMILAR]->(b:Product)
+        rows = cypher(
+            """
+                MATCH (a:Product {pid: $pid})-[r:SIMILAR]->(b:Product)
                 RETURN
                     b.pid    AS pid,
                     b.name   AS name,
                     b.price  AS price,
                     r.weight AS weight
                 ORDER BY r.weight DESC
-                LIMIT {limit}
-            $$
-        ) AS (
-            pid int,
-            name text,
-            price float,
-            weight float
-        );
-        """
-
-        cur.execute(sql)
-        rows = cur.fetchall()
-
-        cur.close()
-        raw_conn.close()
+                LIMIT $limit
+            """,
+            "pid int, name text, price float, weight float",
+            params={"pid": int(product_id), "limit": int(limit)},
+            name="similar_products",
+        )
 
         logger.info(f"[GRAPH] Found {len(rows)} recommendations")
         return rows
@@ -56,3 +44,124 @@ def get_similar_products(db, product_id: int, limit: int = 5):
     except Exception:
         logger.exception("[GRAPH] FAILED to fetch recommendations")
         return []
+
+
+def get_similar_products_many(product_ids: List[int], limit: int = 5) -> Dict[int, List[dict]]:
+    """
+    SIMILAR neighbours for many products in one query.
+    Returns pid → up to `limit` rows, best first.
+    """
+    if not product_ids:
+        return {}
+
+    rows = cypher(
+        """
+            MATCH (a:Product)-[r:SIMILAR]->(b:Product)
+            WHERE a.pid IN $ids
+            RETURN
+                a.pid    AS src,
+                b.pid    AS pid,
+                b.name   AS name,
+                b.price  AS price,
+                r.weight AS weight
+            ORDER BY r.weight DESC
+        """,
+        "src int, pid int, name text, price float, weight float",
+        params={"ids": [int(pid) for pid in product_ids]},
+        name="similar_products_many",
+    )
+
+    out: Dict[int, List[dict]] = {}
+    for r in rows:
+        bucket = out.setdefault(r.pop("src"), [])
+        if len(bucket) < limit:
+            bucket.append(r)
+    return out
+
+
+def iter_similar_edges(batch_size: int = 10000):
+    """
+    Streams every SIMILAR edge as (src, dst, name, price, weight).
+    Server-side cursor, so the full edge set is never buffered at once.
+    """
+    with graph_connection() as conn:
+        # WITH HOLD → named cursor works on an autocommit connection
+        cur = conn.cursor(name="similar_edges", withhold=True)
+        cur.itersize = batch_size
+
+        try:
+            cur.execute(f"""
+            SELECT src, dst, name, price, weight
+            FROM cypher(
+                '{GRAPH_NAME}',
+                $$
+                    MATCH (a:Product)-[r:SIMILAR]->(b:Product)
+                    RETURN
+                        a.pid    AS src,
+                        b.pid    AS dst,
+                        b.name   AS name,
+                        b.price  AS price,
+                        r.weight AS weight
+                $$
+            ) AS (
+                src int,
+                dst int,
+                name text,
+                price float,
+                weight float
+            );
+            """)
+
+            for row in cur:
+                yield row
+
+        finally:
+            cur.close()
+
+
+# ─────────────────────────────────────────────
+# GRAPH SCORES (max incoming SIMILAR weight)
+# ─────────────────────────────────────────────
+# pid → score. Products with no incoming edge are cached as 0.0 too,
+# so they are not asked for again until expiry.
+graph_score_cache = TTLCache(
+    max_size=GRAPH_SCORE_CACHE_SIZE,
+    ttl=GRAPH_SCORE_CACHE_TTL,
+)
+
+
+def _fetch_graph_scores(product_ids: List[int]) -> Dict[int, float]:
+    # Aggregated in AGE: one row per pid, not one per edge
+    rows = cypher(
+        """
+            MATCH (:Product)-[r:SIMILAR]->(b:Product)
+            WHERE b.pid IN $ids
+            RETURN b.pid AS pid, max(r.weight) AS score
+        """,
+        "pid int, score float",
+        params={"ids": product_ids},
+        name="graph_scores",
+    )
+    return {r["pid"]: float(r["score"] or 0.0) for r in rows}
+
+
+def get_graph_scores(product_ids: Iterable[int]) -> Dict[int, float]:
+    """
+    Max incoming SIMILAR weight per product.
+    Cached per pid; misses are fetched in chunks of GRAPH_SCORE_CHUNK.
+    """
+    ids = list(dict.fromkeys(int(pid) for pid in product_ids))
+    if not ids:
+        return {}
+
+    scores, missing = graph_score_cache.get_many(ids)
+
+    for start in range(0, len(missing), GRAPH_SCORE_CHUNK):
+        chunk = missing[start:start + GRAPH_SCORE_CHUNK]
+        fetched = _fetch_graph_scores(chunk)
+
+        chunk_scores = {pid: fetched.get(pid, 0.0) for pid in chunk}
+        graph_score_cache.put_many(chunk_scores)
+        scores.update(chunk_scores)
+
+    return scores
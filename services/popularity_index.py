@@ -0,0 +1,216 @@
+# services/popularity_index.py
+#
+# The single fallback for recommendations: popular products, global and
+# per category, held in memory and refreshed in the background.
+# Request-time fallbacks never query the database.
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from core.periodic import PeriodicTask
+
+logger = get_logger("popularity_index")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+POPULARITY_TOP_N = int(os.getenv("POPULARITY_TOP_N", "100"))
+POPULARITY_REFRESH_INTERVAL = float(os.getenv("POPULARITY_REFRESH_INTERVAL", "60"))
+
+# Decayed purchases first, engagement as a weaker signal,
+# newest listings break ties (covers products with no history)
+_SCORE_SQL = """
+    COALESCE(e.decayed_purchases, 0) * 3
+    + COALESCE(e.decayed_carts, 0)
+    + COALESCE(e.decayed_clicks, 0) * 0.2
+"""
+
+_RANKED_SQL = f"""
+    SELECT id, name, price, category_id, score, category_rank, global_rank
+    FROM (
+        SELECT
+            p.id,
+            p.name,
+            p.price,
+            p.category_id,
+            {_SCORE_SQL} AS score,
+            ROW_NUMBER() OVER (
+                PARTITION BY p.category_id
+                ORDER BY {_SCORE_SQL} DESC, p.created_at DESC, p.id DESC
+            ) AS category_rank,
+            ROW_NUMBER() OVER (
+                ORDER BY {_SCORE_SQL} DESC, p.created_at DESC, p.id DESC
+            ) AS global_rank
+        FROM products p
+        LEFT JOIN product_engagement_stats e ON e.product_id = p.id
+        WHERE p.is_active = true
+          AND p.is_deleted = false
+    ) ranked
+    WHERE category_rank <= :n OR global_rank <= :n
+    ORDER BY global_rank
+"""
+
+_CATEGORIES_SQL = """
+    SELECT id, category_id
+    FROM products
+    WHERE is_active = true
+      AND is_deleted = false
+"""
+
+# (pid, name, price, score)
+Entry = Tuple[int, str, float, float]
+
+
+class PopularityIndex:
+    """
+    Top-N popular products globally and per category, plus
+    product → category for every active product.
+    Rebuilt wholesale and swapped in by reference.
+    """
+
+    def __init__(self, top_n: int = POPULARITY_TOP_N):
+        self.top_n = top_n
+
+        self._global: Tuple[Entry, ...] = ()
+        self._by_category: Dict[int, Tuple[Entry, ...]] = {}
+        self._category_of: Dict[int, Optional[int]] = {}
+
+        self._refresh_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+        self.loaded = False
+        self.refreshes = 0
+        self.last_refresh_seconds = 0.0
+        self.last_refresh_at: Optional[float] = None
+
+    # ─────────────────────────────────────────
+    # BUILD
+    # ─────────────────────────────────────────
+    def refresh(self, db: Optional[Session] = None):
+        own_session = db is None
+        db = db or SessionLocal()
+        started = time.perf_counter()
+
+        try:
+            with self._refresh_lock:
+                ranked = db.execute(text(_RANKED_SQL), {"n": self.top_n}).fetchall()
+                categories = db.execute(text(_CATEGORIES_SQL)).fetchall()
+
+                global_list: List[Entry] = []
+                by_category: Dict[int, List[Entry]] = {}
+
+                for r in ranked:
+                    entry = (r.id, r.name, float(r.price or 0), float(r.score or 0))
+                    if r.global_rank <= self.top_n:
+                        global_list.append(entry)
+                    if r.category_rank <= self.top_n:
+                        by_category.setdefault(r.category_id, []).append(entry)
+
+                for entries in by_category.values():
+                    entries.sort(key=lambda e: -e[3])
+
+                self._global = tuple(global_list)
+                self._by_category = {c: tuple(v) for c, v in by_category.items()}
+                self._category_of = {r.id: r.category_id for r in categories}
+
+                self.loaded = True
+                self.refreshes += 1
+                self.last_refresh_seconds = time.perf_counter() - started
+                self.last_refresh_at = time.time()
+
+        finally:
+            if own_session:
+                db.close()
+
+    def _ensure_loaded(self):
+        # First call before the refresher ran: load once, synchronously.
+        # Re-checked under the lock so concurrent first requests share it
+        if self.loaded:
+            return
+        with self._load_lock:
+            if not self.loaded:
+                self.refresh()
+
+    # ─────────────────────────────────────────
+    # READ
+    # ─────────────────────────────────────────
+    def recommend(
+        self,
+        product_ids: Iterable[int],
+        limit: int = 5,
+    ) -> List[dict]:
+        """
+        Popular products from the categories of `product_ids`,
+        topped up from the global list; inputs are excluded.
+        """
+        self._ensure_loaded()
+
+        exclude = set(product_ids)
+        categories = list(dict.fromkeys(
+            self._category_of[pid] for pid in exclude if pid in self._category_of
+        ))
+
+        pools = [self._by_category.get(c, ()) for c in categories]
+        # Same-category pools sorted together so one busy category
+        # cannot hide a better item from another
+        if len(pools) > 1:
+            candidates = sorted((e for pool in pools for e in pool), key=lambda e: -e[3])
+        else:
+            candidates = list(pools[0]) if pools else []
+
+        results: List[dict] = []
+        seen = set(exclude)
+
+        for source in (candidates, self._global):
+            for pid, name, price, score in source:
+                if len(results) >= limit:
+                    return results
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                results.append({
+                    "pid": pid,
+                    "name": name,
+                    "price": price,
+                    "weight": 0.0,
+                })
+
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "top_n": self.top_n,
+            "global": len(self._global),
+            "categories": len(self._by_category),
+            "products": len(self._category_of),
+            "refreshes": self.refreshes,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3),
+            "last_refresh_at": self.last_refresh_at,
+        }
+
+
+popularity_index = PopularityIndex()
+
+popularity_refresher = PeriodicTask(
+    name="popularity-index",
+    fn=popularity_index.refresh,
+    interval=POPULARITY_REFRESH_INTERVAL,
+)
+
+
+def get_fallback_recommendations(
+    product_ids: Iterable[int],
+    limit: int = 5,
+) -> List[dict]:
+    """
+    Fallback for every recommendation path (graph empty / slow / off).
+    """
+    return popularity_index.recommend(product_ids, limit)
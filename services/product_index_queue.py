@@ -0,0 +1,230 @@
+# services/product_index_queue.py
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from core.worker import BackgroundWorker
+from db import models
+from services.vector_service import update_product_points
+
+logger = get_logger("product_index_queue")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+INDEX_QUEUE_ASYNC = os.getenv("INDEX_QUEUE_ASYNC", "true").lower() == "true"
+INDEX_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", "64"))
+# Small delay lets bursts of edits to one product coalesce
+INDEX_DEBOUNCE_SECONDS = float(os.getenv("INDEX_DEBOUNCE_SECONDS", "0.5"))
+INDEX_MAX_RETRIES = int(os.getenv("INDEX_MAX_RETRIES", "5"))
+INDEX_RETRY_BACKOFF = float(os.getenv("INDEX_RETRY_BACKOFF", "2.0"))
+
+
+class ProductIndexQueue(BackgroundWorker):
+    """
+    Deduplicating queue of product ids waiting for (re)indexing.
+
+    Writers call enqueue() after commit and return immediately.
+    A single worker thread batches pending ids, loads the current
+    rows and applies them via update_product_points(), retrying
+    failed batches with exponential backoff.
+
+    Changed fields are tracked per id so price/stock-only edits take
+    the payload-only path; unknown changes (None) force a full re-embed.
+    """
+
+    # Best-effort drain of pending ids on shutdown
+    stop_timeout = 30.0
+
+    def __init__(
+        self,
+        batch_size: int = INDEX_BATCH_SIZE,
+        debounce: float = INDEX_DEBOUNCE_SECONDS,
+    ):
+        super().__init__("product-index-queue")
+
+        self.batch_size = batch_size
+        self.debounce = debounce
+
+        # product_id → first enqueue time (monotonic)
+        self._pending: Dict[int, float] = {}
+        # product_id → changed fields (None = everything)
+        self._fields: Dict[int, Optional[Set[str]]] = {}
+        # product_id → attempts so far
+        self._attempts: Dict[int, int] = {}
+        # product_id → not before (monotonic), for retry backoff
+        self._not_before: Dict[int, float] = {}
+
+        self._cond = threading.Condition()
+
+        self.enqueued = 0
+        self.coalesced = 0
+        self.indexed = 0
+        self.full_reindexes = 0
+        self.partial_updates = 0
+        self.vectors_encoded = 0
+        self.retries = 0
+        self.failures = 0
+        self.last_lag = 0.0
+
+    # ─────────────────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────────────────
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _on_stop(self):
+        logger.info(f"[INDEX-QUEUE] Worker stopped | {self.stats()}")
+
+    # ─────────────────────────────────────────
+    # PRODUCER SIDE
+    # ─────────────────────────────────────────
+    def enqueue(
+        self,
+        product_id: int,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        self.ensure_started()
+
+        fields = set(fields) if fields is not None else None
+
+        with self._cond:
+            if product_id in self._pending:
+                self.coalesced += 1
+                current = self._fields.get(product_id)
+                self._fields[product_id] = (
+                    None if current is None or fields is None
+                    else current | fields
+                )
+            else:
+                self._pending[product_id] = time.monotonic()
+                self._fields[product_id] = fields
+                self.enqueued += 1
+            self._cond.notify()
+
+    # ─────────────────────────────────────────
+    # CONSUMER SIDE
+    # ─────────────────────────────────────────
+    def _take_batch(self) -> List[int]:
+        now = time.monotonic()
+        ready = [
+            pid
+            for pid, since in self._pending.items()
+            if now - since >= self.debounce
+            and self._not_before.get(pid, 0) <= now
+        ]
+        return ready[: self.batch_size]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+
+                if not batch:
+                    if self._stop.is_set():
+                        # Drain: ignore debounce / backoff on shutdown
+                        batch = list(self._pending)[: self.batch_size]
+                        if not batch:
+                            return
+                    else:
+                        self._cond.wait(timeout=self.debounce or 0.1)
+                        continue
+
+                enqueued_at = {pid: self._pending.pop(pid) for pid in batch}
+                fields = {pid: self._fields.pop(pid, None) for pid in batch}
+
+            self._process(batch, enqueued_at, fields)
+
+    def _process(
+        self,
+        batch: List[int],
+        enqueued_at: Dict[int, float],
+        fields: Dict[int, Optional[Set[str]]],
+    ):
+        db = SessionLocal()
+        try:
+            products = (
+                db.query(models.Product)
+                .filter(models.Product.id.in_(batch))
+                .all()
+            )
+            result = update_product_points(
+                [(p, fields.get(p.id)) for p in products]
+            )
+
+            now = time.monotonic()
+            with self._cond:
+                for pid in batch:
+                    self._attempts.pop(pid, None)
+                    self._not_before.pop(pid, None)
+                self.indexed += len(products)
+                self.full_reindexes += result["full"]
+                self.partial_updates += result["partial"]
+                self.vectors_encoded += result["vectors_encoded"]
+                self.last_lag = max(now - t for t in enqueued_at.values())
+
+        except Exception:
+            logger.exception(f"[INDEX-QUEUE] Batch of {len(batch)} failed")
+            self._retry(batch, enqueued_at)
+
+        finally:
+            db.close()
+
+    def _retry(self, batch: List[int], enqueued_at: Dict[int, float]):
+        now = time.monotonic()
+        with self._cond:
+            for pid in batch:
+                attempts = self._attempts.get(pid, 0) + 1
+
+                if attempts > INDEX_MAX_RETRIES:
+                    logger.error(f"[INDEX-QUEUE] Giving up on product {pid}")
+                    self._attempts.pop(pid, None)
+                    self._not_before.pop(pid, None)
+                    self.failures += 1
+                    continue
+
+                self._attempts[pid] = attempts
+                # Partial update may have failed on a missing point;
+                # retry as a full upsert
+                self._fields[pid] = None
+                self._not_before[pid] = now + INDEX_RETRY_BACKOFF ** attempts
+                # A newer enqueue may already be pending; keep the oldest time
+                self._pending[pid] = min(
+                    enqueued_at[pid],
+                    self._pending.get(pid, enqueued_at[pid]),
+                )
+                self.retries += 1
+
+            self._cond.notify()
+
+    # ─────────────────────────────────────────
+    # METRICS
+    # ─────────────────────────────────────────
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            oldest = min(self._pending.values(), default=None)
+            return {
+                "depth": len(self._pending),
+                "oldest_pending_seconds": (
+                    round(now - oldest, 3) if oldest is not None else 0.0
+                ),
+                "last_batch_lag_seconds": round(self.last_lag, 3),
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "indexed": self.indexed,
+                "full_reindexes": self.full_reindexes,
+                "partial_updates": self.partial_updates,
+                "vectors_encoded": self.vectors_encoded,
+                "retries": self.retries,
+                "failures": self.failures,
+                "running": self.running,
+            }
+
+
+product_index_queue = ProductIndexQueue()
@@ -0,0 +1,156 @@
+# services/product_reindex.py
+
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, text
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from db import models
+from services.vector_service import upsert_product_vectors
+
+logger = get_logger("product_reindex")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+REINDEX_PAGE_SIZE = int(os.getenv("REINDEX_PAGE_SIZE", "256"))
+
+# updated_at is set when the writing transaction starts, so a row can
+# commit after a run already moved the watermark past it. Incremental
+# runs restart this far behind the stored watermark; re-embedding a
+# product is idempotent.
+REINDEX_OVERLAP_SECONDS = int(os.getenv("REINDEX_OVERLAP_SECONDS", "30"))
+
+WATERMARK_NAME = "products_v1.reindex"
+
+
+def _load_watermark(db) -> tuple[Optional[datetime], int]:
+    row = db.execute(
+        text("SELECT last_ts, last_id FROM rollup_watermarks WHERE name = :name"),
+        {"name": WATERMARK_NAME},
+    ).fetchone()
+
+    if not row:
+        return None, 0
+
+    return row.last_ts, row.last_id or 0
+
+
+def _resume_point(
+    last_ts: Optional[datetime], last_id: int
+) -> tuple[Optional[datetime], int]:
+    if last_ts is None:
+        return None, last_id
+    return last_ts - timedelta(seconds=REINDEX_OVERLAP_SECONDS), 0
+
+
+def _save_watermark(db, last_ts: Optional[datetime], last_id: int):
+    db.execute(
+        text("""
+        INSERT INTO rollup_watermarks (name, last_id, last_ts, updated_at)
+        VALUES (:name, :last_id, :last_ts, now())
+        ON CONFLICT (name) DO UPDATE
+        SET last_id = excluded.last_id,
+            last_ts = excluded.last_ts,
+            updated_at = now()
+        """),
+        {"name": WATERMARK_NAME, "last_id": last_id, "last_ts": last_ts},
+    )
+    db.commit()
+
+
+def reindex_products(
+    full: bool = False,
+    page_size: int = REINDEX_PAGE_SIZE,
+    wait: bool = False,
+) -> int:
+    """
+    Streams products in (updated_at, id) order from the stored watermark
+    and re-embeds them page by page (one encode + one upsert per page).
+
+    Incremental runs start REINDEX_OVERLAP_SECONDS before the watermark
+    to catch rows whose transaction committed late.
+    full=True ignores the watermark and rebuilds the whole catalog.
+    Progress is saved after every page, so an interrupted run resumes.
+    Returns number of products indexed.
+    """
+    db = SessionLocal()
+    started = time.time()
+    total = 0
+
+    try:
+        stored = (None, 0) if full else _load_watermark(db)
+        last_ts, last_id = _resume_point(*stored)
+
+        logger.info(
+            f"[REINDEX] Start | full={full}, since=({last_ts}, {last_id}), "
+            f"page_size={page_size}"
+        )
+
+        while True:
+            query = db.query(models.Product)
+
+            if last_ts is not None:
+                # Keyset pagination on (updated_at, id)
+                query = query.filter(
+                    or_(
+                        models.Product.updated_at > last_ts,
+                        and_(
+                            models.Product.updated_at == last_ts,
+                            models.Product.id > last_id,
+                        ),
+                    )
+                )
+            elif last_id:
+                query = query.filter(
+                    or_(
+                        models.Product.updated_at.isnot(None),
+                        models.Product.id > last_id,
+                    )
+                )
+
+            page = (
+                query.order_by(
+                    models.Product.updated_at.asc().nullsfirst(),
+                    models.Product.id.asc(),
+                )
+                .limit(page_size)
+                .all()
+            )
+
+            if not page:
+                break
+
+            total += upsert_product_vectors(page, wait=wait)
+
+            last_ts, last_id = page[-1].updated_at, page[-1].id
+
+            # Pages inside the overlap window sit behind the stored
+            # watermark; don't move it back if the run stops there
+            if stored[0] is None or (
+                last_ts is not None and (last_ts, last_id) > stored
+            ):
+                _save_watermark(db, last_ts, last_id)
+
+            # Drop loaded rows, keep memory flat on big catalogs
+            db.expunge_all()
+
+            elapsed = time.time() - started
+            logger.info(
+                f"[REINDEX] {total} products | "
+                f"watermark=({last_ts}, {last_id}) | "
+                f"{total / elapsed if elapsed else 0:.1f} products/s"
+            )
+
+        logger.info(
+            f"[REINDEX] Done | products={total}, "
+            f"seconds={time.time() - started:.1f}"
+        )
+        return total
+
+    finally:
+        db.close()
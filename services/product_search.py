@@ -0,0 +1,219 @@
+# services/product_search.py
+
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy import desc, func, literal_column, or_, text
+from sqlalchemy.orm import Query, Session, selectinload
+
+from core.logging_config import get_logger
+from db import models
+
+logger = get_logger("product_search")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# "ilike"   → legacy substring scan
+# "lexical" → tsvector + pg_trgm (db/migrations/add_products_search_index.sql)
+# "hybrid"  → lexical ranking fused with Qdrant vector results
+# lexical/hybrid need that migration; without it they fall back to ilike
+PRODUCT_SEARCH_MODE = os.getenv("PRODUCT_SEARCH_MODE", "lexical").lower()
+# Hybrid asks each leg for (skip + limit) × this, since vector hits
+# can be dropped by the SQL filters afterwards
+HYBRID_OVERFETCH = int(os.getenv("HYBRID_OVERFETCH", "3"))
+HYBRID_MAX_ROUNDS = int(os.getenv("HYBRID_MAX_ROUNDS", "3"))
+
+TS_CONFIG = "english"
+RRF_K = 60
+
+search_vector = literal_column("products.search_vector")
+
+_search_vector_ready: Optional[bool] = None
+_search_vector_lock = threading.Lock()
+
+
+def _has_search_vector(db: Session) -> bool:
+    global _search_vector_ready
+
+    if _search_vector_ready is None:
+        with _search_vector_lock:
+            if _search_vector_ready is None:
+                _search_vector_ready = db.execute(
+                    text("""
+                    SELECT 1
+                    FROM information_schema.columns
+                    WHERE table_name = 'products'
+                      AND column_name = 'search_vector'
+                    """)
+                ).first() is not None
+
+                if not _search_vector_ready:
+                    logger.warning(
+                        "[PRODUCT-SEARCH] products.search_vector missing → ilike; "
+                        "run db/migrations/add_products_search_index.sql"
+                    )
+
+    return _search_vector_ready
+
+
+def resolve_search_mode(db: Session, mode: Optional[str]) -> str:
+    """
+    Requested mode, or PRODUCT_SEARCH_MODE; ilike when the
+    search_vector migration has not been applied.
+    """
+    mode = mode or PRODUCT_SEARCH_MODE
+    if mode in ("lexical", "hybrid") and not _has_search_vector(db):
+        return "ilike"
+    return mode
+
+
+def apply_ilike_search(query: Query, search: str) -> Query:
+    return query.filter(
+        or_(
+            models.Product.name.ilike(f"%{search}%"),
+            models.Product.description.ilike(f"%{search}%"),
+            models.Product.sku.ilike(f"%{search}%"),
+        )
+    )
+
+
+def apply_lexical_search(query: Query, search: str) -> Query:
+    """
+    Full-text match on the weighted search_vector, plus trigram
+    substring / typo match on name and sku. Every predicate is
+    GIN-indexed. Ordered by text rank + name similarity.
+    """
+    tsq = func.websearch_to_tsquery(TS_CONFIG, search)
+
+    return (
+        query.filter(
+            or_(
+                search_vector.op("@@")(tsq),
+                models.Product.name.ilike(f"%{search}%"),
+                models.Product.name.op("%")(search),
+                models.Product.sku.ilike(f"%{search}%"),
+            )
+        )
+        .order_by(
+            desc(
+                func.ts_rank_cd(search_vector, tsq)
+                + func.similarity(models.Product.name, search)
+            ),
+            models.Product.id.desc(),
+        )
+    )
+
+
+def rrf_merge(*rankings: List[int], k: int = RRF_K) -> List[int]:
+    """
+    Reciprocal rank fusion of ranked id lists.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, pid in enumerate(ranking):
+            scores[pid] = scores.get(pid, 0.0) + 1.0 / (k + rank + 1)
+
+    return sorted(scores, key=lambda pid: scores[pid], reverse=True)
+
+
+def hybrid_search_legs(
+    query: Query,
+    search: str,
+    depth: int,
+    category_ids: Optional[List[int]] = None,
+    seller_id=None,
+    is_active: Optional[bool] = True,
+) -> Tuple[List[int], List[int]]:
+    """
+    Lexical top-`depth` (with the caller's SQL filters applied) and
+    vector top-`depth` under the same category / seller / is_active
+    filters. Vector hits are still re-checked against the SQL filters
+    by the caller when loading rows.
+    """
+    lexical_ids = [
+        pid
+        for (pid,) in apply_lexical_search(
+            query.with_entities(models.Product.id),
+            search,
+        )
+        .limit(depth)
+        .all()
+    ]
+
+    vector_ids = []
+    try:
+        # Imported lazily: loads the encoder + Qdrant client
+        from services.vector_service import search_products
+
+        vector_ids = [
+            r["id"]
+            for r in search_products(
+                query=search,
+                category_ids=category_ids,
+                seller_id=seller_id,
+                is_active=is_active,
+                # The listing endpoint does not hide out-of-stock products
+                in_stock=False,
+                limit=depth,
+            )
+        ]
+    except Exception:
+        logger.exception("[PRODUCT-SEARCH] Vector leg failed → lexical only")
+
+    return lexical_ids, vector_ids
+
+
+def hybrid_search_ids(query: Query, search: str, depth: int, **filters) -> List[int]:
+    """
+    RRF fusion of the lexical and vector legs.
+    """
+    return rrf_merge(*hybrid_search_legs(query, search, depth, **filters))
+
+
+def hybrid_search_products(
+    query: Query,
+    search: str,
+    skip: int,
+    limit: int,
+    category_ids: Optional[List[int]] = None,
+    seller_id=None,
+    is_active: Optional[bool] = True,
+) -> list:
+    """
+    Page of hybrid results with the SQL filters of `query` applied.
+    Overfetches both legs and deepens until the page is full or
+    both legs run out.
+    """
+    want = skip + limit
+    depth = want * HYBRID_OVERFETCH
+    products = []
+
+    for _ in range(max(1, HYBRID_MAX_ROUNDS)):
+        lexical_ids, vector_ids = hybrid_search_legs(
+            query,
+            search,
+            depth=depth,
+            category_ids=category_ids,
+            seller_id=seller_id,
+            is_active=is_active,
+        )
+        fused_ids = rrf_merge(lexical_ids, vector_ids)
+
+        # Re-apply SQL filters to vector hits, keep fused order
+        rows = (
+            query.options(selectinload(models.Product.images))
+            .filter(models.Product.id.in_(fused_ids))
+            .all()
+        )
+        by_id = {p.id: p for p in rows}
+        products = [by_id[pid] for pid in fused_ids if pid in by_id]
+
+        # A leg that returned fewer than asked for has nothing more
+        exhausted = len(lexical_ids) < depth and len(vector_ids) < depth
+        if len(products) >= want or exhausted:
+            break
+        depth *= 2
+
+    return products[skip:want]
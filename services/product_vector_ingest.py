@@ -1,6 +1,8 @@
+from typing import Iterable, Optional
 from sqlalchemy.orm import Session
 from db import models
-from services.vector_service import upsert_product_vector
+from services.vector_service import upsert_product_vector, update_product_points
+from services.product_index_queue import product_index_queue, INDEX_QUEUE_ASYNC
 
 
 def index_product(db: Session, product_id: int):
@@ -14,3 +16,33 @@ def index_product(db: Session, product_id: int):
         return
 
     upsert_product_vector(product)
+
+
+def schedule_index_product(
+    db: Session,
+    product_id: int,
+    fields: Optional[Iterable[str]] = None,
+):
+    """
+    Post-commit hook for write paths: queues the product for the
+    background indexer (or indexes inline if INDEX_QUEUE_ASYNC=false).
+
+    `fields` = product columns that changed; None means unknown
+    (full re-embed). Payload-only fields skip the encoder entirely.
+    """
+    if INDEX_QUEUE_ASYNC:
+        product_index_queue.enqueue(product_id, fields)
+        return
+
+    product = (
+        db.query(models.Product)
+        .filter(models.Product.id == product_id)
+        .first()
+    )
+
+    if not product:
+        return
+
+    update_product_points(
+        [(product, set(fields) if fields is not None else None)]
+    )
@@ -0,0 +1,133 @@
+# services/query_embedding_cache.py
+
+import hashlib
+import os
+import re
+import threading
+from typing import Callable, List, Optional
+
+from core.cache import cache_get, cache_set
+from core.logging_config import get_logger
+from core.ttl_cache import TTLCache
+
+logger = get_logger("query_embedding_cache")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("QUERY_EMBED_CACHE_SIZE", "2048"))
+QUERY_EMBED_CACHE_TTL = int(os.getenv("QUERY_EMBED_CACHE_TTL", "3600"))  # seconds
+
+# Shared tier (Redis) — off by default, local LRU is enough per worker
+QUERY_EMBED_CACHE_SHARED = (
+    os.getenv("QUERY_EMBED_CACHE_SHARED", "false").lower() == "true"
+)
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _WS.sub(" ", (query or "").strip().lower())
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU + TTL cache of query vectors, optionally backed by
+    a shared Redis tier. Key = normalized query string.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = QUERY_EMBED_CACHE_SIZE,
+        ttl: int = QUERY_EMBED_CACHE_TTL,
+        shared: bool = QUERY_EMBED_CACHE_SHARED,
+    ):
+        self.model_name = model_name
+        self.ttl = ttl
+        self.shared = shared
+
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        self._lock = threading.Lock()
+
+        self.shared_hits = 0
+
+    # ─────────────────────────────────────────
+    # LOOKUP
+    # ─────────────────────────────────────────
+    def get(self, key: str) -> Optional[List[float]]:
+        vector = self._local.get(key)
+        if vector is not None:
+            return vector
+
+        if self.shared:
+            try:
+                vector = cache_get(self._shared_key(key))
+            except Exception:
+                logger.exception("[QEMB] Shared tier read failed")
+                vector = None
+
+            if vector:
+                self._local.put(key, vector)
+                with self._lock:
+                    self.shared_hits += 1
+                return vector
+
+        return None
+
+    def put(self, key: str, vector: List[float]):
+        self._local.put(key, vector)
+
+        if self.shared:
+            try:
+                cache_set(self._shared_key(key), vector, ttl=self.ttl)
+            except Exception:
+                logger.exception("[QEMB] Shared tier write failed")
+
+    def get_or_compute(
+        self,
+        query: str,
+        compute: Callable[[str], List[float]],
+    ) -> List[float]:
+        key = normalize_query(query)
+
+        vector = self.get(key)
+        if vector is not None:
+            return vector
+
+        vector = compute(key)
+        self.put(key, vector)
+        return vector
+
+    # ─────────────────────────────────────────
+    # INTERNALS
+    # ─────────────────────────────────────────
+    def _shared_key(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"qemb:{self.model_name}:{digest}"
+
+    # ─────────────────────────────────────────
+    # METRICS
+    # ─────────────────────────────────────────
+    def stats(self) -> dict:
+        local = self._local.stats()
+        with self._lock:
+            shared_hits = self.shared_hits
+
+        # Local misses served by the shared tier are not misses
+        misses = max(0, local["misses"] - shared_hits)
+        lookups = local["hits"] + shared_hits + misses
+        return {
+            "model": self.model_name,
+            **local,
+            "shared": self.shared,
+            "shared_hits": shared_hits,
+            "misses": misses,
+            "hit_rate": (
+                round((local["hits"] + shared_hits) / lookups, 4)
+                if lookups else 0.0
+            ),
+        }
+
+    def clear(self):
+        self._local.clear()
@@ -2,8 +2,8 @@
 
 from typing import List, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
 from db import models
+from services.ranking_feature_store import feature_store, RANKING_FEATURE_STORE
 
 
 def build_features(
@@ -26,20 +26,10 @@ def build_features(
 
     product_map = {p.id: p for p in products}
 
-    # Aggregate search logs
-    logs = (
-        db.query(
-            models.SearchLog.product_id,
-            func.count(models.SearchLog.id).label("impressions"),
-            func.sum(
-                case((models.SearchLog.clicked == True, 1), else_=0)
-            ).label("clicks"),
-            func.sum(
-                case((models.SearchLog.purchased == True, 1), else_=0)
-            ).label("purchases"),
-        )
-        .filter(models.SearchLog.product_id.in_(product_ids))
-        .group_by(models.SearchLog.product_id)
+    # Engagement rollup (one row per product, maintained incrementally)
+    stats = (
+        db.query(models.ProductEngagementStats)
+        .filter(models.ProductEngagementStats.product_id.in_(product_ids))
         .all()
     )
 
@@ -49,7 +39,7 @@ def build_features(
             "clicks": row.clicks or 0,
             "purchases": row.purchases or 0,
         }
-        for row in logs
+        for row in stats
     }
 
     features = []
@@ -106,6 +96,9 @@ def rank_results(
     candidate_products: List[Dict],
 ) -> List[Dict]:
 
+    if RANKING_FEATURE_STORE and feature_store.loaded:
+        return _rank_from_store(db, candidate_products)
+
     features = build_features(db, query, candidate_products)
 
     # Weighted ranking formula
@@ -133,3 +126,19 @@ def rank_results(
             ranked_products.append(product_map[pid])
 
     return ranked_products
+
+
+def _rank_from_store(
+    db: Session,
+    candidate_products: List[Dict],
+) -> List[Dict]:
+    """
+    Hot path: gather features from the in-memory store and score with
+    one matrix-vector product. Only touches the DB for products the
+    store has not seen yet.
+    """
+    missing = feature_store.missing(p["id"] for p in candidate_products)
+    if missing:
+        feature_store.load_missing(db, missing)
+
+    return feature_store.score(candidate_products)
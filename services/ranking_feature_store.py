@@ -0,0 +1,321 @@
+# services/ranking_feature_store.py
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from core.periodic import PeriodicTask
+
+logger = get_logger("ranking_feature_store")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+RANKING_FEATURE_STORE = (
+    os.getenv("RANKING_FEATURE_STORE", "true").lower() == "true"
+)
+FEATURE_STORE_REFRESH_INTERVAL = float(
+    os.getenv("FEATURE_STORE_REFRESH_INTERVAL", "15")
+)
+# Seller rating changes do not touch products.updated_at,
+# so do a full reload every N refreshes
+FEATURE_STORE_FULL_RELOAD_EVERY = int(
+    os.getenv("FEATURE_STORE_FULL_RELOAD_EVERY", "40")
+)
+# updated_at is now() at transaction start, so a row can commit after
+# the watermark has moved past it; incremental reads re-cover this
+# window. Must exceed the longest writer transaction.
+FEATURE_STORE_OVERLAP_SECONDS = float(
+    os.getenv("FEATURE_STORE_OVERLAP_SECONDS", "30")
+)
+
+# Score = X @ weights, columns in SCORE_COLUMNS order
+SCORE_COLUMNS = ("vector_score", "seller_rating", "ctr", "conversion", "stock_boost")
+DEFAULT_WEIGHTS = "0.5,0.2,0.15,0.1,0.05"
+
+
+def _parse_weights(raw: str) -> np.ndarray:
+    try:
+        weights = np.array([float(w) for w in raw.split(",")], dtype=np.float64)
+    except ValueError:
+        weights = None
+
+    if weights is None or len(weights) != len(SCORE_COLUMNS):
+        logger.warning(
+            f"[FEATURES] RANKING_WEIGHTS={raw!r} needs {len(SCORE_COLUMNS)} numbers "
+            f"({', '.join(SCORE_COLUMNS)}); using {DEFAULT_WEIGHTS}"
+        )
+        return _parse_weights(DEFAULT_WEIGHTS)
+
+    return weights
+
+
+RANKING_WEIGHTS = _parse_weights(os.getenv("RANKING_WEIGHTS", DEFAULT_WEIGHTS))
+
+# Per-product columns held in memory
+COLUMNS = (
+    "price",
+    "stock_quantity",
+    "seller_rating",
+    "seller_total_sales",
+    "impressions",
+    "clicks",
+    "purchases",
+)
+
+_PRODUCT_SQL = """
+    SELECT
+        p.id,
+        p.price,
+        p.stock_quantity,
+        COALESCE(s.rating, 0) AS seller_rating,
+        COALESCE(s.total_sales, 0) AS seller_total_sales,
+        p.updated_at
+    FROM products p
+    LEFT JOIN sellers s ON s.id = p.seller_id
+"""
+
+_ENGAGEMENT_SQL = """
+    SELECT product_id, impressions, clicks, purchases, updated_at
+    FROM product_engagement_stats
+"""
+
+
+def _since(watermark: Optional[datetime]) -> datetime:
+    if watermark is None:
+        return datetime.min
+    return watermark - timedelta(seconds=FEATURE_STORE_OVERLAP_SECONDS)
+
+
+class RankingFeatureStore:
+    """
+    Columnar in-memory ranking features, indexed by product id.
+
+    One float64 matrix (row per product, column per feature);
+    `_index` maps product id → row.
+    Refreshed incrementally from products.updated_at and
+    product_engagement_stats.updated_at watermarks.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._index: Dict[int, int] = {}
+        self._size = 0
+        self._data = np.zeros((capacity, len(COLUMNS)), dtype=np.float64)
+
+        self._products_wm: Optional[datetime] = None
+        self._engagement_wm: Optional[datetime] = None
+        self._refreshes = 0
+
+        self.loaded = False
+
+    # ─────────────────────────────────────────
+    # WRITE SIDE
+    # ─────────────────────────────────────────
+    def _row(self, product_id: int) -> int:
+        row = self._index.get(product_id)
+        if row is not None:
+            return row
+
+        if self._size == self._data.shape[0]:
+            grown = np.zeros((self._size * 2, len(COLUMNS)), dtype=np.float64)
+            grown[: self._size] = self._data
+            self._data = grown
+
+        row = self._size
+        self._index[product_id] = row
+        self._size += 1
+        return row
+
+    def _apply_products(self, rows: Iterable) -> Optional[datetime]:
+        wm = None
+        with self._lock:
+            for r in rows:
+                i = self._row(r.id)
+                self._data[i, 0] = float(r.price or 0)
+                self._data[i, 1] = float(r.stock_quantity or 0)
+                self._data[i, 2] = float(r.seller_rating or 0)
+                self._data[i, 3] = float(r.seller_total_sales or 0)
+                if r.updated_at and (wm is None or r.updated_at > wm):
+                    wm = r.updated_at
+        return wm
+
+    def _apply_engagement(self, rows: Iterable) -> Optional[datetime]:
+        wm = None
+        with self._lock:
+            for r in rows:
+                i = self._row(r.product_id)
+                self._data[i, 4] = float(r.impressions or 0)
+                self._data[i, 5] = float(r.clicks or 0)
+                self._data[i, 6] = float(r.purchases or 0)
+                if r.updated_at and (wm is None or r.updated_at > wm):
+                    wm = r.updated_at
+        return wm
+
+    def refresh(self, db: Optional[Session] = None, full: bool = False):
+        own_session = db is None
+        db = db or SessionLocal()
+
+        try:
+            full = (
+                full
+                or not self.loaded
+                or (
+                    FEATURE_STORE_FULL_RELOAD_EVERY > 0
+                    and self._refreshes % FEATURE_STORE_FULL_RELOAD_EVERY == 0
+                )
+            )
+
+            if full:
+                products = db.execute(text(_PRODUCT_SQL)).fetchall()
+                engagement = db.execute(text(_ENGAGEMENT_SQL)).fetchall()
+            else:
+                # Rows in the overlap are re-applied; writes are idempotent
+                products = db.execute(
+                    text(_PRODUCT_SQL + " WHERE p.updated_at >= :wm"),
+                    {"wm": _since(self._products_wm)},
+                ).fetchall()
+                engagement = db.execute(
+                    text(_ENGAGEMENT_SQL + " WHERE updated_at >= :wm"),
+                    {"wm": _since(self._engagement_wm)},
+                ).fetchall()
+
+            products_wm = self._apply_products(products)
+            engagement_wm = self._apply_engagement(engagement)
+
+            with self._lock:
+                if products_wm:
+                    self._products_wm = max(products_wm, self._products_wm or products_wm)
+                if engagement_wm:
+                    self._engagement_wm = max(engagement_wm, self._engagement_wm or engagement_wm)
+                self._refreshes += 1
+                self.loaded = True
+
+            if full:
+                logger.info(f"[FEATURES] Full load | products={self._size}")
+
+        finally:
+            if own_session:
+                db.close()
+
+    def load_missing(self, db: Session, product_ids: List[int]):
+        """
+        Pulls products not yet seen by a refresh (new listings).
+        """
+        if not product_ids:
+            return
+
+        self._apply_products(
+            db.execute(
+                text(_PRODUCT_SQL + " WHERE p.id = ANY(:ids)"),
+                {"ids": list(product_ids)},
+            ).fetchall()
+        )
+        self._apply_engagement(
+            db.execute(
+                text(_ENGAGEMENT_SQL + " WHERE product_id = ANY(:ids)"),
+                {"ids": list(product_ids)},
+            ).fetchall()
+        )
+
+    # ─────────────────────────────────────────
+    # READ SIDE
+    # ─────────────────────────────────────────
+    def missing(self, product_ids: Iterable[int]) -> List[int]:
+        with self._lock:
+            return [pid for pid in product_ids if pid not in self._index]
+
+    def gather(self, product_ids: List[int]):
+        """
+        Returns (known_ids, feature_matrix) for ids present in the store.
+        """
+        with self._lock:
+            known = [pid for pid in product_ids if pid in self._index]
+            rows = np.fromiter(
+                (self._index[pid] for pid in known),
+                dtype=np.int64,
+                count=len(known),
+            )
+            return known, self._data[rows]
+
+    def features(self, candidates: List[Dict]):
+        """
+        Builds the scoring matrix for candidates present in the store.
+        Returns (by_id, known_ids, X) with X columns in SCORE_COLUMNS order.
+        """
+        by_id = {}
+        for c in candidates:
+            by_id.setdefault(c["id"], c)
+
+        known, feats = self.gather(list(by_id))
+        if not known:
+            return by_id, known, np.zeros((0, len(SCORE_COLUMNS)))
+
+        vector_score = np.array(
+            [float(by_id[pid].get("score", 0)) for pid in known],
+            dtype=np.float64,
+        )
+
+        impressions = feats[:, 4]
+        safe_impr = np.where(impressions > 0, impressions, 1.0)
+        ctr = np.where(impressions > 0, feats[:, 5] / safe_impr, 0.0)
+        conversion = np.where(impressions > 0, feats[:, 6] / safe_impr, 0.0)
+        stock_boost = np.minimum(feats[:, 1], 100) / 100
+
+        X = np.column_stack(
+            (vector_score, feats[:, 2], ctr, conversion, stock_boost)
+        )
+        return by_id, known, X
+
+    @staticmethod
+    def rank(
+        by_id: Dict,
+        known: List[int],
+        X: np.ndarray,
+        weights: np.ndarray = RANKING_WEIGHTS,
+    ) -> List[Dict]:
+        if not known:
+            return []
+
+        scores = X @ weights
+        order = np.argsort(-scores, kind="stable")
+        return [by_id[known[i]] for i in order]
+
+    def score(
+        self,
+        candidates: List[Dict],
+        weights: np.ndarray = RANKING_WEIGHTS,
+    ) -> List[Dict]:
+        """
+        Vectorized equivalent of the rank_results() formula.
+        Returns candidates (present in the store) sorted by score.
+        """
+        return self.rank(*self.features(candidates), weights=weights)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "products": self._size,
+                "capacity": int(self._data.shape[0]),
+                "bytes": int(self._data.nbytes),
+                "refreshes": self._refreshes,
+                "products_watermark": self._products_wm,
+                "engagement_watermark": self._engagement_wm,
+            }
+
+
+feature_store = RankingFeatureStore()
+
+feature_store_refresher = PeriodicTask(
+    name="ranking-feature-store",
+    fn=feature_store.refresh,
+    interval=FEATURE_STORE_REFRESH_INTERVAL,
+)
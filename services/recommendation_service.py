@@ -1,10 +1,20 @@
+import heapq
 import os
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
 from core.logging_config import get_logger
-from services.graph_service import get_similar_products
-from db import models
+from services.graph_service import (
+    get_graph_scores,
+    get_similar_products,
+    get_similar_products_many,
+)
+from services.popularity_index import get_fallback_recommendations
+from services.geo_cells import buyer_coordinates, geo_cell_cache
+from services.similar_products_store import (
+    SIMILAR_STORE_ENABLED,
+    similar_products_store,
+)
+from utils.geohash import haversine_m
 
 logger = get_logger("recommendation")
 
@@ -24,13 +34,22 @@ def get_product_recommendations(
 ):
     """
     Single-product recommendation.
-    Graph → fallback
+    In-memory top-K table → graph → fallback
     """
 
     logger.info(
         f"[RECO] Start | product_id={product_id}, limit={limit}, graph_enabled={GRAPH_ENABLED}"
     )
 
+    if GRAPH_ENABLED and SIMILAR_STORE_ENABLED and similar_products_store.covers(limit):
+        graph_results = similar_products_store.get(product_id, limit)
+
+        if graph_results:
+            return graph_results
+
+        # Table is a full snapshot: no entry means no SIMILAR edges
+        return fallback_recommendations(product_id, limit)
+
     if GRAPH_ENABLED:
         try:
             graph_results = get_similar_products(
@@ -48,52 +67,82 @@ def get_product_recommendations(
         except Exception:
             logger.exception("[RECO] Graph failed → fallback")
 
-    return fallback_recommendations(db, product_id, limit)
+    return fallback_recommendations(product_id, limit)
 
 
 def fallback_recommendations(
-    db: Session,
     product_id: int,
     limit: int,
 ):
     """
-    Same-category fallback
+    Same-category popular products (in-memory, no DB query)
     """
 
-    product = (
-        db.query(models.Product)
-        .filter(
-            models.Product.id == product_id,
-            models.Product.is_active.is_(True),
-            models.Product.is_deleted.is_(False),
-        )
-        .first()
-    )
+    return get_fallback_recommendations([product_id], limit)
 
-    if not product:
-        return []
 
-    items = (
-        db.query(models.Product)
-        .filter(
-            models.Product.category_id == product.category_id,
-            models.Product.id != product_id,
-            models.Product.is_active.is_(True),
-            models.Product.is_deleted.is_(False),
-        )
-        .order_by(models.Product.id.desc())
-        .limit(limit)
-        .all()
-    )
+# ─────────────────────────────────────────────
+# BATCH: MANY PRODUCTS → ONE RANKED LIST (cart / listing pages)
+# ─────────────────────────────────────────────
+def get_batch_recommendations(
+    product_ids: list[int],
+    limit: int = 10,
+    per_product: int = 10,
+):
+    """
+    Ranked union of neighbours for several products.
+
+    Neighbour lists come from the in-memory table, or one graph query
+    for all ids. Candidates similar to several inputs accumulate weight;
+    input products are never returned.
+    """
+
+    ids = list(dict.fromkeys(product_ids))
+    exclude = set(ids)
+
+    logger.info(f"[RECO-BATCH] Start | products={len(ids)}, limit={limit}")
+
+    neighbours = {}
+    if GRAPH_ENABLED:
+        if SIMILAR_STORE_ENABLED and similar_products_store.covers(per_product):
+            neighbours = {pid: similar_products_store.get(pid, per_product) for pid in ids}
+        else:
+            try:
+                neighbours = get_similar_products_many(ids, per_product)
+            except Exception:
+                logger.exception("[RECO-BATCH] Graph failed → fallback")
+
+    merged = {}
+    for rows in neighbours.values():
+        for r in rows:
+            if r["pid"] in exclude:
+                continue
+            item = merged.get(r["pid"])
+            if item is None:
+                merged[r["pid"]] = {**r, "weight": float(r["weight"] or 0), "matches": 1}
+            else:
+                item["weight"] += float(r["weight"] or 0)
+                item["matches"] += 1
+
+    if merged:
+        ranked = sorted(merged.values(), key=lambda x: x["weight"], reverse=True)
+        return ranked[:limit]
+
+    logger.warning("[RECO-BATCH] Graph empty → fallback")
+    return batch_fallback_recommendations(ids, limit)
+
+
+def batch_fallback_recommendations(
+    product_ids: list[int],
+    limit: int,
+):
+    """
+    Popular products from the inputs' categories (in-memory, no DB query)
+    """
 
     return [
-        {
-            "pid": p.id,
-            "name": p.name,
-            "price": float(p.price),
-            "weight": 0.0,
-        }
-        for p in items
+        {**item, "matches": 0}
+        for item in get_fallback_recommendations(product_ids, limit)
     ]
 
 
@@ -111,8 +160,8 @@ def get_nearby_recommended_products(
 
     Flow:
     buyer location
-      → nearby sellers (PostGIS)
-      → products
+      → geo cell → cached nearby products (PostGIS on miss)
+      → exact distance filter
       → graph score
       → final rank
     """
@@ -120,45 +169,20 @@ def get_nearby_recommended_products(
     logger.info(f"[RECO-NEARBY] buyer_id={buyer_id}, radius={radius}")
 
     # 1️⃣ buyer location
-    buyer = db.execute(
-        text("""
-        SELECT location
-        FROM users
-        WHERE id = :uid
-          AND location IS NOT NULL
-        """),
-        {"uid": buyer_id},
-    ).fetchone()
-
-    if not buyer:
+    coords = buyer_coordinates(db, buyer_id)
+
+    if not coords:
         logger.warning("[RECO-NEARBY] Buyer location missing")
         return []
 
-    # 2️⃣ nearby products
-    rows = db.execute(
-        text("""
-        SELECT
-            p.id   AS product_id,
-            p.name,
-            p.price,
-            s.store_name,
-            ST_Distance(
-                s.location,
-                :buyer_loc
-            ) AS distance
-        FROM sellers s
-        JOIN products p ON p.seller_id = s.id
-        WHERE
-            s.is_active = true
-            AND p.is_active = true
-            AND p.is_deleted = false
-            AND ST_DWithin(s.location, :buyer_loc, :radius)
-        """),
-        {
-            "buyer_loc": buyer.location,
-            "radius": radius,
-        },
-    ).mappings().all()
+    lat, lon = coords
+
+    # 2️⃣ nearby products (shared per geo cell, exact distance per buyer)
+    rows = []
+    for c in geo_cell_cache.candidates(db, lat, lon, radius):
+        distance = haversine_m(lat, lon, c[4], c[5])
+        if distance <= radius:
+            rows.append((c, distance))
 
     if not rows:
         return []
@@ -167,32 +191,37 @@ def get_nearby_recommended_products(
     graph_scores = {}
     if GRAPH_ENABLED:
         try:
-            product_ids = [r["product_id"] for r in rows]
+            product_ids = [c[0] for c, _ in rows]
             graph_scores = _get_graph_scores(db, product_ids)
         except Exception:
             logger.exception("[RECO-NEARBY] Graph score fetch failed")
 
-    # 4️⃣ scoring
-    results = []
-    for r in rows:
-        geo_score = max(0.0, 1 - (r["distance"] / radius))
-        graph_score = graph_scores.get(r["product_id"], 0.0)
+    # 4️⃣ scoring → top-k via heap, no full sort
+    def final_score(row):
+        c, distance = row
+        geo_score = max(0.0, 1 - (distance / radius))
+        return (0.6 * geo_score) + (0.4 * graph_scores.get(c[0], 0.0))
 
-        final_score = (0.6 * geo_score) + (0.4 * graph_score)
+    top = heapq.nlargest(limit, rows, key=final_score)
+
+    results = []
+    for c, distance in top:
+        product_id, name, price, store_name = c[:4]
+        geo_score = max(0.0, 1 - (distance / radius))
+        graph_score = graph_scores.get(product_id, 0.0)
 
         results.append({
-            "product_id": r["product_id"],
-            "name": r["name"],
-            "price": float(r["price"]),
-            "store_name": r["store_name"],
-            "distance_meters": float(r["distance"]),
+            "product_id": product_id,
+            "name": name,
+            "price": price,
+            "store_name": store_name,
+            "distance_meters": distance,
             "geo_score": round(geo_score, 3),
             "graph_score": round(graph_score, 3),
-            "final_score": round(final_score, 3),
+            "final_score": round((0.6 * geo_score) + (0.4 * graph_score), 3),
         })
 
-    results.sort(key=lambda x: x["final_score"], reverse=True)
-    return results[:limit]
+    return results
 
 
 # ─────────────────────────────────────────────
@@ -200,30 +229,14 @@ def get_nearby_recommended_products(
 # ─────────────────────────────────────────────
 def _get_graph_scores(db: Session, product_ids: list[int]) -> dict:
     """
-    Max SIMILAR edge weight per product
+    Max SIMILAR edge weight per product.
+    Read from the in-memory table when loaded, else batched from AGE.
     """
 
     if not product_ids:
         return {}
 
-    id_list = ",".join(map(str, product_ids))
-
-    rows = db.execute(
-        text(f"""
-        SELECT src, dst, weight
-        FROM cypher(
-          'amesie_graph',
-          $$
-            MATCH (a:Product)-[r:SIMILAR]->(b:Product)
-            WHERE b.pid IN [{id_list}]
-            RETURN a.pid AS src, b.pid AS dst, r.weight AS weight
-          $$
-        ) AS (src int, dst int, weight float)
-        """)
-    ).fetchall()
-
-    scores = {}
-    for _, dst, w in rows:
-        scores[dst] = max(scores.get(dst, 0.0), w)
-
-    return scores
+    if SIMILAR_STORE_ENABLED and similar_products_store.loaded:
+        return similar_products_store.graph_scores(product_ids)
+
+    return get_graph_scores(product_ids)
@@ -0,0 +1,221 @@
+# services/search_log_writer.py
+
+import csv
+import io
+import os
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+from core.database import engine
+from core.logging_config import get_logger
+from core.worker import BackgroundWorker
+from db import models
+
+logger = get_logger("search_log_writer")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+SEARCH_LOG_ASYNC = os.getenv("SEARCH_LOG_ASYNC", "true").lower() == "true"
+SEARCH_LOG_QUEUE_SIZE = int(os.getenv("SEARCH_LOG_QUEUE_SIZE", "10000"))
+SEARCH_LOG_BATCH_SIZE = int(os.getenv("SEARCH_LOG_BATCH_SIZE", "500"))
+SEARCH_LOG_FLUSH_INTERVAL = float(os.getenv("SEARCH_LOG_FLUSH_INTERVAL", "1.0"))
+
+# How long a request may wait on a full queue before the rows are dropped
+SEARCH_LOG_PUT_TIMEOUT = float(os.getenv("SEARCH_LOG_PUT_TIMEOUT", "0.005"))
+
+COLUMNS = ("query", "product_id", "clicked", "added_to_cart", "purchased")
+
+
+class SearchLogWriter(BackgroundWorker):
+    """
+    Buffered impression writer.
+
+    Requests enqueue rows; one background thread flushes them in bulk
+    (COPY on Postgres, multi-row INSERT elsewhere) when the batch is
+    full or the flush interval elapses.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = SEARCH_LOG_QUEUE_SIZE,
+        batch_size: int = SEARCH_LOG_BATCH_SIZE,
+        flush_interval: float = SEARCH_LOG_FLUSH_INTERVAL,
+    ):
+        super().__init__("search-log-writer")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=max_queue)
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.backpressure = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_at = None
+
+    # ─────────────────────────────────────────
+    # LIFECYCLE
+    # ─────────────────────────────────────────
+    def _on_stop(self):
+        # Drain whatever is still queued
+        self.flush()
+        logger.info(f"[SEARCH-LOG] Writer stopped | {self.stats()}")
+
+    # ─────────────────────────────────────────
+    # PRODUCER SIDE
+    # ─────────────────────────────────────────
+    def log_impressions(self, query: str, product_ids: List[int]) -> int:
+        """
+        Queues one impression row per product. Never blocks the request
+        for longer than SEARCH_LOG_PUT_TIMEOUT; returns rows accepted.
+        """
+        self.ensure_started()
+
+        accepted = 0
+
+        for product_id in product_ids:
+            row = {
+                "query": query,
+                "product_id": product_id,
+                "clicked": False,
+                "added_to_cart": False,
+                "purchased": False,
+            }
+
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                with self._stats_lock:
+                    self.backpressure += 1
+                try:
+                    self._queue.put(row, timeout=SEARCH_LOG_PUT_TIMEOUT)
+                except queue.Full:
+                    with self._stats_lock:
+                        self.dropped += 1
+                    continue
+
+            accepted += 1
+
+        with self._stats_lock:
+            self.enqueued += accepted
+
+        return accepted
+
+    # ─────────────────────────────────────────
+    # CONSUMER SIDE
+    # ─────────────────────────────────────────
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+
+        while not self._stop.is_set():
+            timeout = max(0.0, next_flush - time.monotonic())
+            self._stop.wait(min(timeout, 0.05))
+
+            if (
+                self._queue.qsize() >= self.batch_size
+                or time.monotonic() >= next_flush
+            ):
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def flush(self) -> int:
+        """
+        Writes everything currently queued. Thread-safe.
+        """
+        with self._flush_lock:
+            total = 0
+
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    break
+
+                try:
+                    self._write(batch)
+                    total += len(batch)
+                    with self._stats_lock:
+                        self.written += len(batch)
+                        self.flushes += 1
+                except Exception:
+                    logger.exception(
+                        f"[SEARCH-LOG] Flush failed, dropping {len(batch)} rows"
+                    )
+                    with self._stats_lock:
+                        self.failures += 1
+                        self.dropped += len(batch)
+
+            if total:
+                self.last_flush_at = time.time()
+
+            return total
+
+    def _drain(self, max_items: int) -> List[Dict]:
+        batch = []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows: List[Dict]):
+        if engine.dialect.name == "postgresql":
+            self._copy(rows)
+            return
+
+        with engine.begin() as conn:
+            conn.execute(insert(models.SearchLog), rows)
+
+    def _copy(self, rows: List[Dict]):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for r in rows:
+            writer.writerow([r[c] for c in COLUMNS])
+        buf.seek(0)
+
+        raw_conn = engine.raw_connection()
+        try:
+            cur = raw_conn.cursor()
+            cur.copy_expert(
+                f"COPY search_logs ({', '.join(COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buf,
+            )
+            cur.close()
+            raw_conn.commit()
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+
+    # ─────────────────────────────────────────
+    # METRICS
+    # ─────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "backpressure": self.backpressure,
+                "flushes": self.flushes,
+                "failures": self.failures,
+                "last_flush_at": self.last_flush_at,
+                "running": self.running,
+            }
+
+
+search_log_writer = SearchLogWriter()
@@ -0,0 +1,148 @@
+# services/similar_products_store.py
+
+import heapq
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.logging_config import get_logger
+from core.periodic import PeriodicTask
+from services.graph_service import iter_similar_edges
+
+logger = get_logger("similar_products_store")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+SIMILAR_STORE_ENABLED = (
+    os.getenv("SIMILAR_STORE_ENABLED", "true").lower() == "true"
+)
+SIMILAR_STORE_TOP_K = int(os.getenv("SIMILAR_STORE_TOP_K", "20"))
+SIMILAR_STORE_REFRESH_INTERVAL = float(
+    os.getenv("SIMILAR_STORE_REFRESH_INTERVAL", "600")
+)
+
+# (pid, name, price, weight), sorted by weight desc
+Neighbour = Tuple[int, str, float, float]
+
+
+class SimilarProductsStore:
+    """
+    Top-K SIMILAR neighbours per product, materialized from the graph.
+
+    The table is rebuilt off to the side and swapped in with a single
+    reference assignment, so readers never lock and never see a
+    half-built table.
+    """
+
+    def __init__(self, top_k: int = SIMILAR_STORE_TOP_K):
+        self.top_k = top_k
+
+        self._table: Dict[int, Tuple[Neighbour, ...]] = {}
+        # Max incoming weight per pid, over all edges (not just top-K)
+        self._incoming: Dict[int, float] = {}
+        self._refresh_lock = threading.Lock()
+
+        self.loaded = False
+        self.refreshes = 0
+        self.edges = 0
+        self.last_refresh_seconds = 0.0
+        self.last_refresh_at: Optional[float] = None
+
+    # ─────────────────────────────────────────
+    # BUILD
+    # ─────────────────────────────────────────
+    def refresh(self):
+        # A manual refresh (after an ingest) and the periodic one
+        # must not build two tables at once
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        started = time.perf_counter()
+
+        try:
+            heaps: Dict[int, list] = {}
+            incoming: Dict[int, float] = {}
+            edges = 0
+
+            for src, dst, name, price, weight in iter_similar_edges():
+                edges += 1
+                item = (float(weight or 0), int(dst), name, float(price or 0))
+
+                if item[0] > incoming.get(item[1], 0.0):
+                    incoming[item[1]] = item[0]
+
+                heap = heaps.setdefault(int(src), [])
+
+                if len(heap) < self.top_k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+            table = {
+                src: tuple(
+                    (pid, name, price, weight)
+                    for weight, pid, name, price in sorted(heap, reverse=True)
+                )
+                for src, heap in heaps.items()
+            }
+
+            self._table = table
+            self._incoming = incoming
+            self.edges = edges
+            self.loaded = True
+            self.refreshes += 1
+            self.last_refresh_seconds = time.perf_counter() - started
+            self.last_refresh_at = time.time()
+
+            logger.info(
+                f"[SIMILAR] Refreshed | products={len(table)}, edges={edges}, "
+                f"{self.last_refresh_seconds:.2f}s"
+            )
+
+        finally:
+            self._refresh_lock.release()
+
+    # ─────────────────────────────────────────
+    # READ
+    # ─────────────────────────────────────────
+    def get(self, product_id: int, limit: int = 5) -> List[Dict]:
+        return [
+            {"pid": pid, "name": name, "price": price, "weight": weight}
+            for pid, name, price, weight in self._table.get(product_id, ())[:limit]
+        ]
+
+    def graph_scores(self, product_ids) -> Dict[int, float]:
+        incoming = self._incoming
+        return {pid: incoming[pid] for pid in product_ids if pid in incoming}
+
+    def covers(self, limit: int) -> bool:
+        """
+        Whether a lookup of `limit` neighbours can be served from memory.
+        """
+        return self.loaded and limit <= self.top_k
+
+    def stats(self) -> dict:
+        table = self._table
+        return {
+            "enabled": SIMILAR_STORE_ENABLED,
+            "loaded": self.loaded,
+            "top_k": self.top_k,
+            "products": len(table),
+            "neighbours": sum(len(v) for v in table.values()),
+            "scored_products": len(self._incoming),
+            "edges_scanned": self.edges,
+            "refreshes": self.refreshes,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3),
+            "last_refresh_at": self.last_refresh_at,
+        }
+
+
+similar_products_store = SimilarProductsStore()
+
+similar_products_refresher = PeriodicTask(
+    name="similar-products-store",
+    fn=similar_products_store.refresh,
+    interval=SIMILAR_STORE_REFRESH_INTERVAL,
+)
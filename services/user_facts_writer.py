@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from embeddings.mpnet import embed_text
+from embeddings.mpnet import embed_canonical
 from vectorstore.qdrant_writer import client as qdrant_client
 USER_FACTS_COLLECTION = "user_facts"
 
@@ -62,7 +62,7 @@ def insert_user_fact(
 
     # 2️⃣ Qdrant upsert
     canonical_text = f"user.{fact_key} = {fact_value}"
-    vector = embed_text(canonical_text)
+    vector = embed_canonical(canonical_text)
 
     qdrant_client.upsert(
         collection_name=USER_FACTS_COLLECTION,
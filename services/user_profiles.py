@@ -0,0 +1,422 @@
+# services/user_profiles.py
+#
+# "Recommended for you": one taste vector per user in Qdrant.
+# Vector = time-decayed weighted mean of the product vectors the user
+# bought or put in the cart. Updated incrementally as events land;
+# served by a single filtered ANN query against the products collection.
+
+import math
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client.http import models as qmodels
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.logging_config import get_logger
+from core.worker import BackgroundWorker
+from services.popularity_index import get_fallback_recommendations
+from services.vector_service import (
+    COLLECTION_NAME,
+    VECTOR_SIZE,
+    build_search_filter,
+    client,
+)
+
+logger = get_logger("user_profiles")
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+USER_PROFILES_ENABLED = os.getenv("USER_PROFILES_ENABLED", "true").lower() == "true"
+USER_PROFILES_COLLECTION = os.getenv("USER_PROFILES_COLLECTION", "user_profiles")
+# Which named product vector tastes are built from (matches dense search)
+USER_PROFILE_PRODUCT_VECTOR = os.getenv("USER_PROFILE_PRODUCT_VECTOR", "description_vector")
+USER_PROFILE_HALF_LIFE_DAYS = float(os.getenv("USER_PROFILE_HALF_LIFE_DAYS", "30"))
+USER_PROFILE_HISTORY_LIMIT = int(os.getenv("USER_PROFILE_HISTORY_LIMIT", "200"))
+# Recently bought products are excluded from recommendations
+USER_PROFILE_RECENT_LIMIT = int(os.getenv("USER_PROFILE_RECENT_LIMIT", "50"))
+USER_PROFILE_QUEUE_SIZE = int(os.getenv("USER_PROFILE_QUEUE_SIZE", "10000"))
+# Users found to have no history are not rebuilt again for this long
+USER_PROFILE_EMPTY_TTL = float(os.getenv("USER_PROFILE_EMPTY_TTL", "600"))
+
+EVENT_WEIGHTS = {
+    "purchase": float(os.getenv("USER_PROFILE_PURCHASE_WEIGHT", "3.0")),
+    "cart": float(os.getenv("USER_PROFILE_CART_WEIGHT", "1.0")),
+}
+
+HALF_LIFE_SECONDS = USER_PROFILE_HALF_LIFE_DAYS * 86400
+
+_HISTORY_SQL = """
+    SELECT product_id, ts, kind FROM (
+        SELECT oi.product_id, o.created_at AS ts, 'purchase' AS kind
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        WHERE o.user_id = :uid
+          AND o.order_status <> 'cancelled'
+
+        UNION ALL
+
+        SELECT product_id, created_at AS ts, 'cart' AS kind
+        FROM cart_items
+        WHERE user_id = :uid
+    ) events
+    ORDER BY ts DESC
+    LIMIT :limit
+"""
+
+
+# Serializes profile read-modify-writes per user across API workers;
+# released when the updater's transaction ends
+_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('user_profiles'), :uid)"
+
+# Marker event: "build this user's profile from history"
+REBUILD = "rebuild"
+
+
+def _decay(age_seconds: float) -> float:
+    return math.pow(0.5, max(0.0, age_seconds) / HALF_LIFE_SECONDS)
+
+
+def fold_events(
+    mean: Optional[np.ndarray],
+    weight: float,
+    age_seconds: float,
+    weighted_vectors: Iterable[Tuple[float, np.ndarray]],
+) -> Tuple[Optional[np.ndarray], float]:
+    """
+    Decays a stored (mean, weight) by `age_seconds`, adds each
+    (w, vector) and returns the new weighted mean and total weight.
+    Mean is None when the total weight is zero.
+    """
+    weight = weight * _decay(age_seconds) if mean is not None else 0.0
+    total = (
+        np.asarray(mean, dtype=np.float64) * weight
+        if mean is not None
+        else np.zeros(VECTOR_SIZE, dtype=np.float64)
+    )
+
+    for w, vec in weighted_vectors:
+        total += w * vec
+        weight += w
+
+    if weight <= 0:
+        return None, 0.0
+    return total / weight, weight
+
+
+# ─────────────────────────────────────────────
+# COLLECTION
+# ─────────────────────────────────────────────
+def ensure_user_profiles_collection():
+    if client.collection_exists(USER_PROFILES_COLLECTION):
+        return
+
+    # DOT, not COSINE: Qdrant normalizes cosine vectors on write, and the
+    # incremental update needs the stored mean's real magnitude
+    client.create_collection(
+        collection_name=USER_PROFILES_COLLECTION,
+        vectors_config=qmodels.VectorParams(
+            size=VECTOR_SIZE,
+            distance=qmodels.Distance.DOT,
+        ),
+    )
+    logger.info(f"[PROFILE] Created collection {USER_PROFILES_COLLECTION}")
+
+
+def _product_vectors(product_ids: List[int]) -> Dict[int, np.ndarray]:
+    if not product_ids:
+        return {}
+
+    points = client.retrieve(
+        collection_name=COLLECTION_NAME,
+        ids=list(set(product_ids)),
+        with_vectors=[USER_PROFILE_PRODUCT_VECTOR],
+        with_payload=False,
+    )
+    return {
+        int(p.id): np.asarray(p.vector[USER_PROFILE_PRODUCT_VECTOR], dtype=np.float32)
+        for p in points
+        if p.vector and USER_PROFILE_PRODUCT_VECTOR in p.vector
+    }
+
+
+def _get_profile(user_id: int):
+    points = client.retrieve(
+        collection_name=USER_PROFILES_COLLECTION,
+        ids=[user_id],
+        with_vectors=True,
+        with_payload=True,
+    )
+    return points[0] if points else None
+
+
+def _save_profile(
+    user_id: int,
+    mean: np.ndarray,
+    weight: float,
+    as_of: float,
+    recent: List[int],
+):
+    client.upsert(
+        collection_name=USER_PROFILES_COLLECTION,
+        points=[
+            qmodels.PointStruct(
+                id=user_id,
+                vector=mean.tolist(),
+                payload={
+                    "user_id": user_id,
+                    "weight": weight,
+                    "as_of": as_of,
+                    "recent_product_ids": recent[:USER_PROFILE_RECENT_LIMIT],
+                },
+            )
+        ],
+    )
+
+
+# ─────────────────────────────────────────────
+# BUILD / UPDATE
+# ─────────────────────────────────────────────
+def rebuild_user_profile(db: Session, user_id: int) -> bool:
+    """
+    Recomputes a user's vector from order + cart history.
+    Returns False when the user has no usable history.
+    """
+    rows = db.execute(
+        text(_HISTORY_SQL),
+        {"uid": user_id, "limit": USER_PROFILE_HISTORY_LIMIT},
+    ).fetchall()
+
+    vectors = _product_vectors([r.product_id for r in rows])
+    now = time.time()
+
+    mean, weight = fold_events(None, 0.0, 0.0, (
+        (EVENT_WEIGHTS.get(r.kind, 1.0) * _decay(now - (r.ts.timestamp() if r.ts else now)), vectors[r.product_id])
+        for r in rows
+        if r.product_id in vectors
+    ))
+
+    if mean is None:
+        return False
+
+    recent = list(dict.fromkeys(r.product_id for r in rows if r.kind == "purchase"))
+    _save_profile(user_id, mean, weight, now, recent)
+    return True
+
+
+def apply_events(db: Session, user_id: int, events: List[Tuple[int, str]]) -> bool:
+    """
+    Folds new (product_id, kind) events into the stored vector:
+    decay the old mean to now, add the new weighted vectors, re-average.
+    Users without a stored profile get a full rebuild.
+    Returns False when the user still has no profile.
+    """
+    profile = _get_profile(user_id)
+
+    if profile is None:
+        return rebuild_user_profile(db, user_id)
+
+    events = [(pid, kind) for pid, kind in events if kind != REBUILD]
+    if not events:
+        return True
+
+    now = time.time()
+    payload = profile.payload or {}
+
+    vectors = _product_vectors([pid for pid, _ in events])
+    mean, weight = fold_events(
+        profile.vector,
+        float(payload.get("weight", 0.0)),
+        now - float(payload.get("as_of", now)),
+        ((EVENT_WEIGHTS.get(kind, 1.0), vectors[pid]) for pid, kind in events if pid in vectors),
+    )
+
+    if mean is None:
+        return True
+
+    bought = [pid for pid, kind in reversed(events) if kind == "purchase"]
+    recent = list(dict.fromkeys(bought + list(payload.get("recent_product_ids", []))))
+
+    _save_profile(user_id, mean, weight, now, recent)
+    return True
+
+
+class UserProfileUpdater(BackgroundWorker):
+    """
+    Background worker for apply_events(). Events queued by request
+    handlers are grouped per user, so a burst of cart adds costs one
+    read-modify-write of that user's vector. Each write holds a per-user
+    advisory lock, so updaters in other API workers cannot interleave.
+    """
+
+    def __init__(self, max_queue: int = USER_PROFILE_QUEUE_SIZE):
+        super().__init__("user-profile-updater")
+
+        self._queue: "queue.Queue[Tuple[int, int, str]]" = queue.Queue(maxsize=max_queue)
+
+        # user_id → monotonic expiry of "has no history"
+        self._empty: Dict[int, float] = {}
+        self._rebuilds_pending = set()
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.updates = 0
+        self.failures = 0
+
+    def _on_start(self):
+        try:
+            ensure_user_profiles_collection()
+        except Exception:
+            logger.exception("[PROFILE] Could not ensure collection")
+
+    def _on_stop(self):
+        self._process(self._drain())
+
+    def record(self, user_id: int, product_ids: List[int], kind: str):
+        if not USER_PROFILES_ENABLED:
+            return
+
+        self.ensure_started()
+
+        with self._lock:
+            self._empty.pop(user_id, None)
+
+        for pid in product_ids:
+            self._put((user_id, pid, kind))
+
+    def request_rebuild(self, user_id: int):
+        """
+        Queues a build from history for a user with no stored profile.
+        Skipped while one is pending or the user is known to be empty.
+        """
+        if not USER_PROFILES_ENABLED:
+            return
+
+        self.ensure_started()
+
+        with self._lock:
+            expires_at = self._empty.get(user_id)
+            if expires_at is not None and expires_at > time.monotonic():
+                return
+            if user_id in self._rebuilds_pending:
+                return
+            self._rebuilds_pending.add(user_id)
+
+        if not self._put((user_id, None, REBUILD)):
+            with self._lock:
+                self._rebuilds_pending.discard(user_id)
+
+    def _put(self, item: Tuple[int, Optional[int], str]) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            self.enqueued += 1
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _drain(self) -> Dict[int, List[Tuple[int, str]]]:
+        grouped: Dict[int, List[Tuple[int, str]]] = {}
+        while True:
+            try:
+                user_id, pid, kind = self._queue.get_nowait()
+            except queue.Empty:
+                return grouped
+            grouped.setdefault(user_id, []).append((pid, kind))
+
+    def _process(self, grouped: Dict[int, List[Tuple[int, str]]]):
+        if not grouped:
+            return
+
+        db = SessionLocal()
+        try:
+            for user_id, events in grouped.items():
+                try:
+                    db.execute(text(_LOCK_SQL), {"uid": user_id})
+                    has_profile = apply_events(db, user_id, events)
+                    db.commit()
+                    self.updates += 1
+                except Exception:
+                    db.rollback()
+                    has_profile = True
+                    self.failures += 1
+                    logger.exception(f"[PROFILE] Update failed | user_id={user_id}")
+
+                with self._lock:
+                    self._rebuilds_pending.discard(user_id)
+                    if not has_profile:
+                        self._empty[user_id] = time.monotonic() + USER_PROFILE_EMPTY_TTL
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(0.5):
+            grouped = self._drain()
+            if grouped:
+                self._process(grouped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._empty = {uid: t for uid, t in self._empty.items() if t > now}
+            empty = len(self._empty)
+
+        return {
+            "pending": self._queue.qsize(),
+            "known_empty": empty,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "updates": self.updates,
+            "failures": self.failures,
+        }
+
+
+user_profile_updater = UserProfileUpdater()
+
+
+# ─────────────────────────────────────────────
+# SERVE
+# ─────────────────────────────────────────────
+def recommend_for_user(user_id: int, limit: int = 20) -> List[dict]:
+    """
+    One filtered ANN query: products nearest the user's taste vector,
+    in stock, not recently bought. Users without a profile yet get
+    popular products while the updater builds one.
+    """
+    profile = _get_profile(user_id)
+
+    if profile is None:
+        user_profile_updater.request_rebuild(user_id)
+        return get_fallback_recommendations([], limit)
+
+    query_filter = build_search_filter()
+    recent = (profile.payload or {}).get("recent_product_ids") or []
+    if recent:
+        query_filter.must_not = [qmodels.HasIdCondition(has_id=recent)]
+
+    response = client.query_points(
+        collection_name=COLLECTION_NAME,
+        query=profile.vector,
+        using=USER_PROFILE_PRODUCT_VECTOR,
+        query_filter=query_filter,
+        with_payload=True,
+        limit=limit,
+    )
+
+    results = []
+    for point in response.points:
+        payload = point.payload or {}
+        results.append({
+            "pid": int(point.id),
+            "name": payload.get("name"),
+            "price": payload.get("price"),
+            "weight": round(float(point.score), 4),
+        })
+    return results
@@ -1,7 +1,12 @@
+import asyncio
 from typing import List, Optional
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models as qmodels
+from embeddings.batcher import MicroBatcher
+from embeddings.registry import MINILM, encode
+from services.query_embedding_cache import QueryEmbeddingCache, normalize_query
 import logging
+import os
 import traceback
 
 # ─────────────────────────────────────────────
@@ -14,11 +19,68 @@ logger = logging.getLogger("vector_service")
 # CONFIG
 # ─────────────────────────────────────────────
 COLLECTION_NAME = "products_v1"
-QDRANT_URL = "http://127.0.0.1:6333"
-
-client = QdrantClient(url=QDRANT_URL)
-
-model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+QDRANT_URL = os.getenv("QDRANT_URL", "http://127.0.0.1:6333")
+# Embedded/local mode (benchmarks, offline dev): a directory or ":memory:"
+QDRANT_PATH = os.getenv("QDRANT_PATH")
+MODEL_NAME = MINILM
+
+SEARCH_LIMIT = 10
+
+# "dense"  → description_vector only
+# "hybrid" → all named vectors, fused server-side (one round trip)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "dense").lower()
+
+# "rrf" (reciprocal rank fusion) or "dbsf" (distribution-based score fusion)
+SEARCH_FUSION = os.getenv("SEARCH_FUSION", "rrf").lower()
+
+# Per-vector candidate depth before fusion
+HYBRID_PREFETCH_LIMIT = int(os.getenv("HYBRID_PREFETCH_LIMIT", "50"))
+
+PRODUCT_VECTORS = (
+    "name_vector",
+    "short_desc_vector",
+    "description_vector",
+    "tags_vector",
+)
+VECTOR_SIZE = 384  # all-MiniLM-L6-v2
+
+# "none" | "int8" (scalar) | "binary"
+PRODUCTS_QUANTIZATION = os.getenv("PRODUCTS_QUANTIZATION", "none").lower()
+# Candidates fetched per result from the quantized index before rescoring
+QUANTIZATION_OVERSAMPLING = float(os.getenv("QUANTIZATION_OVERSAMPLING", "2.0"))
+
+# Push filters into Qdrant (payload indexes) instead of post-filtering
+SEARCH_PAYLOAD_FILTER = os.getenv("SEARCH_PAYLOAD_FILTER", "true").lower() == "true"
+
+# field -> payload schema type
+PAYLOAD_INDEXES = {
+    "is_active": qmodels.PayloadSchemaType.BOOL,
+    "stock_quantity": qmodels.PayloadSchemaType.INTEGER,
+    "category_id": qmodels.PayloadSchemaType.INTEGER,
+    "price": qmodels.PayloadSchemaType.FLOAT,
+    "seller_id": qmodels.PayloadSchemaType.INTEGER,
+}
+
+if QDRANT_PATH:
+    # Local mode storage can only be opened by one client per process,
+    # so the async path falls back to the sync client in a thread
+    client = (
+        QdrantClient(location=":memory:")
+        if QDRANT_PATH == ":memory:"
+        else QdrantClient(path=QDRANT_PATH)
+    )
+    async_client = None
+else:
+    client = QdrantClient(url=QDRANT_URL)
+    async_client = AsyncQdrantClient(url=QDRANT_URL)
+
+# Single-text encodes (queries, single products) are micro-batched
+# on the batcher's own thread
+batcher = MicroBatcher(MODEL_NAME)
+
+_payload_indexes_ready = False
+
+query_cache = QueryEmbeddingCache(model_name=MODEL_NAME)
 
 
 # ─────────────────────────────────────────────
@@ -26,62 +88,370 @@ model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
 # ─────────────────────────────────────────────
 def embed_text(text: str) -> List[float]:
     try:
-        return model.encode(text or "").tolist()
+        return batcher.embed(text or "")
     except Exception:
         logger.error("Embedding failed")
         logger.error(traceback.format_exc())
         raise
 
 
+def embed_query(query: str) -> List[float]:
+    """
+    Search-query embedding, served from the LRU cache when possible.
+    """
+    return query_cache.get_or_compute(query, embed_text)
+
+
+async def embed_query_async(query: str) -> List[float]:
+    """
+    Same as embed_query(), but cache misses are awaited on the
+    micro-batcher so the event loop is never blocked.
+    """
+    key = normalize_query(query)
+
+    vector = query_cache.get(key)
+    if vector is not None:
+        return vector
+
+    vector = await asyncio.wrap_future(batcher.submit(key))
+
+    query_cache.put(key, vector)
+    return vector
+
+
 # ─────────────────────────────────────────────
-# UPSERT MULTI VECTOR (FIXED + CLEAN)
+# COLLECTION SETUP
 # ─────────────────────────────────────────────
-def upsert_product_vector(product):
+def quantization_config(
+    quantization: str = PRODUCTS_QUANTIZATION,
+) -> Optional[qmodels.QuantizationConfig]:
+    if quantization == "int8":
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            )
+        )
+
+    if quantization == "binary":
+        return qmodels.BinaryQuantization(
+            binary=qmodels.BinaryQuantizationConfig(always_ram=True)
+        )
+
+    return None
+
+
+def create_products_collection(
+    collection_name: str = COLLECTION_NAME,
+    quantization: str = PRODUCTS_QUANTIZATION,
+    qdrant: Optional[QdrantClient] = None,
+):
+    """
+    Creates products_v1 with the four named vectors. When quantized,
+    originals are kept on disk and only the compressed copies in RAM.
+    """
+    qdrant = qdrant or client
+    on_disk = quantization != "none"
+
+    qdrant.create_collection(
+        collection_name=collection_name,
+        vectors_config={
+            name: qmodels.VectorParams(
+                size=VECTOR_SIZE,
+                distance=qmodels.Distance.COSINE,
+                on_disk=on_disk,
+            )
+            for name in PRODUCT_VECTORS
+        },
+        quantization_config=quantization_config(quantization),
+    )
+    logger.info(
+        f"Collection created: {collection_name} (quantization={quantization})"
+    )
+
+
+def enable_quantization(
+    quantization: str,
+    collection_name: str = COLLECTION_NAME,
+):
+    """
+    Switches an existing collection to int8/binary quantization and
+    moves the original vectors to disk. Qdrant rebuilds in background.
+    """
+    config = quantization_config(quantization)
+    if config is None:
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={
+            name: qmodels.VectorParamsDiff(on_disk=True)
+            for name in PRODUCT_VECTORS
+        },
+        quantization_config=config,
+    )
+    logger.info(f"Quantization enabled: {collection_name} → {quantization}")
+
+
+# ─────────────────────────────────────────────
+# PAYLOAD INDEXES
+# ─────────────────────────────────────────────
+def ensure_payload_indexes():
+    """
+    Creates payload indexes used by filtered search.
+    Safe to call repeatedly (runs once per process).
+    """
+    global _payload_indexes_ready
+
+    if _payload_indexes_ready:
+        return
+
+    info = client.get_collection(COLLECTION_NAME)
+    existing = set((info.payload_schema or {}).keys())
+
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field in existing:
+            continue
+
+        client.create_payload_index(
+            collection_name=COLLECTION_NAME,
+            field_name=field,
+            field_schema=schema,
+        )
+        logger.info(f"Payload index created: {COLLECTION_NAME}.{field}")
+
+    _payload_indexes_ready = True
+
+
+def build_search_filter(
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    seller_id: Optional[int] = None,
+    category_ids: Optional[List[int]] = None,
+    is_active: Optional[bool] = True,
+    in_stock: bool = True,
+) -> qmodels.Filter:
+    """
+    Payload filter for product queries. Defaults match storefront
+    search (active, in stock); `is_active=None` / `in_stock=False`
+    drop those conditions for callers that filter differently.
+    """
+    must = []
+
+    if is_active is not None:
+        must.append(
+            qmodels.FieldCondition(
+                key="is_active",
+                match=qmodels.MatchValue(value=is_active),
+            )
+        )
+
+    if in_stock:
+        must.append(
+            qmodels.FieldCondition(
+                key="stock_quantity",
+                range=qmodels.Range(gt=0),
+            )
+        )
+
+    if category_ids:
+        must.append(
+            qmodels.FieldCondition(
+                key="category_id",
+                match=qmodels.MatchAny(any=list(category_ids)),
+            )
+        )
+    elif category_id:
+        must.append(
+            qmodels.FieldCondition(
+                key="category_id",
+                match=qmodels.MatchValue(value=category_id),
+            )
+        )
+
+    if seller_id:
+        must.append(
+            qmodels.FieldCondition(
+                key="seller_id",
+                match=qmodels.MatchValue(value=seller_id),
+            )
+        )
+
+    if min_price is not None or max_price is not None:
+        must.append(
+            qmodels.FieldCondition(
+                key="price",
+                range=qmodels.Range(gte=min_price, lte=max_price),
+            )
+        )
+
+    return qmodels.Filter(must=must)
+
+
+# ─────────────────────────────────────────────
+# UPSERT MULTI VECTOR (BATCHED)
+# ─────────────────────────────────────────────
+def product_texts(product) -> dict:
+    """
+    Source text per named vector.
+    """
+    name_text = product.name or ""
+    description_text = product.description or ""
+
+    return {
+        "name_vector": name_text,
+        "short_desc_vector": description_text[:200],
+        "description_vector": description_text,
+        "tags_vector": f"{product.sku or ''} category_{product.category_id or ''}",
+    }
+
+
+def product_payload(product) -> dict:
+    return {
+        "product_id": int(product.id),
+        "seller_id": product.seller_id,
+        "category_id": product.category_id,
+        "price": float(product.price or 0),
+        "is_active": bool(product.is_active),
+        "stock_quantity": int(product.stock_quantity or 0),
+        "name": product.name or "",
+        "description": product.description or "",
+    }
+
+
+def encode_batch(texts: List[str], batch_size: int = 64) -> List[List[float]]:
+    """
+    One batched forward pass over all texts.
+    """
     try:
-        if not product:
-            logger.warning("Product is None, skipping upsert")
-            return
+        return encode(
+            MODEL_NAME,
+            [t or "" for t in texts],
+            batch_size=batch_size,
+        ).tolist()
+    except Exception:
+        logger.error("Batch embedding failed")
+        logger.error(traceback.format_exc())
+        raise
 
-        product_id = int(product.id)
-
-        name_text = product.name or ""
-        description_text = product.description or ""
-        tags_text = f"{product.sku or ''} category_{product.category_id or ''}"
-
-        # Generate vectors explicitly (debuggable)
-        name_vec = embed_text(name_text)
-        short_desc_vec = embed_text(description_text[:200])
-        desc_vec = embed_text(description_text)
-        tags_vec = embed_text(tags_text)
-
-        payload = {
-            "product_id": product_id,
-            "seller_id": product.seller_id,
-            "category_id": product.category_id,
-            "price": float(product.price or 0),
-            "is_active": bool(product.is_active),
-            "stock_quantity": int(product.stock_quantity or 0),
-            "name": name_text,
-            "description": description_text,
-        }
 
-        client.upsert(
+def upsert_product_vectors(products, wait: bool = True) -> int:
+    """
+    Embeds and upserts many products: a single encode() call for all
+    4×N texts and a single upsert request. Returns points written.
+    """
+    products = [p for p in products if p]
+    if not products:
+        return 0
+
+    texts = []
+    for product in products:
+        texts.extend(product_texts(product)[v] for v in PRODUCT_VECTORS)
+
+    vectors = encode_batch(texts)
+    n = len(PRODUCT_VECTORS)
+
+    points = [
+        qmodels.PointStruct(
+            id=int(product.id),
+            vector=dict(zip(PRODUCT_VECTORS, vectors[i * n:(i + 1) * n])),
+            payload=product_payload(product),
+        )
+        for i, product in enumerate(products)
+    ]
+
+    client.upsert(
+        collection_name=COLLECTION_NAME,
+        points=points,
+        wait=wait,
+    )
+
+    return len(points)
+
+
+# Product field → named vectors whose source text it feeds.
+# Fields not listed here (price, stock_quantity, is_active, seller_id)
+# only live in the payload.
+FIELD_VECTORS = {
+    "name": ("name_vector",),
+    "description": ("short_desc_vector", "description_vector"),
+    "sku": ("tags_vector",),
+    "category_id": ("tags_vector",),
+}
+
+
+def update_product_points(changes) -> dict:
+    """
+    Applies product changes to the index with the least work.
+
+    `changes` is a list of (product, changed_fields); changed_fields=None
+    means unknown / new product → full re-embed + upsert. Otherwise only
+    vectors whose source text changed are re-encoded (update_vectors) and
+    the payload is refreshed via set_payload — price/stock edits cost no
+    encoder time at all.
+    """
+    full = [p for p, fields in changes if p and fields is None]
+    partial = [(p, fields) for p, fields in changes if p and fields is not None]
+
+    if full:
+        upsert_product_vectors(full, wait=True)
+
+    slots = []
+    texts = []
+    for product, fields in partial:
+        source = product_texts(product)
+        names = sorted({v for f in fields for v in FIELD_VECTORS.get(f, ())})
+        for name in names:
+            slots.append((int(product.id), name))
+            texts.append(source[name])
+
+    if texts:
+        per_point = {}
+        for (pid, name), vec in zip(slots, encode_batch(texts)):
+            per_point.setdefault(pid, {})[name] = vec
+
+        client.update_vectors(
             collection_name=COLLECTION_NAME,
             points=[
-                {
-                    "id": product_id,
-                    "vector": {
-                        "name_vector": name_vec,
-                        "short_desc_vector": short_desc_vec,
-                        "description_vector": desc_vec,
-                        "tags_vector": tags_vec,
-                    },
-                    "payload": payload,
-                }
+                qmodels.PointVectors(id=pid, vector=vectors)
+                for pid, vectors in per_point.items()
             ],
+            wait=True,
         )
 
-        logger.info(f"Vector upserted successfully for product {product_id}")
+    if partial:
+        client.batch_update_points(
+            collection_name=COLLECTION_NAME,
+            update_operations=[
+                qmodels.SetPayloadOperation(
+                    set_payload=qmodels.SetPayload(
+                        payload=product_payload(product),
+                        points=[int(product.id)],
+                    )
+                )
+                for product, _ in partial
+            ],
+            wait=True,
+        )
+
+    return {
+        "full": len(full),
+        "partial": len(partial),
+        "vectors_encoded": len(texts) + len(full) * len(PRODUCT_VECTORS),
+    }
+
+
+def upsert_product_vector(product):
+    try:
+        if not product:
+            logger.warning("Product is None, skipping upsert")
+            return
+
+        upsert_product_vectors([product])
+
+        logger.info(f"Vector upserted successfully for product {product.id}")
 
     except Exception:
         logger.error("Upsert failed")
@@ -92,73 +462,277 @@ def upsert_product_vector(product):
 # ─────────────────────────────────────────────
 # SEARCH
 # ─────────────────────────────────────────────
+def _search_params(
+    quantization: str = PRODUCTS_QUANTIZATION,
+) -> Optional[qmodels.SearchParams]:
+    """
+    With a quantized collection: search the compressed vectors with
+    oversampling, then rescore the shortlist with the originals.
+    """
+    if quantization == "none":
+        return None
+
+    return qmodels.SearchParams(
+        quantization=qmodels.QuantizationSearchParams(
+            ignore=False,
+            rescore=True,
+            oversampling=QUANTIZATION_OVERSAMPLING,
+        )
+    )
+
+
+def _query_kwargs(
+    query_vector: List[float],
+    mode: str,
+    query_filter: Optional[qmodels.Filter],
+    limit: int,
+) -> dict:
+    """
+    Builds query_points() arguments for the given search mode.
+    Hybrid mode prefetches every named vector and fuses the ranked
+    lists inside Qdrant, so it is still a single request.
+    """
+    search_params = _search_params()
+
+    if mode != "hybrid":
+        return {
+            "query": query_vector,
+            "using": "description_vector",
+            "query_filter": query_filter,
+            "search_params": search_params,
+            "limit": limit,
+        }
+
+    fusion = (
+        qmodels.Fusion.DBSF if SEARCH_FUSION == "dbsf" else qmodels.Fusion.RRF
+    )
+
+    return {
+        "prefetch": [
+            qmodels.Prefetch(
+                query=query_vector,
+                using=vector_name,
+                filter=query_filter,
+                params=search_params,
+                limit=max(HYBRID_PREFETCH_LIMIT, limit),
+            )
+            for vector_name in PRODUCT_VECTORS
+        ],
+        "query": qmodels.FusionQuery(fusion=fusion),
+        "query_filter": query_filter,
+        "limit": limit,
+    }
+
+
 def search_products(
     query: str,
     category_id: Optional[int] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
+    seller_id: Optional[int] = None,
+    limit: int = SEARCH_LIMIT,
+    use_payload_filter: bool = SEARCH_PAYLOAD_FILTER,
+    mode: str = SEARCH_MODE,
+    category_ids: Optional[List[int]] = None,
+    is_active: Optional[bool] = True,
+    in_stock: bool = True,
 ):
     try:
-        logger.info(f"Searching for: {query}")
+        logger.info(f"Searching for: {query} (mode={mode})")
+
+        query_vector = embed_query(query)
+
+        if use_payload_filter:
+            ensure_payload_indexes()
+
+            query_filter = build_search_filter(
+                category_id=category_id,
+                min_price=min_price,
+                max_price=max_price,
+                seller_id=seller_id,
+                category_ids=category_ids,
+                is_active=is_active,
+                in_stock=in_stock,
+            )
+
+            response = client.query_points(
+                collection_name=COLLECTION_NAME,
+                with_payload=True,
+                **_query_kwargs(query_vector, mode, query_filter, limit),
+            )
+
+            results = _points_to_results(response.points)
+            logger.info(f"Filtered results: {len(results)}")
+            return results
+
+        # Legacy mode: over-fetch, then filter in Python
+        response = client.query_points(
+            collection_name=COLLECTION_NAME,
+            with_payload=True,
+            **_query_kwargs(query_vector, mode, None, 30),
+        )
 
-        query_vector = embed_text(query)
+        results = _post_filter(
+            response.points,
+            category_id=category_id,
+            min_price=min_price,
+            max_price=max_price,
+            seller_id=seller_id,
+            category_ids=category_ids,
+            is_active=is_active,
+            in_stock=in_stock,
+        )[:limit]
 
-        response = client.query_points(
+        logger.info(f"Final filtered results: {len(results)}")
+
+        return results
+
+    except Exception:
+        logger.error("Search failed")
+        logger.error(traceback.format_exc())
+        raise
+
+
+async def search_products_async(
+    query: str,
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    seller_id: Optional[int] = None,
+    limit: int = SEARCH_LIMIT,
+    use_payload_filter: bool = SEARCH_PAYLOAD_FILTER,
+    mode: str = SEARCH_MODE,
+):
+    """
+    Non-blocking search_products(): encoder runs on the micro-batcher thread,
+    Qdrant is queried through AsyncQdrantClient. Same result shape.
+    """
+    if async_client is None:
+        return await asyncio.to_thread(
+            search_products,
+            query=query,
+            category_id=category_id,
+            min_price=min_price,
+            max_price=max_price,
+            seller_id=seller_id,
+            limit=limit,
+            use_payload_filter=use_payload_filter,
+            mode=mode,
+        )
+
+    try:
+        logger.info(f"Searching (async) for: {query} (mode={mode})")
+
+        if use_payload_filter and not _payload_indexes_ready:
+            # One-off per process; overlap it with the query embedding
+            query_vector, _ = await asyncio.gather(
+                embed_query_async(query),
+                asyncio.to_thread(ensure_payload_indexes),
+            )
+        else:
+            query_vector = await embed_query_async(query)
+
+        if use_payload_filter:
+            query_filter = build_search_filter(
+                category_id=category_id,
+                min_price=min_price,
+                max_price=max_price,
+                seller_id=seller_id,
+            )
+
+            response = await async_client.query_points(
+                collection_name=COLLECTION_NAME,
+                with_payload=True,
+                **_query_kwargs(query_vector, mode, query_filter, limit),
+            )
+
+            return _points_to_results(response.points)
+
+        response = await async_client.query_points(
             collection_name=COLLECTION_NAME,
-            query=query_vector,
-            using="description_vector",
-            limit=30,
             with_payload=True,
+            **_query_kwargs(query_vector, mode, None, 30),
         )
 
-        seen_ids = set()
-        results = []
+        return _post_filter(
+            response.points,
+            category_id=category_id,
+            min_price=min_price,
+            max_price=max_price,
+            seller_id=seller_id,
+        )[:limit]
 
-        for point in response.points:
-            payload = point.payload or {}
-            product_id = payload.get("product_id")
+    except Exception:
+        logger.error("Async search failed")
+        logger.error(traceback.format_exc())
+        raise
 
-            if not product_id:
-                continue
 
-            if product_id in seen_ids:
-                continue
-            seen_ids.add(product_id)
+def _post_filter(
+    points,
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    seller_id: Optional[int] = None,
+    category_ids: Optional[List[int]] = None,
+    is_active: Optional[bool] = True,
+    in_stock: bool = True,
+) -> List[dict]:
+    candidates = []
 
-            if not payload.get("is_active", False):
-                continue
+    for point in points:
+        payload = point.payload or {}
 
-            if payload.get("stock_quantity", 0) <= 0:
-                continue
+        if is_active is not None and bool(payload.get("is_active", False)) != is_active:
+            continue
+
+        if in_stock and payload.get("stock_quantity", 0) <= 0:
+            continue
 
-            if category_id and payload.get("category_id") != category_id:
+        if category_ids:
+            if payload.get("category_id") not in category_ids:
                 continue
+        elif category_id and payload.get("category_id") != category_id:
+            continue
 
-            price = float(payload.get("price", 0))
+        if seller_id and payload.get("seller_id") != seller_id:
+            continue
 
-            if min_price is not None and price < min_price:
-                continue
+        price = float(payload.get("price", 0))
 
-            if max_price is not None and price > max_price:
-                continue
+        if min_price is not None and price < min_price:
+            continue
 
-            results.append({
-                "id": product_id,
-                "name": payload.get("name"),
-                "description": payload.get("description"),
-                "price": price,
-                "score": round(point.score, 4),
-                "product_url": f"/product/{product_id}",
-            })
+        if max_price is not None and price > max_price:
+            continue
 
-            if len(results) >= 10:
-                break
+        candidates.append(point)
 
-        logger.info(f"Final filtered results: {len(results)}")
+    return _points_to_results(candidates)
 
-        return results
 
-    except Exception:
-        logger.error("Search failed")
-        logger.error(traceback.format_exc())
-        raise
+def _points_to_results(points) -> List[dict]:
+    seen_ids = set()
+    results = []
+
+    for point in points:
+        payload = point.payload or {}
+        product_id = payload.get("product_id")
+
+        if not product_id:
+            continue
+
+        if product_id in seen_ids:
+            continue
+        seen_ids.add(product_id)
+
+        results.append({
+            "id": product_id,
+            "name": payload.get("name"),
+            "description": payload.get("description"),
+            "price": float(payload.get("price", 0)),
+            "score": round(point.score, 4),
+            "product_url": f"/product/{product_id}",
+        })
+
+    return results
@@ -0,0 +1,11 @@
+# tests/conftest.py
+#
+# Unit tests never touch the configured database: DATABASE_URL is
+# replaced before any project module is imported. Tests that need real
+# Postgres (SQL-level behaviour) use TEST_DATABASE_URL and skip without it.
+import os
+import sys
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or "sqlite://"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
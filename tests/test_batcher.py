@@ -0,0 +1,74 @@
+# tests/test_batcher.py
+import asyncio
+import threading
+
+from embeddings import batcher as batcher_module
+from embeddings.batcher import MicroBatcher
+
+
+class Vec(list):
+    def tolist(self):
+        return list(self)
+
+
+def _blocking_encode(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def fake_encode(name, texts, **kwargs):
+        started.set()
+        release.wait(2)
+        return [Vec([float(len(t))]) for t in texts]
+
+    monkeypatch.setattr(batcher_module, "encode", fake_encode)
+    return started, release
+
+
+def test_cancelled_awaiter_mid_batch_does_not_kill_worker(monkeypatch):
+    started, release = _blocking_encode(monkeypatch)
+    batcher = MicroBatcher("fake", max_wait_ms=1)
+
+    async def scenario():
+        doomed = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("abc")))
+        survivor = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("abcd")))
+
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 2)
+        doomed.cancel()
+        release.set()
+
+        return await survivor
+
+    assert asyncio.run(scenario()) == [4.0]
+    assert batcher._thread.is_alive()
+    assert batcher.embed("ab") == [2.0]
+
+
+def test_future_cancelled_before_collection_is_skipped(monkeypatch):
+    started, release = _blocking_encode(monkeypatch)
+    batcher = MicroBatcher("fake", max_wait_ms=1)
+
+    first = batcher.submit("a")
+    assert started.wait(2)
+
+    queued = batcher.submit("bbbb")
+    assert queued.cancel()
+    release.set()
+
+    assert first.result(timeout=2) == [1.0]
+    assert batcher.embed("cc") == [2.0]
+    assert batcher.items == 2
+
+
+def test_dead_worker_is_restarted(monkeypatch):
+    monkeypatch.setattr(
+        batcher_module,
+        "encode",
+        lambda name, texts, **kwargs: [Vec([1.0]) for _ in texts],
+    )
+    batcher = MicroBatcher("fake", max_wait_ms=1)
+    batcher._thread = threading.Thread(target=lambda: None)
+    batcher._thread.start()
+    batcher._thread.join()
+
+    assert batcher.embed("x") == [1.0]
+    assert batcher._thread.is_alive()
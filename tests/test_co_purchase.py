@@ -0,0 +1,70 @@
+# tests/test_co_purchase.py
+import pytest
+
+np = pytest.importorskip("numpy")
+sparse = pytest.importorskip("scipy.sparse")
+pytest.importorskip("sqlalchemy")
+
+from services.co_purchase import compute_neighbours
+
+# order × product baskets:
+#   {0, 1}, {0, 1, 2}, {0, 2}, {1}
+# counts: 0 → 3, 1 → 3, 2 → 2
+# pairs:  (0,1) → 2, (0,2) → 2, (1,2) → 1
+BASKETS = [[0, 1], [0, 1, 2], [0, 2], [1]]
+
+
+def _matrix():
+    rows = [o for o, basket in enumerate(BASKETS) for _ in basket]
+    cols = [p for basket in BASKETS for p in basket]
+    return sparse.csr_matrix(
+        (np.ones(len(cols)), (rows, cols)),
+        shape=(len(BASKETS), 3),
+    )
+
+
+def _as_dict(neighbours):
+    return {
+        i: [(int(j), pytest.approx(float(s))) for j, s in zip(js, scores)]
+        for i, js, scores in neighbours
+    }
+
+
+def test_jaccard_scores_and_order():
+    got = _as_dict(compute_neighbours(_matrix(), metric="jaccard", top_k=20, min_count=1))
+
+    assert got == {
+        0: [(2, 2 / 3), (1, 0.5)],
+        1: [(0, 0.5), (2, 0.25)],
+        2: [(0, 2 / 3), (1, 0.25)],
+    }
+
+
+def test_lift_scores():
+    got = _as_dict(compute_neighbours(_matrix(), metric="lift", top_k=20, min_count=1))
+
+    # co · n_orders / (count_a · count_b)
+    assert got[0] == [(2, 4 / 3), (1, 8 / 9)]
+    assert got[1] == [(0, 8 / 9), (2, 2 / 3)]
+
+
+def test_min_count_drops_rare_pairs():
+    got = _as_dict(compute_neighbours(_matrix(), metric="jaccard", top_k=20, min_count=2))
+
+    assert got == {
+        0: [(2, 2 / 3), (1, 0.5)],
+        1: [(0, 0.5)],
+        2: [(0, 2 / 3)],
+    }
+
+
+def test_top_k_keeps_best_neighbours():
+    got = _as_dict(compute_neighbours(_matrix(), metric="jaccard", top_k=1, min_count=1))
+
+    assert got == {0: [(2, 2 / 3)], 1: [(0, 0.5)], 2: [(0, 2 / 3)]}
+
+
+def test_products_bought_alone_have_no_neighbours():
+    X = sparse.csr_matrix(np.array([[1, 0], [0, 1]], dtype=np.float64))
+
+    assert compute_neighbours(X, metric="jaccard", top_k=5, min_count=1) == []
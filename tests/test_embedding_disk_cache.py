@@ -0,0 +1,45 @@
+# tests/test_embedding_disk_cache.py
+from embeddings import registry
+from embeddings.disk_cache import EmbeddingDiskCache
+
+
+class FakeModel:
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+def _fake_loader(monkeypatch, fail_backends=()):
+    def fake_load(name, backend):
+        if backend in fail_backends:
+            raise RuntimeError(f"{backend} unavailable")
+        return FakeModel()
+
+    monkeypatch.setattr(registry, "_load", fake_load)
+    monkeypatch.setattr(registry, "_models", {})
+    monkeypatch.setattr(registry, "_stats", {})
+
+
+def test_variant_names_the_loaded_backend(monkeypatch):
+    _fake_loader(monkeypatch)
+    monkeypatch.setattr(registry, "ONNX_QUANT_CONFIG", "avx2")
+
+    registry.get_model("m", backend="onnx-int8")
+    assert registry.model_variant("m") == "m@onnx-int8:avx2"
+
+
+def test_variant_reflects_torch_fallback(monkeypatch):
+    _fake_loader(monkeypatch, fail_backends=("onnx-int8",))
+
+    registry.get_model("m", backend="onnx-int8")
+    assert registry.model_variant("m") == "m@torch"
+
+
+def test_variants_are_cached_apart(tmp_path):
+    cache = EmbeddingDiskCache(path=str(tmp_path / "cache.sqlite3"))
+
+    fp32 = cache.get_or_compute("m@torch", "hello", lambda t: [0.5, 0.25])
+    int8 = cache.get_or_compute("m@onnx-int8:avx2", "hello", lambda t: [0.5, 0.0])
+
+    assert fp32 == [0.5, 0.25]
+    assert int8 == [0.5, 0.0]
+    assert cache.get("m@torch", "hello") == [0.5, 0.25]
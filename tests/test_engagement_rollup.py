@@ -0,0 +1,174 @@
+# tests/test_engagement_rollup.py
+#
+# Postgres-only (make_interval, power, FOR UPDATE):
+#   TEST_DATABASE_URL=postgresql://... python -m pytest tests/test_engagement_rollup.py
+import os
+import time
+import uuid
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+if not os.environ.get("TEST_DATABASE_URL", "").startswith("postgresql"):
+    pytest.skip("needs TEST_DATABASE_URL pointing at Postgres", allow_module_level=True)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from services import engagement_stats
+
+_DDL = """
+CREATE TABLE search_logs (
+    id SERIAL PRIMARY KEY,
+    query TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    clicked BOOLEAN DEFAULT false,
+    added_to_cart BOOLEAN DEFAULT false,
+    purchased BOOLEAN DEFAULT false,
+    created_at TIMESTAMP DEFAULT now()
+);
+
+CREATE TABLE product_engagement_stats (
+    product_id INTEGER PRIMARY KEY,
+    impressions INTEGER NOT NULL DEFAULT 0,
+    clicks INTEGER NOT NULL DEFAULT 0,
+    carts INTEGER NOT NULL DEFAULT 0,
+    purchases INTEGER NOT NULL DEFAULT 0,
+    decayed_impressions FLOAT NOT NULL DEFAULT 0.0,
+    decayed_clicks FLOAT NOT NULL DEFAULT 0.0,
+    decayed_carts FLOAT NOT NULL DEFAULT 0.0,
+    decayed_purchases FLOAT NOT NULL DEFAULT 0.0,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE TABLE rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    last_ts TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT now()
+);
+"""
+
+
+@pytest.fixture
+def Session():
+    schema = f"test_rollup_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(os.environ["TEST_DATABASE_URL"])
+
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    engine = create_engine(
+        os.environ["TEST_DATABASE_URL"],
+        connect_args={"options": f"-csearch_path={schema}"},
+    )
+    with engine.begin() as conn:
+        conn.execute(text(_DDL))
+
+    yield sessionmaker(bind=engine)
+
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
+
+
+def _log(db, product_id: int):
+    db.execute(
+        text("INSERT INTO search_logs (query, product_id) VALUES ('q', :pid)"),
+        {"pid": product_id},
+    )
+
+
+def _impressions(db, product_id: int) -> int:
+    return db.execute(
+        text("SELECT impressions FROM product_engagement_stats WHERE product_id = :pid"),
+        {"pid": product_id},
+    ).scalar() or 0
+
+
+def test_late_committed_row_is_still_rolled_up(Session, monkeypatch):
+    monkeypatch.setattr(engagement_stats, "ENGAGEMENT_ROLLUP_LAG_SECONDS", 1.0)
+
+    slow, fast, job = Session(), Session(), Session()
+    try:
+        # Writer A takes id 1 and keeps its transaction open;
+        # writer B takes id 2 and commits first
+        _log(slow, 7)
+        slow.flush()
+        _log(fast, 7)
+        fast.commit()
+
+        # Only id 2 is visible, but it is younger than the lag:
+        # the watermark must not move past the in-flight id 1
+        assert engagement_stats.refresh_engagement_stats(job) == 0
+
+        slow.commit()
+        time.sleep(1.2)
+
+        engagement_stats.refresh_engagement_stats(job)
+        assert _impressions(job, 7) == 2
+        assert engagement_stats.refresh_engagement_stats(job) == 0
+    finally:
+        slow.close()
+        fast.close()
+        job.close()
+
+
+def test_decayed_counter_is_decayed_before_delta(Session, monkeypatch):
+    monkeypatch.setattr(engagement_stats, "ENGAGEMENT_ROLLUP_LAG_SECONDS", 0.0)
+    half_life = engagement_stats.HALF_LIFE_SECONDS
+
+    db = Session()
+    try:
+        db.execute(
+            text("""
+            INSERT INTO product_engagement_stats
+                (product_id, impressions, decayed_impressions, updated_at)
+            VALUES (9, 8, 8.0, now() - make_interval(secs => :hl))
+            """),
+            {"hl": half_life},
+        )
+        _log(db, 9)
+        _log(db, 9)
+        db.execute(text("UPDATE search_logs SET created_at = now() - interval '1 minute'"))
+        db.commit()
+
+        engagement_stats.refresh_engagement_stats(db)
+
+        row = db.execute(
+            text("""
+            SELECT impressions, decayed_impressions
+            FROM product_engagement_stats
+            WHERE product_id = 9
+            """)
+        ).fetchone()
+
+        # Raw counter is exact; decayed one halves over one half-life, then adds the delta
+        assert row.impressions == 10
+        assert row.decayed_impressions == pytest.approx(8 * 0.5 + 2, rel=1e-3)
+    finally:
+        db.close()
+
+
+def test_id_gap_wider_than_batch_does_not_stall(Session, monkeypatch):
+    monkeypatch.setattr(engagement_stats, "ENGAGEMENT_ROLLUP_LAG_SECONDS", 0.0)
+    monkeypatch.setattr(engagement_stats, "ENGAGEMENT_ROLLUP_BATCH", 10)
+
+    db = Session()
+    try:
+        _log(db, 5)
+        # Sequence jump: next ids are far beyond one batch
+        db.execute(text("SELECT setval('search_logs_id_seq', 1000)"))
+        _log(db, 5)
+        _log(db, 5)
+        db.execute(text("UPDATE search_logs SET created_at = now() - interval '1 minute'"))
+        db.commit()
+
+        assert engagement_stats.refresh_engagement_stats(db) == 1
+        assert engagement_stats.refresh_engagement_stats(db) == 2
+        assert _impressions(db, 5) == 3
+        assert engagement_stats.refresh_engagement_stats(db) == 0
+    finally:
+        db.close()
@@ -0,0 +1,48 @@
+# tests/test_geohash.py
+import pytest
+
+from utils.geohash import geohash_bounds, geohash_encode, haversine_m
+
+
+@pytest.mark.parametrize(
+    "lat, lon, precision, expected",
+    [
+        (57.64911, 10.40744, 11, "u4pruydqqvj"),
+        (42.6, -5.6, 5, "ezs42"),
+        (-25.382708, -49.265506, 8, "6gkzwgjz"),
+        (0.0, 0.0, 1, "s"),
+    ],
+)
+def test_encode_known_cells(lat, lon, precision, expected):
+    assert geohash_encode(lat, lon, precision) == expected
+
+
+def test_bounds_contain_the_encoded_point():
+    lat, lon = 31.9539, 35.9106
+    for precision in range(1, 9):
+        lat_lo, lat_hi, lon_lo, lon_hi = geohash_bounds(geohash_encode(lat, lon, precision))
+        assert lat_lo <= lat < lat_hi
+        assert lon_lo <= lon < lon_hi
+
+
+def test_longer_cells_nest_inside_shorter_ones():
+    cell = geohash_encode(31.9539, 35.9106, 7)
+    outer = geohash_bounds(cell[:5])
+    inner = geohash_bounds(cell)
+
+    assert outer[0] <= inner[0] and inner[1] <= outer[1]
+    assert outer[2] <= inner[2] and inner[3] <= outer[3]
+
+
+def test_haversine_known_distances():
+    assert haversine_m(0, 0, 0, 0) == 0
+    # One degree of latitude ≈ 111.2km on the mean-radius sphere
+    assert haversine_m(0, 0, 1, 0) == pytest.approx(111195, rel=1e-3)
+    # Paris → London ≈ 343.5km
+    assert haversine_m(48.8566, 2.3522, 51.5074, -0.1278) == pytest.approx(343_500, rel=5e-3)
+
+
+def test_haversine_is_symmetric():
+    a = (31.9539, 35.9106)
+    b = (29.5321, 35.0063)
+    assert haversine_m(*a, *b) == pytest.approx(haversine_m(*b, *a))
@@ -0,0 +1,73 @@
+# tests/test_popularity_index.py
+import threading
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from services.popularity_index import PopularityIndex
+
+
+def _index():
+    index = PopularityIndex(top_n=10)
+    # (pid, name, price, score)
+    index._global = (
+        (1, "a", 1.0, 9.0),
+        (2, "b", 1.0, 8.0),
+        (10, "shoe-1", 1.0, 7.0),
+        (20, "tea-1", 1.0, 6.0),
+        (3, "c", 1.0, 5.0),
+    )
+    index._by_category = {
+        100: ((10, "shoe-1", 1.0, 7.0), (11, "shoe-2", 1.0, 2.0), (12, "shoe-3", 1.0, 1.0)),
+        200: ((20, "tea-1", 1.0, 6.0), (21, "tea-2", 1.0, 3.0)),
+    }
+    index._category_of = {10: 100, 11: 100, 12: 100, 20: 200, 21: 200}
+    index.loaded = True
+    return index
+
+
+def _pids(results):
+    return [r["pid"] for r in results]
+
+
+def test_single_category_then_global_top_up():
+    assert _pids(_index().recommend([10], limit=5)) == [11, 12, 1, 2, 20]
+
+
+def test_categories_are_pooled_by_score():
+    assert _pids(_index().recommend([10, 20], limit=3)) == [21, 11, 12]
+
+
+def test_inputs_are_excluded_everywhere():
+    results = _pids(_index().recommend([11, 1], limit=10))
+
+    assert 11 not in results and 1 not in results
+    assert results[:2] == [10, 12]
+    assert len(results) == len(set(results))
+
+
+def test_unknown_products_get_global_list():
+    assert _pids(_index().recommend([999], limit=2)) == [1, 2]
+
+
+def test_first_requests_share_one_load(monkeypatch):
+    index = PopularityIndex()
+    calls = []
+    gate = threading.Event()
+
+    def fake_refresh(db=None):
+        calls.append(1)
+        gate.wait(1)
+        index.loaded = True
+
+    monkeypatch.setattr(index, "refresh", fake_refresh)
+
+    threads = [threading.Thread(target=index.recommend, args=([],)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
@@ -0,0 +1,24 @@
+# tests/test_product_reindex.py
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("qdrant_client")
+
+from services.product_reindex import REINDEX_OVERLAP_SECONDS, _resume_point
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_incremental_run_restarts_one_overlap_window_back():
+    last_ts, last_id = _resume_point(T0, 42)
+
+    assert last_ts == T0 - timedelta(seconds=REINDEX_OVERLAP_SECONDS)
+    # Whole window is re-read, not just ids after 42 at the new timestamp
+    assert last_id == 0
+
+
+def test_missing_timestamp_keeps_id_cursor():
+    assert _resume_point(None, 0) == (None, 0)
+    assert _resume_point(None, 17) == (None, 17)
@@ -0,0 +1,128 @@
+# tests/test_ranking_feature_store.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from services.ranking_feature_store import (
+    DEFAULT_WEIGHTS,
+    FEATURE_STORE_OVERLAP_SECONDS,
+    SCORE_COLUMNS,
+    RankingFeatureStore,
+    _parse_weights,
+)
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+T1 = datetime(2026, 1, 1, 12, 0, 5)
+T2 = datetime(2026, 1, 1, 12, 0, 9)
+OVERLAP = timedelta(seconds=FEATURE_STORE_OVERLAP_SECONDS)
+
+
+def _product(pid, updated_at, price=10.0, stock=5):
+    return SimpleNamespace(
+        id=pid,
+        price=price,
+        stock_quantity=stock,
+        seller_rating=4.0,
+        seller_total_sales=250.0,
+        updated_at=updated_at,
+    )
+
+
+def _engagement(pid, updated_at, impressions=10):
+    return SimpleNamespace(
+        product_id=pid,
+        impressions=impressions,
+        clicks=1,
+        purchases=0,
+        updated_at=updated_at,
+    )
+
+
+class FakeSession:
+    """
+    Returns queued (products, engagement) rows per refresh and records
+    the watermark each incremental query was bound with.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.bound = []
+
+    def execute(self, statement, params=None):
+        self.bound.append((params or {}).get("wm"))
+        products, engagement = self.batches[0]
+        rows = products if "FROM products" in str(statement) else engagement
+        if "FROM product_engagement_stats" in str(statement):
+            self.batches.pop(0)
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+def test_watermarks_advance_to_newest_row_and_never_go_back():
+    store = RankingFeatureStore(capacity=2)
+    db = FakeSession()
+
+    db.batches.append(([_product(1, T0), _product(2, T1)], [_engagement(1, T0)]))
+    store.refresh(db)
+    assert store.stats()["products_watermark"] == T1
+    assert store.stats()["engagement_watermark"] == T0
+
+    # Incremental reads start one overlap window before each watermark
+    db.batches.append(([_product(2, T1, price=12.0)], []))
+    store.refresh(db)
+    assert db.bound[-2:] == [T1 - OVERLAP, T0 - OVERLAP]
+    assert store.stats()["products_watermark"] == T1
+    assert store.stats()["engagement_watermark"] == T0
+
+    db.batches.append(([_product(3, T2)], [_engagement(2, T2, impressions=40)]))
+    store.refresh(db)
+    assert store.stats()["products_watermark"] == T2
+    assert store.stats()["engagement_watermark"] == T2
+
+    known, feats = store.gather([1, 2, 3])
+    assert known == [1, 2, 3]
+    assert feats[1, 0] == 12.0
+    assert feats[1, 3] == 250.0
+    assert feats[1, 4] == 40.0
+
+
+def test_incremental_refresh_with_no_watermark_binds_min():
+    store = RankingFeatureStore()
+    db = FakeSession()
+
+    db.batches.append(([], []))
+    store.refresh(db)
+    db.batches.append(([], []))
+    store.refresh(db)
+
+    assert db.bound[-2:] == [datetime.min, datetime.min]
+    assert store.stats()["products_watermark"] is None
+
+
+def test_ranking_weights_fall_back_on_bad_config():
+    default = _parse_weights(DEFAULT_WEIGHTS)
+
+    assert len(default) == len(SCORE_COLUMNS)
+    np.testing.assert_array_equal(_parse_weights("1,2"), default)
+    np.testing.assert_array_equal(_parse_weights("a,b,c,d,e"), default)
+    np.testing.assert_array_equal(_parse_weights("1,0,0,0,0"), [1, 0, 0, 0, 0])
+
+
+def test_row_committed_behind_the_watermark_is_picked_up():
+    store = RankingFeatureStore()
+    db = FakeSession()
+
+    db.batches.append(([_product(1, T2)], []))
+    store.refresh(db)
+
+    # Transaction started at T1 (its updated_at) but committed after the
+    # refresh above had already advanced the watermark to T2
+    db.batches.append(([_product(2, T1)], []))
+    store.refresh(db)
+
+    assert db.bound[-2] <= T1
+    assert store.missing([1, 2]) == []
+    assert store.stats()["products_watermark"] == T2
@@ -0,0 +1,74 @@
+# tests/test_ttl_cache.py
+from core import ttl_cache
+from core.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(monkeypatch, max_size=3, ttl=10):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", clock)
+    return TTLCache(max_size=max_size, ttl=ttl), clock
+
+
+def test_get_put_and_default(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+
+    assert cache.get("a") is None
+    assert cache.get("a", 0.0) == 0.0
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch, ttl=10)
+    cache.put("a", 1)
+
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_many_splits_found_and_missing(monkeypatch):
+    cache, clock = _cache(monkeypatch, max_size=10, ttl=10)
+    cache.put_many({1: 0.5, 2: 0.0})
+    clock.now += 5
+    cache.put(3, 0.7)
+    clock.now += 5
+
+    found, missing = cache.get_many([1, 2, 3, 4])
+    assert found == {3: 0.7}
+    assert missing == [1, 2, 4]
+
+
+def test_cached_falsy_values_are_hits(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    cache.put("empty", [])
+
+    found, missing = cache.get_many(["empty"])
+    assert found == {"empty": []} and missing == []
@@ -0,0 +1,64 @@
+# tests/test_user_profiles.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("sqlalchemy")
+
+from services import user_profiles
+from services.user_profiles import HALF_LIFE_SECONDS, VECTOR_SIZE, fold_events
+
+
+def _unit(i):
+    v = np.zeros(VECTOR_SIZE)
+    v[i] = 1.0
+    return v
+
+
+def test_fold_from_empty_is_weighted_mean():
+    mean, weight = fold_events(None, 0.0, 0.0, [(3.0, _unit(0)), (1.0, _unit(1))])
+
+    assert weight == pytest.approx(4.0)
+    assert mean[0] == pytest.approx(0.75)
+    assert mean[1] == pytest.approx(0.25)
+
+
+def test_fold_decays_stored_weight_before_adding():
+    stored = _unit(0)
+    mean, weight = fold_events(stored, 2.0, HALF_LIFE_SECONDS, [(1.0, _unit(1))])
+
+    # 2.0 halves to 1.0, then one unit event of weight 1.0
+    assert weight == pytest.approx(2.0)
+    assert mean[0] == pytest.approx(0.5)
+    assert mean[1] == pytest.approx(0.5)
+
+
+def test_fold_matches_full_rebuild():
+    first = [(3.0, _unit(0)), (1.0, _unit(2))]
+    second = [(1.0, _unit(1))]
+
+    mean, weight = fold_events(None, 0.0, 0.0, first)
+    incremental, inc_weight = fold_events(mean, weight, 0.0, second)
+    full, full_weight = fold_events(None, 0.0, 0.0, first + second)
+
+    assert inc_weight == pytest.approx(full_weight)
+    np.testing.assert_allclose(incremental, full)
+
+
+def test_fold_without_weight_returns_none():
+    assert fold_events(None, 0.0, 0.0, []) == (None, 0.0)
+
+
+def test_rebuild_request_skipped_for_known_empty_user(monkeypatch):
+    monkeypatch.setattr(user_profiles, "USER_PROFILES_ENABLED", True)
+    updater = user_profiles.UserProfileUpdater()
+    monkeypatch.setattr(updater, "start", lambda: None)
+
+    updater.request_rebuild(7)
+    updater.request_rebuild(7)
+    assert updater.stats()["pending"] == 1
+
+    updater._rebuilds_pending.clear()
+    updater._empty[7] = float("inf")
+    updater.request_rebuild(7)
+    assert updater.stats()["pending"] == 1
@@ -0,0 +1,109 @@
+# tests/test_worker.py
+import threading
+
+import pytest
+
+from core.periodic import PeriodicTask
+from core.worker import BackgroundWorker
+
+
+class CountingWorker(BackgroundWorker):
+    def __init__(self):
+        super().__init__("counting-worker")
+        self.ticks = 0
+        self.drained = False
+        self.ticked = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(0.01):
+            self.ticks += 1
+            self.ticked.set()
+
+    def _on_stop(self):
+        self.drained = True
+
+
+def test_start_is_idempotent_and_stop_drains():
+    worker = CountingWorker()
+    worker.start()
+    thread = worker._thread
+    worker.start()
+
+    assert worker._thread is thread
+    assert worker.ticked.wait(1)
+
+    worker.stop(timeout=1)
+    assert not worker.running
+    assert worker.drained
+    assert not thread.is_alive()
+
+
+def test_ensure_started_does_not_revive_a_stopped_worker():
+    worker = CountingWorker()
+    worker.ensure_started()
+    assert worker.running
+
+    worker.stop(timeout=1)
+    worker.ensure_started()
+    assert not worker.running
+
+    # An explicit start() is still allowed
+    worker.start()
+    assert worker.running
+    worker.stop(timeout=1)
+
+
+def test_concurrent_ensure_started_starts_one_thread(monkeypatch):
+    worker = CountingWorker()
+    started = []
+    original = threading.Thread.start
+
+    def counting_start(thread):
+        if thread.name == worker.name:
+            started.append(thread)
+        original(thread)
+
+    monkeypatch.setattr(threading.Thread, "start", counting_start)
+
+    gate = threading.Barrier(8)
+
+    def producer():
+        gate.wait()
+        worker.ensure_started()
+
+    producers = [threading.Thread(target=producer) for _ in range(8)]
+    for t in producers:
+        original(t)
+    for t in producers:
+        t.join()
+
+    assert len(started) == 1
+    worker.stop(timeout=1)
+
+
+def test_run_must_be_implemented():
+    class Incomplete(BackgroundWorker):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete")
+
+
+def test_periodic_task_survives_failures():
+    calls = []
+    done = threading.Event()
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        done.set()
+
+    task = PeriodicTask(name="flaky", fn=flaky, interval=0.01)
+    task.start()
+    assert done.wait(1)
+    task.stop(timeout=1)
+
+    assert task.failures == 1
+    assert task.runs >= 1
+    assert not task.running